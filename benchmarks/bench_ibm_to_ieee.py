@@ -0,0 +1,80 @@
+"""
+Throughput of the IBM -> IEEE trace decoder against segyio.
+
+Writes a synthetic IBM-float (format 1) SEG-Y file, reads it back with
+segyio and with ``read_trace_samples``, checks that both decoders agree bit
+for bit, then reports the throughput of each path. The bit-exactness tests
+(random words, little-endian files) live in ``tests/test_ibm.py``.
+
+    python benchmarks/bench_ibm_to_ieee.py --traces 20000 --samples 1500
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import segyio
+
+from openseismicprocessing._io import read_trace_samples, segy_layout
+
+
+def make_ibm_file(path, traces, samples, seed=0):
+    rng = np.random.default_rng(seed)
+    spec = segyio.spec()
+    spec.format = 1
+    spec.samples = np.arange(samples) * 4.0
+    spec.tracecount = traces
+    with segyio.create(path, spec) as f:
+        f.bin.update(hns=samples, hdt=4000, format=1)
+        block = 4096
+        for lo in range(0, traces, block):
+            hi = min(lo + block, traces)
+            data = (rng.standard_normal((hi - lo, samples)) * 1e3).astype(np.float32)
+            for i in range(lo, hi):
+                f.header[i] = {segyio.TraceField.TRACE_SEQUENCE_FILE: i + 1}
+                f.trace[i] = data[i - lo]
+
+
+def best_of(repeat, fn):
+    best, result = np.inf, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def read_segyio(path):
+    with segyio.open(path, "r", ignore_geometry=True) as f:
+        return np.ascontiguousarray(f.trace.raw[:].T)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--traces", type=int, default=20000)
+    parser.add_argument("--samples", type=int, default=1500)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ibm.sgy")
+        make_ibm_file(path, args.traces, args.samples)
+        layout = segy_layout(path)
+        mbytes = layout.trace_count * layout.samples * 4 / 1e6
+
+        read_trace_samples(layout, 0, 1)  # compile the kernel outside the timings
+        t_segyio, ref = best_of(args.repeat, lambda: read_segyio(path))
+        t_ours, ours = best_of(args.repeat, lambda: read_trace_samples(layout, threads=args.threads))
+
+        exact = np.array_equal(ours.view(np.uint32), ref.view(np.uint32))
+        print(f"file: {layout.trace_count} traces x {layout.samples} samples ({mbytes:.0f} MB)")
+        print(f"segyio             : {t_segyio:8.3f} s  {mbytes / t_segyio:8.1f} MB/s")
+        print(f"read_trace_samples : {t_ours:8.3f} s  {mbytes / t_ours:8.1f} MB/s  ({t_segyio / t_ours:.1f}x)")
+        print(f"bit-exact vs segyio: {exact}")
+
+
+if __name__ == "__main__":
+    main()
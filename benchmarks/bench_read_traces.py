@@ -0,0 +1,103 @@
+"""
+Gather reads of scattered trace ids: ``read_traces`` against Zarr indexing.
+
+Writes a synthetic ``(samples, traces)`` Zarr amplitude array, then gathers
+the same ids with ``amplitude.oindex[:, ids]`` (in the 2048-trace blocks the
+subset tools used to read) and with ``read_traces``. Three id patterns are
+timed: uniformly random ids, clustered ids (runs of consecutive traces around
+random centres, like a CDP gather in a shot-sorted store) and ids sorted by
+a coarse key. Results are checked to be identical.
+
+    python benchmarks/bench_read_traces.py --traces 200000 --samples 1000 --select 20000
+"""
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+import zarr
+from numcodecs import Blosc
+
+from openseismicprocessing.zarr_utils import read_traces
+
+
+def make_store(path, traces, samples, chunk_trace, seed=0):
+    rng = np.random.default_rng(seed)
+    amp = zarr.open(path, mode="w").create_dataset(
+        "amplitude",
+        shape=(samples, traces),
+        chunks=(samples, chunk_trace),
+        dtype="float32",
+        compressor=Blosc(cname="zstd", clevel=5, shuffle=Blosc.SHUFFLE),
+    )
+    for lo in range(0, traces, 16 * chunk_trace):
+        hi = min(lo + 16 * chunk_trace, traces)
+        amp[:, lo:hi] = rng.standard_normal((samples, hi - lo)).astype(np.float32)
+    return amp
+
+
+def patterns(traces, select, seed=1):
+    rng = np.random.default_rng(seed)
+    random = rng.choice(traces, size=select, replace=False)
+    run = 48
+    centres = rng.choice(traces - run, size=select // run, replace=False)
+    clustered = (centres[:, None] + np.arange(run)).reshape(-1)
+    key = rng.integers(0, 64, size=traces)
+    by_key = np.argsort(key, kind="stable")[:select]
+    return {"random": random, "clustered": clustered, "sorted by key": by_key}
+
+
+def read_blocks(amp, ids, block=2048):
+    out = np.empty((amp.shape[0], len(ids)), dtype=amp.dtype)
+    for lo in range(0, len(ids), block):
+        out[:, lo : lo + block] = amp.oindex[:, ids[lo : lo + block]]
+    return out
+
+
+def read_oindex(amp, ids):
+    # Zarr's orthogonal indexing wants ascending ids; scatter back afterwards
+    order = np.argsort(ids)
+    out = np.empty((amp.shape[0], len(ids)), dtype=amp.dtype)
+    out[:, order] = amp.oindex[:, ids[order]]
+    return out
+
+
+def best_of(repeat, fn):
+    best, result = np.inf, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--traces", type=int, default=200000)
+    parser.add_argument("--samples", type=int, default=1000)
+    parser.add_argument("--select", type=int, default=20000)
+    parser.add_argument("--chunk-trace", type=int, default=512)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        amp = make_store(f"{tmp}/bench.zarr", args.traces, args.samples, args.chunk_trace)
+        mbytes = args.samples * args.select * 4 / 1e6
+        print(f"store: {args.traces} traces x {args.samples} samples, chunk_trace {args.chunk_trace}")
+        print(f"gather: {args.select} traces ({mbytes:.0f} MB)")
+        for name, ids in patterns(args.traces, args.select).items():
+            chunks = np.unique(ids // args.chunk_trace).size
+            t_blocks, ref = best_of(args.repeat, lambda: read_blocks(amp, ids))
+            t_oindex, _ = best_of(args.repeat, lambda: read_oindex(amp, ids))
+            t_ours, ours = best_of(args.repeat, lambda: read_traces(amp, ids, workers=args.workers))
+            print(f"{name} ({chunks} chunks touched)")
+            print(f"  oindex, 2048-id blocks : {t_blocks:8.3f} s  {mbytes / t_blocks:8.1f} MB/s")
+            print(f"  oindex, one call       : {t_oindex:8.3f} s  {mbytes / t_oindex:8.1f} MB/s")
+            print(f"  read_traces            : {t_ours:8.3f} s  {mbytes / t_ours:8.1f} MB/s  ({t_blocks / t_ours:.1f}x)")
+            print(f"  identical: {np.array_equal(ours, ref)}")
+
+
+if __name__ == "__main__":
+    main()
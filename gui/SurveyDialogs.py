@@ -28,7 +28,7 @@ from openseismicprocessing.constants import TRACE_HEADER_REV0, TRACE_HEADER_REV1
 from openseismicprocessing.segy_inspector import SegyInspector, print_revision_summary
 from openseismicprocessing.io import read_trace_headers_until, get_text_header
 from openseismicprocessing._io import open_segy_data
-from openseismicprocessing.zarr_utils import segy_directory_to_zarr
+from openseismicprocessing.zarr_utils import segy_directory_to_zarr, scan_segy_files
 import segyio
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
@@ -440,32 +440,24 @@ class ImportSEGYDialog(QtWidgets.QDialog):
         if file_index is not None and (file_index < 0 or file_index >= len(self.segy_files)):
             return None
         target_paths = self.segy_files if file_index is None else [self.segy_files[file_index]]
-        total_traces = 0
-        dt = None
-        n_samples = None
-        for path in target_paths:
-            segy_file = None
-            try:
-                segy_file = open_segy_data(path, ignore_geometry=True)
-                total_traces += segy_file.tracecount
-                if n_samples is None:
-                    n_samples = len(segy_file.samples)
-                if dt is None:
-                    try:
-                        dt = segyio.tools.dt(segy_file) / 1000.0
-                    except Exception:
-                        dt = 0.0
-            except Exception as e:
-                QtWidgets.QMessageBox.warning(self, "Error", f"Failed to read SEG-Y metadata from {path}:\n{e}")
-                return None
-            finally:
-                if segy_file is not None:
-                    try:
-                        segy_file.close()
-                    except Exception:
-                        pass
+        entries = self._scan_entries(target_paths)
+        if entries is None:
+            return None
+        total_traces = sum(entry["traces"] for entry in entries)
+        dt = entries[0]["dt"] if entries else 0.0
+        n_samples = entries[0]["samples"] if entries else 0
         return total_traces, dt or 0.0, n_samples or 0
 
+    def _scan_entries(self, paths, header_stats: bool = False):
+        """Per-file counts/dt (and header min/max) from the cached parallel pre-scan."""
+        try:
+            scan = scan_segy_files({}, paths, header_spec=self._current_header_spec(), header_stats=header_stats)
+        except Exception as e:
+            QtWidgets.QMessageBox.warning(self, "Error", f"Failed to read SEG-Y metadata:\n{e}")
+            return None
+        by_path = {os.path.realpath(entry["file"]): entry for entry in scan["files"]}
+        return [by_path[os.path.realpath(path)] for path in paths if os.path.realpath(path) in by_path]
+
     def _load_trace_headers(self, max_traces=None, per_file: bool = False):
         if not self._ensure_loaded_path():
             return None
@@ -755,6 +747,12 @@ class ImportSEGYDialog(QtWidgets.QDialog):
         inside_ids = [] if collect_inside else None
         unit_factor = self._unit_factor()
 
+        if not collect_inside:
+            fast = self._prestack_inside_from_scan(cols_and_scales, bounds, unit_factor)
+            if fast is not None:
+                print(f"[TraceCheck] All {fast} traces inside bounds (from cached header ranges).")
+                return 0, fast
+
         import time
         progress = QtWidgets.QProgressDialog("Checking traces against bounding box...", "Cancel", 0, 0, self)
         progress.setWindowModality(Qt.WindowModality.WindowModal)
@@ -838,6 +836,27 @@ class ImportSEGYDialog(QtWidgets.QDialog):
             return total_outside, total_traces, concat_ids
         return total_outside, total_traces
 
+    def _prestack_inside_from_scan(self, cols_and_scales, bounds, unit_factor):
+        """Total trace count when cached header ranges prove every trace is inside ``bounds``, else None."""
+        x_min, x_max, y_min, y_max = bounds
+        entries = self._scan_entries(self.segy_files, header_stats=True)
+        if not entries or len(entries) != len(self.segy_files):
+            return None
+        limits = [(x_min, x_max), (y_min, y_max), (x_min, x_max), (y_min, y_max)]
+        for path, entry in zip(self.segy_files, entries):
+            stats = entry.get("header_stats") or {}
+            with open_segy_data(path, ignore_geometry=True) as f:
+                for (combo, scale_combo, chk, spin), (lo, hi) in zip(cols_and_scales, limits):
+                    col = combo.currentText()
+                    if col not in stats:
+                        return None
+                    scale = self._resolve_scale_for_file(scale_combo.currentText(), chk, spin, f)
+                    factor = 1.0 if scale in (None, 0) else (scale if scale > 0 else 1.0 / abs(scale))
+                    ends = sorted((stats[col]["min"] * factor * unit_factor, stats[col]["max"] * factor * unit_factor))
+                    if ends[0] < lo or ends[1] > hi:
+                        return None
+        return sum(entry["traces"] for entry in entries)
+
     def _all_headers(self) -> list[str]:
         spec = self._current_header_spec()
         return list(spec.keys())
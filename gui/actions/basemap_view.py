@@ -8,6 +8,8 @@ from matplotlib.backends.backend_qtagg import NavigationToolbar2QT
 from matplotlib.figure import Figure
 from openseismicprocessing.catalog import list_projects
 
+from .loader import load_service, read_geometry
+
 
 def _infer_dtype(geom_path: Path, survey_root: Path | None) -> str:
     if geom_path is None or survey_root is None:
@@ -71,6 +73,8 @@ class BasemapDialog(QtWidgets.QWidget):
             self.list.addItem(item)
 
         self.list.itemChanged.connect(self.update_plot)
+        # Coordinate columns per geometry path (None when it failed to load)
+        self._geoms: dict[Path, pd.DataFrame | None] = {}
 
         self.showSourcesChk = QtWidgets.QCheckBox("Sources")
         self.showSourcesChk.setChecked(True)
@@ -103,14 +107,29 @@ class BasemapDialog(QtWidgets.QWidget):
 
         self.update_plot()
 
-    def read_geom(self, path: Path) -> pd.DataFrame | None:
-        try:
-            if path.suffix.lower() == ".csv":
-                return pd.read_csv(path)
-            return pd.read_parquet(path)
-        except Exception as exc:
-            QtWidgets.QMessageBox.warning(self, "Basemap Error", f"Failed to read geometry {path.name}:\n{exc}")
-            return None
+    def read_geom(self, path: Path, handle=None) -> pd.DataFrame:
+        """Read only the coordinate columns of a geometry (runs on a loader thread)."""
+        header = read_geometry(path, nrows=0)
+        columns = [self.find_col(header, [name]) for name in ("sx", "sy", "gx", "gy")]
+        return read_geometry(path, columns=[c for c in columns if c], handle=handle)
+
+    def _load_geoms(self, paths, handle):
+        geoms = {}
+        for path in paths:
+            handle.check()
+            try:
+                geoms[path] = self.read_geom(path, handle)
+            except Exception as exc:
+                geoms[path] = exc
+        return geoms
+
+    def _on_geoms_loaded(self, geoms):
+        for path, df in geoms.items():
+            if isinstance(df, Exception):
+                QtWidgets.QMessageBox.warning(self, "Basemap Error", f"Failed to read geometry {path.name}:\n{df}")
+                df = None
+            self._geoms[path] = df
+        self.update_plot()
 
     def find_col(self, df, names):
         for n in names:
@@ -133,11 +152,20 @@ class BasemapDialog(QtWidgets.QWidget):
                 continue
             if item.checkState() == QtCore.Qt.CheckState.Checked:
                 selected.append(path)
+        missing = [path for path in selected if path not in self._geoms]
+        if missing:
+            # Plot what is loaded now; the missing geometries redraw when they arrive
+            load_service().submit(
+                lambda handle: self._load_geoms(missing, handle),
+                on_done=self._on_geoms_loaded,
+                key=self,
+                label="Basemap",
+            )
         plotted = False
         max_points = 500_000
 
         for path in selected:
-            df = self.read_geom(path)
+            df = self._geoms.get(path)
             if df is None or df.empty:
                 continue
             dtype = _infer_dtype(path, self.survey_root)
@@ -3,6 +3,8 @@ from pathlib import Path
 import pandas as pd
 from PyQt6 import QtWidgets
 
+from .loader import load_service, read_geometry
+
 
 class HeadersDialog(QtWidgets.QDialog):
     def __init__(self, parent, files):
@@ -90,15 +92,21 @@ def show_headers(window):
     geom_path, n_rows = dlg.get_selection()
     if not geom_path:
         return
-    try:
-        df = pd.read_csv(geom_path) if geom_path.suffix.lower() == ".csv" else pd.read_parquet(geom_path)
-    except Exception as exc:
-        QtWidgets.QMessageBox.warning(window, "Headers Error", f"Failed to read geometry {geom_path.name}:\n{exc}")
-        return
-
-    view_df = df.head(n_rows)
     base_name = geom_path.name.replace(".geometry.parquet", "").replace(".geometry.csv", "")
     title = f"Headers: {base_name}"
-    widget = _build_headers_table(view_df, title)
-    window.tabWidget.addTab(widget, title)
-    window.tabWidget.setCurrentWidget(widget)
+
+    def show(view_df):
+        widget = _build_headers_table(view_df, title)
+        window.tabWidget.addTab(widget, title)
+        window.tabWidget.setCurrentWidget(widget)
+
+    def fail(exc):
+        QtWidgets.QMessageBox.warning(window, "Headers Error", f"Failed to read geometry {geom_path.name}:\n{exc}")
+
+    # Only the rows shown are read, off the Qt thread
+    load_service().submit(
+        lambda handle: read_geometry(geom_path, handle=handle, nrows=n_rows),
+        on_done=show,
+        on_error=fail,
+        label=title,
+    )
@@ -0,0 +1,223 @@
+"""Shared background loading for the GUI views.
+
+Parquet and Zarr reads run on a ``QThreadPool``; results, errors and progress
+come back to the Qt thread through signals, so a multi-GB geometry load never
+freezes the window. ``LoadService.submit`` is the asynchronous entry point
+(callbacks), ``LoadService.run`` blocks the caller behind a cancellable
+progress dialog while the event loop keeps running.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from PyQt6 import QtCore, QtWidgets
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+
+class LoadCancelled(Exception):
+    """Raised inside a load (and by ``LoadService.run``) once the load was cancelled."""
+
+
+class LoadHandle(QtCore.QObject):
+    """One background load: pass it to the load function to report progress and poll cancellation."""
+
+    progressed = QtCore.pyqtSignal(int, int)
+    finished = QtCore.pyqtSignal(object)
+    failed = QtCore.pyqtSignal(object)
+
+    def __init__(self, label: str = ""):
+        super().__init__()
+        self.label = label
+        self.cancelled = False
+        self.done = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def check(self):
+        """Raise ``LoadCancelled`` if the load was cancelled (call between blocks of work)."""
+        if self.cancelled:
+            raise LoadCancelled(self.label)
+
+    def progress(self, done: int, total: int):
+        self.check()
+        self.progressed.emit(int(done), int(total))
+
+
+class _LoadJob(QtCore.QRunnable):
+    def __init__(self, handle: LoadHandle, fn):
+        super().__init__()
+        self.handle = handle
+        self.fn = fn
+
+    def run(self):
+        try:
+            self.handle.check()
+            result = self.fn(self.handle)
+        except Exception as exc:
+            self.handle.failed.emit(exc)
+            return
+        self.handle.finished.emit(result)
+
+
+class LoadService(QtCore.QObject):
+    """Process-wide pool for GUI I/O (see ``load_service``).
+
+    ``submit(fn, ...)`` runs ``fn(handle)`` on a worker thread and calls
+    ``on_done(result)``, ``on_error(exc)`` and ``on_progress(done, total)`` on the
+    Qt thread. Loads submitted with the same ``key`` replace each other: the
+    previous one is cancelled and its result dropped, so switching datasets
+    quickly only shows the last one.
+    """
+
+    def __init__(self, threads: int = 2, parent=None):
+        super().__init__(parent)
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(threads)
+        self._by_key: dict = {}
+        self._active: set = set()
+
+    def submit(self, fn, on_done=None, on_error=None, on_progress=None, key=None, label: str = "") -> LoadHandle:
+        if key is not None and key in self._by_key:
+            self._by_key[key].cancel()
+        handle = LoadHandle(label)
+        self._active.add(handle)
+        if key is not None:
+            self._by_key[key] = handle
+
+        def finish(callback, value):
+            handle.done = True
+            self._active.discard(handle)
+            if key is not None and self._by_key.get(key) is handle:
+                del self._by_key[key]
+            if handle.cancelled or callback is None:
+                return
+            callback(value)
+
+        handle.finished.connect(lambda result: finish(on_done, result))
+        handle.failed.connect(lambda exc: finish(None if isinstance(exc, LoadCancelled) else on_error, exc))
+        if on_progress is not None:
+            handle.progressed.connect(lambda done, total: None if handle.cancelled else on_progress(done, total))
+        self.pool.start(_LoadJob(handle, fn))
+        return handle
+
+    def run(self, fn, parent=None, label: str = "Loading..."):
+        """Run ``fn(handle)`` in the background behind a progress dialog and return its result.
+
+        The event loop keeps running meanwhile. Raises ``LoadCancelled`` when the
+        user cancels and re-raises the load's own error.
+        """
+        loop = QtCore.QEventLoop()
+        outcome = {}
+        dialog = QtWidgets.QProgressDialog(label, "Cancel", 0, 0, parent)
+        dialog.setWindowModality(QtCore.Qt.WindowModality.WindowModal)
+        dialog.setMinimumDuration(300)
+
+        def on_progress(done, total):
+            dialog.setMaximum(max(int(total), 1))
+            dialog.setValue(min(int(done), int(total)))
+
+        def stop(kind, value):
+            outcome[kind] = value
+            loop.quit()
+
+        handle = self.submit(
+            fn,
+            on_done=lambda result: stop("result", result),
+            on_error=lambda exc: stop("error", exc),
+            on_progress=on_progress,
+            label=label,
+        )
+
+        def cancel():
+            if handle.done:
+                return  # closing the dialog after the load also emits ``canceled``
+            handle.cancel()
+            outcome["error"] = LoadCancelled(label)
+            loop.quit()
+
+        dialog.canceled.connect(cancel)
+        if not handle.done:
+            loop.exec()
+        dialog.close()
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome.get("result")
+
+    def cancel_all(self):
+        for handle in list(self._active):
+            handle.cancel()
+        self.pool.clear()
+
+    def wait(self, msecs: int = -1) -> bool:
+        """Block until running loads finish and deliver their results (scripts and shutdown)."""
+        done = self.pool.waitForDone(msecs)
+        QtCore.QCoreApplication.processEvents()
+        return done
+
+
+_SERVICE = None
+
+
+def load_service() -> LoadService:
+    """The GUI's shared ``LoadService`` (created on first use)."""
+    global _SERVICE
+    if _SERVICE is None:
+        _SERVICE = LoadService(parent=QtCore.QCoreApplication.instance())
+    return _SERVICE
+
+
+def read_geometry(path, columns=None, handle: LoadHandle | None = None, nrows: int | None = None) -> pd.DataFrame:
+    """Read a geometry table (optionally only ``columns`` / the first ``nrows``) block by block.
+
+    Parquet is read one row group at a time and CSV in chunks, reporting rows
+    read to ``handle`` and stopping early when it is cancelled.
+    """
+    path = Path(path)
+    columns = None if columns is None else list(columns)
+    if path.suffix.lower() == ".csv" or pq is None:
+        frames, done = [], 0
+        for frame in pd.read_csv(path, usecols=columns, chunksize=1 << 18, nrows=nrows):
+            frames.append(frame)
+            done += len(frame)
+            if handle is not None:
+                handle.progress(done, nrows or 0)
+        return pd.concat(frames, ignore_index=True) if frames else pd.read_csv(path, usecols=columns, nrows=0)
+    parquet = pq.ParquetFile(path)
+    total = parquet.metadata.num_rows if nrows is None else min(nrows, parquet.metadata.num_rows)
+    tables, done = [], 0
+    for group in range(parquet.num_row_groups):
+        if done >= total:
+            break
+        table = parquet.read_row_group(group, columns=columns)
+        tables.append(table.slice(0, total - done))
+        done += min(len(table), total - done)
+        if handle is not None:
+            handle.progress(done, total)
+    if not tables:
+        schema = parquet.schema_arrow
+        return (schema.empty_table() if columns is None else schema.empty_table().select(columns)).to_pandas()
+    return pa.concat_tables(tables).to_pandas()
+
+
+def read_amplitude(zarr_path, handle: LoadHandle | None = None) -> np.ndarray:
+    """Read a store's full ``amplitude`` array window by window, reporting traces read to ``handle``."""
+    import zarr
+
+    amp = zarr.open(str(zarr_path), mode="r")["amplitude"]
+    ns, ntr = amp.shape
+    out = np.empty((ns, ntr), dtype=amp.dtype)
+    window = max(amp.chunks[1], (64 * 1024**2 // max(ns * amp.dtype.itemsize, 1)) // amp.chunks[1] * amp.chunks[1])
+    for lo in range(0, ntr, window):
+        hi = min(ntr, lo + window)
+        out[:, lo:hi] = amp[:, lo:hi]
+        if handle is not None:
+            handle.progress(hi, ntr)
+    return out
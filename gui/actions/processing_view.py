@@ -1,3 +1,4 @@
+import functools
 import json
 from pathlib import Path
 
@@ -7,6 +8,8 @@ from PyQt6 import QtWidgets, QtGui, QtCore
 from matplotlib.backends.backend_qtagg import NavigationToolbar2QT as NavigationToolbar
 from openseismicprocessing import SignalProcessing
 
+from .loader import LoadCancelled, load_service, read_amplitude, read_geometry
+
 
 class ProcessingDiagram(QtWidgets.QGraphicsView):
     def __init__(self, parent=None, on_selection_change=None, on_label_change=None):
@@ -206,9 +209,11 @@ def _dataset_type(manifest: Path) -> str:
 
 
 class ProcessingPanel(QtWidgets.QWidget):
-    def __init__(self, manifests: list[Path]):
+    def __init__(self, manifests: list[Path], cache_dir: Path | None = None):
         super().__init__()
         layout = QtWidgets.QVBoxLayout(self)
+        # Results of unchanged leading boxes are restored from here when a job is re-run
+        self._step_cache = SignalProcessing.StepCache(cache_dir) if cache_dir else None
         self._params_by_box: dict[QtWidgets.QGraphicsRectItem, dict[str, str]] = {}
         self._current_dataset: Path | None = None
 
@@ -256,9 +261,15 @@ class ProcessingPanel(QtWidgets.QWidget):
         self.add_box_btn = QtWidgets.QPushButton("New Box")
         self.del_box_btn = QtWidgets.QPushButton("Delete Box")
         self.run_btn = QtWidgets.QPushButton("Run Job")
+        self.clear_cache_btn = QtWidgets.QPushButton("Clear Cache")
+        self.clear_cache_btn.setEnabled(self._step_cache is not None)
+        self.report_btn = QtWidgets.QPushButton("Job Report")
+        self.report_btn.setEnabled(False)
         top_row.addWidget(self.add_box_btn)
         top_row.addWidget(self.del_box_btn)
         top_row.addWidget(self.run_btn)
+        top_row.addWidget(self.clear_cache_btn)
+        top_row.addWidget(self.report_btn)
         top_row.addStretch()
         layout.addLayout(top_row)
 
@@ -290,6 +301,9 @@ class ProcessingPanel(QtWidgets.QWidget):
         self.add_box_btn.clicked.connect(self.diagram.add_box_below)
         self.del_box_btn.clicked.connect(self.diagram.delete_selected_box)
         self.run_btn.clicked.connect(self._run_pipeline)
+        self.clear_cache_btn.clicked.connect(self._clear_cache)
+        self.report_btn.clicked.connect(self._show_report)
+        self._last_report = None
         self._select_first_dataset()
         self._plot_windows: list[QtWidgets.QDialog] = []
         self.save_btn.clicked.connect(self._save_job)
@@ -367,7 +381,6 @@ class ProcessingPanel(QtWidgets.QWidget):
         if manifest is None or not manifest.exists():
             QtWidgets.QMessageBox.warning(self, "Processing", "Select a dataset first.")
             return
-        context = self._load_context(manifest)
         steps = self._gather_steps()
         if not steps:
             QtWidgets.QMessageBox.information(self, "Processing", "No steps defined.")
@@ -379,54 +392,193 @@ class ProcessingPanel(QtWidgets.QWidget):
             except Exception:
                 pass
         self._plot_windows.clear()
+        funcs = []
         for box, label in steps:
             func = getattr(SignalProcessing, label, None)
             if not callable(func):
                 QtWidgets.QMessageBox.warning(self, "Processing", f"Function '{label}' not found.")
                 return
-            kwargs = {}
-            for name, val in self._params_by_box.get(box, {}).items():
-                try:
-                    import ast
-
-                    kwargs[name] = ast.literal_eval(val)
-                except Exception:
-                    kwargs[name] = val
+            funcs.append((box, label, func))
+        if all(getattr(func, "trace_local", False) for _, _, func in funcs):
+            self._run_chunked(manifest, funcs)
+            return
+        zarr_store = json.loads(manifest.read_text()).get("zarr_store")
+        cancelled = []
+
+        def load_dataset(context, zarr_store):
+            # Read on every run, on the loader behind a cancellable progress dialog;
+            # its arguments still key the cached steps after it
             try:
-                sig = inspect.signature(func)
-                valid_keys = {k for k in sig.parameters.keys() if k != "context"}
-                kwargs = {k: v for k, v in kwargs.items() if k in valid_keys}
-                if label.startswith("plot_"):
-                    if "ax" in sig.parameters:
-                        ax, dlg = self._make_plot_window(label)
-                        if "show" in sig.parameters:
-                            kwargs.setdefault("show", False)
-                        kwargs["ax"] = ax
-                        func(context, **kwargs)
-                        dlg.show()
-                        self._plot_windows.append(dlg)
-                    else:
-                        func(context, **kwargs)
-                else:
-                    func(context, **kwargs)
-            except Exception as exc:
-                QtWidgets.QMessageBox.warning(self, "Processing", f"Failed at '{label}':\n{exc}")
-                return
+                loaded = load_service().run(
+                    lambda handle: self._load_context(manifest, handle=handle), self, "Loading dataset..."
+                )
+            except LoadCancelled:
+                cancelled.append(True)
+                raise
+            context.update(loaded)
+
+        load_dataset.cacheable = False
+        pipeline = [(load_dataset, {"zarr_store": zarr_store})]
+        for box, label, func in funcs:
+            kwargs = self._step_kwargs(box, inspect.signature(func))
+            pipeline.append((self._plot_step(label, func) if label.startswith("plot_") else func, kwargs))
+        report = SignalProcessing.PipelineReport()
+        self._last_report = report
+        # Results of unchanged leading steps are restored from the step cache
+        context = SignalProcessing.run_pipeline(pipeline, cache=self._step_cache, report=report)
+        self.report_btn.setEnabled(True)
+        if cancelled:
+            return
+        failed = next((step for step in report.steps if step["status"] == "failed"), None)
+        if failed is not None:
+            error = context.get(f"{failed['name']}_error", "see the console output")
+            QtWidgets.QMessageBox.warning(self, "Processing", f"Failed at '{failed['name']}':\n{error}")
+            return
         QtWidgets.QMessageBox.information(self, "Processing", "Job finished.")
 
-    def _load_context(self, manifest: Path) -> dict:
+    def _plot_step(self, label: str, func):
+        """``func`` drawing into a new plot window, if it takes an ``ax``."""
+        sig = inspect.signature(func)
+        if "ax" not in sig.parameters:
+            return func
+
+        @functools.wraps(func)
+        def draw(context, **kwargs):
+            ax, dlg = self._make_plot_window(label)
+            if "show" in sig.parameters:
+                kwargs.setdefault("show", False)
+            kwargs["ax"] = ax
+            func(context, **kwargs)
+            dlg.show()
+            self._plot_windows.append(dlg)
+
+        return draw
+
+    def _show_report(self):
+        """Table of the last job's per-step timings, with export to JSON or a Chrome trace."""
+        report = self._last_report
+        if report is None:
+            return
+        dlg = QtWidgets.QDialog(self)
+        dlg.setWindowTitle("Job Report")
+        dlg.resize(900, 320)
+        layout = QtWidgets.QVBoxLayout(dlg)
+        columns = ["Step", "Status", "Wall (s)", "CPU (s)", "Peak RSS +MB", "Input", "Output", "Traces/s"]
+        table = QtWidgets.QTableWidget(len(report.steps), len(columns))
+        table.setHorizontalHeaderLabels(columns)
+        table.setEditTriggers(QtWidgets.QAbstractItemView.EditTrigger.NoEditTriggers)
+
+        def shape(summary):
+            return " x ".join(map(str, summary["shape"])) if summary else ""
+
+        for row, step in enumerate(report.steps):
+            rss = step["peak_rss_delta_bytes"]
+            values = [
+                f"{step['step']}. {step['name']}",
+                step["status"],
+                f"{step['wall_s']:.3f}",
+                f"{step['cpu_s']:.3f}",
+                f"{rss / 1024**2:.1f}" if rss is not None else "",
+                shape(step["input"]),
+                shape(step["output"]),
+                f"{step['traces_per_s']:,.0f}" if step["traces_per_s"] else "",
+            ]
+            for col, value in enumerate(values):
+                table.setItem(row, col, QtWidgets.QTableWidgetItem(value))
+        table.resizeColumnsToContents()
+        layout.addWidget(table, 1)
+
+        def save():
+            path, selected = QtWidgets.QFileDialog.getSaveFileName(
+                dlg, "Save Report", "job_report.json", "Report JSON (*.json);;Chrome Trace (*.trace.json)"
+            )
+            if not path:
+                return
+            if selected.startswith("Chrome"):
+                report.write_chrome_trace(path)
+            else:
+                report.write_json(path)
+
+        buttons = QtWidgets.QHBoxLayout()
+        save_btn = QtWidgets.QPushButton("Save...")
+        save_btn.clicked.connect(save)
+        buttons.addStretch()
+        buttons.addWidget(save_btn)
+        layout.addLayout(buttons)
+        dlg.show()
+
+    def _clear_cache(self):
+        if self._step_cache is None:
+            return
+        removed = self._step_cache.invalidate()
+        QtWidgets.QMessageBox.information(self, "Processing", f"Removed {removed} cached step result(s).")
+
+    def _step_kwargs(self, box, sig: inspect.Signature) -> dict:
+        kwargs = {}
+        for name, val in self._params_by_box.get(box, {}).items():
+            try:
+                import ast
+
+                kwargs[name] = ast.literal_eval(val)
+            except Exception:
+                kwargs[name] = val
+        valid_keys = {k for k in sig.parameters.keys() if k != "context"}
+        return {k: v for k, v in kwargs.items() if k in valid_keys}
+
+    def _run_chunked(self, manifest: Path, funcs: list) -> None:
+        """Trace-local jobs stream the dataset window by window into a new store in Binaries."""
+        data = json.loads(manifest.read_text())
+        zarr_in = Path(data.get("zarr_store", ""))
+        job = self.job_name.text().strip() or "job"
+        zarr_out = manifest.parent / f"{zarr_in.stem}_{job}.zarr"
+        if zarr_out.exists():
+            reply = QtWidgets.QMessageBox.question(
+                self, "Processing", f"{zarr_out.name} already exists. Overwrite it?"
+            )
+            if reply != QtWidgets.QMessageBox.StandardButton.Yes:
+                return
+        steps = [(func, self._step_kwargs(box, inspect.signature(func))) for box, _, func in funcs]
+        progress = QtWidgets.QProgressDialog("Processing traces...", None, 0, 100, self)
+        progress.setWindowModality(QtCore.Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(0)
+
+        def on_progress(done, total):
+            progress.setValue(int(100 * done / max(total, 1)))
+            QtWidgets.QApplication.processEvents()
+
+        import zarr
+
+        report = SignalProcessing.PipelineReport()
+        self._last_report = report
+        context = {"data": zarr.open(str(zarr_in), mode="r")["amplitude"]}
+        try:
+            with report.step(1, " → ".join(label for _, label, _ in funcs), context):
+                out = SignalProcessing.run_chunked_pipeline(
+                    steps, zarr_in, zarr_out, allow_overwrite=True, progress_cb=on_progress
+                )
+                context["data"] = zarr.open(out, mode="r")["amplitude"]
+        except Exception as exc:
+            QtWidgets.QMessageBox.warning(self, "Processing", f"Job failed:\n{exc}")
+            return
+        finally:
+            progress.close()
+            self.report_btn.setEnabled(True)
+        QtWidgets.QMessageBox.information(self, "Processing", f"Job finished.\nOutput written to:\n{out}")
+
+    def _load_context(self, manifest: Path, handle=None) -> dict:
         context = {}
         try:
             data = json.loads(manifest.read_text())
             zarr_path = data.get("zarr_store")
             geom_path = data.get("geometry_parquet")
-            import pandas as pd, zarr
 
             if geom_path:
-                context["geometry"] = pd.read_parquet(geom_path)
+                context["geometry"] = read_geometry(geom_path, handle=handle)
                 context["_geometry_path"] = geom_path
             if zarr_path:
-                context["data"] = zarr.open(zarr_path, mode="r")["amplitude"][:]
+                context["data"] = read_amplitude(zarr_path, handle=handle)
+        except LoadCancelled:
+            raise
         except Exception:
             pass
         return context
@@ -529,6 +681,6 @@ def show_processing(window):
         QtWidgets.QMessageBox.warning(window, "Processing", "Please select a survey first.")
         return
     manifests = [p for p in _list_manifests(window.currentSurveyPath) if p.exists()]
-    widget = ProcessingPanel(manifests)
+    widget = ProcessingPanel(manifests, cache_dir=Path(window.currentSurveyPath) / "Cache")
     window.tabWidget.addTab(widget, "Processing")
     window.tabWidget.setCurrentWidget(widget)
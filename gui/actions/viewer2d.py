@@ -10,6 +10,19 @@ from matplotlib.figure import Figure
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_qtagg import NavigationToolbar2QT
 from openseismicprocessing.catalog import list_projects
+from openseismicprocessing.zarr_utils import (
+    AmplitudeStats,
+    CachedArray,
+    TraceHeaderIndex,
+    _geometry_column_names,
+    load_trace_index,
+    open_overviews,
+    read_geometry_rows,
+    read_traces,
+    select_overview,
+)
+
+from .loader import load_service, read_geometry
 
 
 class Viewer2D(QtWidgets.QWidget):
@@ -17,10 +30,14 @@ class Viewer2D(QtWidgets.QWidget):
         super().__init__(parent)
         self.manifests = manifests
         self.boundary = boundary
-        self.geom_df = None
+        self.geom_path = None
         self.amp = None
+        self.levels = []
+        self.amp_stats = None
+        self._section = None
         self.inline_col = None
         self.xline_col = None
+        self.trace_indexes = {}
         self.current_orientation = "inline"
 
         layout = QtWidgets.QHBoxLayout(self)
@@ -100,6 +117,8 @@ class Viewer2D(QtWidgets.QWidget):
 
         self.figure = Figure(figsize=(8, 6))
         self.canvas = FigureCanvas(self.figure)
+        self.toolbar = NavigationToolbar2QT(self.canvas, self)
+        right_side.addWidget(self.toolbar)
         right_side.addWidget(self.canvas)
 
         main_right.addLayout(right_side)
@@ -144,45 +163,93 @@ class Viewer2D(QtWidgets.QWidget):
         if "post" not in dtype:
             QtWidgets.QMessageBox.information(self, "2D Viewer", "Pre-stack datasets are not shown here.")
             return
-        try:
-            self.geom_df = pd.read_parquet(geom_path) if geom_path else None
-        except Exception as exc:
-            QtWidgets.QMessageBox.warning(self, "2D Viewer", f"Failed to read geometry:\n{exc}")
-            return
-        try:
-            self.amp = zarr.open(zarr_path, mode="r")["amplitude"] if zarr_path else None
-        except Exception as exc:
-            QtWidgets.QMessageBox.warning(self, "2D Viewer", f"Failed to open Zarr store:\n{exc}")
-            return
 
-        def find_col(df, names):
+        def find_col(columns, names):
             for n in names:
-                if n in df.columns:
+                if n in columns:
                     return n
-            lowmap = {c.lower(): c for c in df.columns}
+            lowmap = {c.lower(): c for c in columns}
             for n in names:
                 if n.lower() in lowmap:
                     return lowmap[n.lower()]
             return None
 
-        self.inline_col = selected_headers.get("inline_header") or find_col(self.geom_df, ["iline", "inline"])
-        self.xline_col = selected_headers.get("xline_header") or find_col(self.geom_df, ["xline", "crossline"])
-        self.z_start = float(selected_headers.get("z_start", 0.0) or 0.0)
-        self.z_inc = float(selected_headers.get("z_increment", 1.0) or 1.0)
-        if self.inline_col is None or self.xline_col is None:
-            QtWidgets.QMessageBox.warning(self, "2D Viewer", "Inline/Crossline headers not found.")
-            return
-        self.compute_global_limits(force=True)
-        self.change_orientation()
+        def open_dataset(handle):
+            try:
+                # Header names from the Parquet schema or CSV header; section rows are read on demand
+                columns = _geometry_column_names(Path(geom_path)) if geom_path else []
+            except Exception as exc:
+                raise RuntimeError(f"Failed to read geometry:\n{exc}") from exc
+            try:
+                # Reads go through the shared chunk cache, so revisited sections are not decompressed again
+                amp = CachedArray(zarr.open(zarr_path, mode="r")["amplitude"]) if zarr_path else None
+                levels = open_overviews(zarr_path) if zarr_path else []
+                for level in levels:
+                    level["array"] = CachedArray(level["array"])
+                amp_stats = AmplitudeStats.load(zarr_path) if zarr_path else None
+            except Exception as exc:
+                raise RuntimeError(f"Failed to open Zarr store:\n{exc}") from exc
+            inline_col = selected_headers.get("inline_header") or find_col(columns, ["iline", "inline"])
+            xline_col = selected_headers.get("xline_header") or find_col(columns, ["xline", "crossline"])
+            if inline_col is None or xline_col is None:
+                raise RuntimeError("Inline/Crossline headers not found.")
+            # Sections come from the ingest's index sidecars; index in memory if they are missing or stale
+            trace_indexes = {}
+            for col in (inline_col, xline_col):
+                handle.check()
+                index = load_trace_index(geom_path, col)
+                if index is None:
+                    values = read_geometry(geom_path, columns=[col], handle=handle)[col].to_numpy()
+                    index = TraceHeaderIndex.build(values, col)
+                trace_indexes[col] = index
+            try:
+                limits = _amplitude_limits(amp, levels, amp_stats) if amp is not None else None
+            except Exception:
+                limits = None
+            return {
+                "geom_path": Path(geom_path) if geom_path else None,
+                "amp": amp,
+                "levels": levels,
+                "amp_stats": amp_stats,
+                "inline_col": inline_col,
+                "xline_col": xline_col,
+                "trace_indexes": trace_indexes,
+                "limits": limits,
+            }
+
+        def opened(dataset):
+            if self.current_manifest != manifest_path:
+                return  # unchecked while loading
+            self.geom_path = dataset["geom_path"]
+            self.amp = dataset["amp"]
+            self.levels = dataset["levels"]
+            self.amp_stats = dataset["amp_stats"]
+            self.inline_col = dataset["inline_col"]
+            self.xline_col = dataset["xline_col"]
+            self.trace_indexes = dataset["trace_indexes"]
+            self.z_start = float(selected_headers.get("z_start", 0.0) or 0.0)
+            self.z_inc = float(selected_headers.get("z_increment", 1.0) or 1.0)
+            self._set_global_limits(dataset["limits"])
+            self.change_orientation()
+
+        # Opening the store and building the section indexes runs off the Qt thread;
+        # checking another dataset meanwhile replaces this load
+        load_service().submit(
+            open_dataset,
+            on_done=opened,
+            on_error=lambda exc: QtWidgets.QMessageBox.warning(self, "2D Viewer", str(exc)),
+            key=self,
+            label="2D Viewer",
+        )
 
     def change_orientation(self):
         self.current_orientation = self.orient_combo.currentText()
-        if self.geom_df is None:
+        if self.geom_path is None:
             return
         if self.current_orientation == "inline":
-            values = np.unique(self.geom_df[self.inline_col].to_numpy())
+            values = self.trace_indexes[self.inline_col].values
         else:
-            values = np.unique(self.geom_df[self.xline_col].to_numpy())
+            values = self.trace_indexes[self.xline_col].values
         self.section_values = values
         self._update_slider_labels()
         if len(values) == 0:
@@ -193,39 +260,37 @@ class Viewer2D(QtWidgets.QWidget):
         self.update_section()
 
     def update_section(self):
-        if self.geom_df is None or self.amp is None:
+        if self.geom_path is None or self.amp is None:
             return
         if self.slider.maximum() < 0:
             return
         idx = self.slider.value()
         if self.current_orientation == "inline":
             target = self.section_values[idx]
-            mask = self.geom_df[self.inline_col] == target
+            rows = self.trace_indexes[self.inline_col].lookup(target)
             order_col = self.xline_col
         else:
             target = self.section_values[idx]
-            mask = self.geom_df[self.xline_col] == target
+            rows = self.trace_indexes[self.xline_col].lookup(target)
             order_col = self.inline_col
-        subset = self.geom_df[mask].copy()
+        subset = read_geometry_rows(self.geom_path, rows)
         if subset.empty:
             return
         subset = subset.sort_values(order_col)
         trace_ids = subset["trace_id"].to_numpy()
-        try:
-            data = self.amp.oindex[:, trace_ids]
-        except Exception:
-            data = self.amp[:, trace_ids]
-        img = data
+        order_values = subset[order_col].to_numpy(dtype=float)
+        self._section = {"trace_ids": trace_ids, "x0": order_values[0], "x1": order_values[-1], "key": None}
+        img, span = self._read_section(0, len(trace_ids), 0, self.amp.shape[0])
         vmin = self.vmin_spin.value()
         vmax = self.vmax_spin.value()
         cmap = self.cmap_combo.currentText()
         self.figure.clear()
         ax = self.figure.add_subplot(111)
         im = ax.imshow(img, aspect="auto", cmap=cmap, vmin=vmin, vmax=vmax, origin="upper")
-        y_spacing = getattr(self, "z_inc", 1.0)
-        y_start = getattr(self, "z_start", 0.0)
-        y_end = y_start + (img.shape[0] - 1) * y_spacing
-        ax.images[0].set_extent([subset[order_col].iloc[0], subset[order_col].iloc[-1], y_end, y_start])
+        im.set_extent(self._section_extent(span))
+        self._section["image"] = im
+        ax.callbacks.connect("xlim_changed", self._on_section_zoom)
+        ax.callbacks.connect("ylim_changed", self._on_section_zoom)
         ax.set_xlabel(order_col)
         ax.set_ylabel("Z")
         try:
@@ -239,6 +304,75 @@ class Viewer2D(QtWidgets.QWidget):
         self._plot_map(subset)
         self._update_slider_labels(current=target)
 
+    def _read_section(self, i0: int, i1: int, s0: int, s1: int, skip_key=None):
+        """Samples ``s0:s1`` of section columns ``i0:i1`` at the coarsest level that still fills the canvas.
+
+        Overviews decimate consecutive traces, so they are only used when the
+        section is a contiguous trace range (e.g. inlines of an inline-sorted store).
+        Returns the data and the ``(first column, last column, first sample, last sample)`` it
+        covers, or ``None`` when that read is ``skip_key`` (already on screen).
+        """
+        trace_ids = self._section["trace_ids"]
+        level = self.levels[0] if self.levels else None
+        if len(self.levels) > 1 and np.all(np.diff(trace_ids) == 1):
+            level = select_overview(self.levels, s1 - s0, i1 - i0, self.canvas.height(), self.canvas.width())
+        if level is None or level["trace_factor"] == level["sample_factor"] == 1:
+            key = (1, 1, i0, i1, s0, s1)
+            if key == skip_key:
+                return None
+            self._section["key"] = key
+            ids = trace_ids[i0:i1]
+            data = read_traces(self.amp, ids, slice(s0, s1))
+            return data, (i0, i1 - 1, s0, s1 - 1)
+        fs, ft = level["sample_factor"], level["trace_factor"]
+        first = int(trace_ids[0])
+        c0, c1 = (first + i0) // ft, -(-(first + i1) // ft)
+        r0, r1 = s0 // fs, -(-s1 // fs)
+        key = (fs, ft, c0, c1, r0, r1)
+        if key == skip_key:
+            return None
+        self._section["key"] = key
+        data = level["array"][r0:r1, c0:c1]
+        last_col = min(c1 * ft, first + len(trace_ids)) - first - 1
+        last_sample = min(r1 * fs, self.amp.shape[0]) - 1
+        return data, (max(c0 * ft - first, 0), last_col, r0 * fs, last_sample)
+
+    def _section_extent(self, span):
+        i0, i1, s0, s1 = span
+        n = len(self._section["trace_ids"])
+        dx = (self._section["x1"] - self._section["x0"]) / max(n - 1, 1)
+        y_spacing = getattr(self, "z_inc", 1.0)
+        y_start = getattr(self, "z_start", 0.0)
+        x0 = self._section["x0"]
+        return [x0 + i0 * dx, x0 + i1 * dx, y_start + s1 * y_spacing, y_start + s0 * y_spacing]
+
+    def _on_section_zoom(self, ax):
+        """Reload the visible part of the section at the resolution the zoom level needs."""
+        if self._section is None or "image" not in self._section:
+            return
+        n = len(self._section["trace_ids"])
+        ns = self.amp.shape[0]
+        dx = (self._section["x1"] - self._section["x0"]) / max(n - 1, 1) or 1.0
+        y_spacing = getattr(self, "z_inc", 1.0) or 1.0
+        y_start = getattr(self, "z_start", 0.0)
+        xs = sorted((np.array(ax.get_xlim()) - self._section["x0"]) / dx)
+        ys = sorted((np.array(ax.get_ylim()) - y_start) / y_spacing)
+        i0, i1 = max(0, int(np.floor(xs[0]))), min(n, int(np.ceil(xs[1])) + 1)
+        s0, s1 = max(0, int(np.floor(ys[0]))), min(ns, int(np.ceil(ys[1])) + 1)
+        if i1 <= i0 or s1 <= s0:
+            return
+        section = self._read_section(i0, i1, s0, s1, skip_key=self._section["key"])
+        if section is None:
+            return
+        data, span = section
+        xlim, ylim = ax.get_xlim(), ax.get_ylim()
+        image = self._section["image"]
+        image.set_data(data)
+        image.set_extent(self._section_extent(span))
+        ax.set_xlim(xlim)
+        ax.set_ylim(ylim)
+        self.canvas.draw_idle()
+
     def apply_global_limits(self):
         self.compute_global_limits(force=True)
         self.update_section()
@@ -246,22 +380,26 @@ class Viewer2D(QtWidgets.QWidget):
     def compute_global_limits(self, force: bool = False):
         if self.amp is None:
             return
+        if not force and hasattr(self, "_global_vmin") and hasattr(self, "_global_vmax"):
+            return
         try:
-            if not force and hasattr(self, "_global_vmin") and hasattr(self, "_global_vmax"):
-                return
-            arr = self.amp[:]
-            vmin = float(np.nanmin(arr))
-            vmax = float(np.nanmax(arr))
-            self._global_vmin = vmin
-            self._global_vmax = vmax
-            self.vmin_spin.blockSignals(True)
-            self.vmax_spin.blockSignals(True)
-            self.vmin_spin.setValue(vmin)
-            self.vmax_spin.setValue(vmax)
-            self.vmin_spin.blockSignals(False)
-            self.vmax_spin.blockSignals(False)
+            limits = _amplitude_limits(self.amp, self.levels, self.amp_stats)
         except Exception:
-            pass
+            return
+        self._set_global_limits(limits)
+
+    def _set_global_limits(self, limits):
+        if limits is None:
+            return
+        vmin, vmax = limits
+        self._global_vmin = vmin
+        self._global_vmax = vmax
+        self.vmin_spin.blockSignals(True)
+        self.vmax_spin.blockSignals(True)
+        self.vmin_spin.setValue(vmin)
+        self.vmax_spin.setValue(vmax)
+        self.vmin_spin.blockSignals(False)
+        self.vmax_spin.blockSignals(False)
 
     def _clear_map(self):
         self.map_fig.clear()
@@ -337,6 +475,19 @@ class Viewer2D(QtWidgets.QWidget):
             return False
 
 
+def _amplitude_limits(amp, levels, amp_stats) -> tuple[float, float]:
+    """Colour limits from the ingest statistics, else from the coarsest overview (or the full amplitude)."""
+    if amp_stats is not None:
+        return amp_stats.range()
+    level = levels[-1] if levels else {"array": amp, "method": None}
+    arr = level["array"][:]
+    vmin = float(np.nanmin(arr))
+    vmax = float(np.nanmax(arr))
+    if level["method"] == "rms":
+        vmin = -vmax
+    return vmin, vmax
+
+
 def _list_manifests(survey_path: str | Path) -> list[Path]:
     bin_dir = Path(survey_path) / "Binaries"
     if not bin_dir.exists():
@@ -1,3 +1,5 @@
+from collections import OrderedDict
+import functools
 from pathlib import Path
 import json
 
@@ -8,9 +10,19 @@ from PyQt6 import QtCore, QtWidgets
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_qtagg import NavigationToolbar2QT
-from openseismicprocessing import processing
 from openseismicprocessing._plotting import plot_seismic_image
 from openseismicprocessing.catalog import list_projects
+from openseismicprocessing.zarr_utils import (
+    AmplitudeStats,
+    CachedArray,
+    TraceHeaderIndex,
+    _geometry_column_names,
+    load_trace_index,
+    read_geometry_rows,
+    read_traces,
+)
+
+from .loader import LoadCancelled, load_service, read_geometry
 
 
 def _list_manifests(survey_path: str | Path) -> list[Path]:
@@ -28,6 +40,123 @@ def _dataset_type(manifest: Path) -> str:
         return ""
 
 
+def _read_gather(amp, geom_path: Path, trace_index: TraceHeaderIndex, idx: int):
+    """Amplitudes and geometry rows of gather ``idx`` of ``trace_index`` (runs on prefetch threads)."""
+    target = trace_index.values[idx]
+    trace_indices = trace_index.lookup(target)
+    span = trace_index.trace_slice(target)
+    data = amp[:, span] if span is not None else read_traces(amp, trace_indices)
+    # Only the row groups holding the gather are read
+    return data, read_geometry_rows(geom_path, trace_indices)
+
+
+class _GatherJob(QtCore.QRunnable):
+    """Load one gather off the Qt thread and report it through the prefetcher's signal."""
+
+    def __init__(self, prefetcher: "GatherPrefetcher", generation: int, idx: int, loader):
+        super().__init__()
+        self.prefetcher = prefetcher
+        self.generation = generation
+        self.idx = idx
+        self.loader = loader
+
+    def run(self):
+        # Requests from before a jump are dropped here rather than decoded
+        if not self.prefetcher.wanted(self.generation, self.idx):
+            self.prefetcher.loaded.emit(self.generation, self.idx, None)
+            return
+        try:
+            payload = self.loader(self.idx)
+        except Exception as exc:
+            payload = exc
+        self.prefetcher.loaded.emit(self.generation, self.idx, payload)
+
+
+class GatherPrefetcher(QtCore.QObject):
+    """Load the requested gather and its ``radius`` neighbours on a thread pool.
+
+    Loaded gathers are kept in a small LRU (``max_gathers``) and announced with
+    ``gatherReady(idx)`` on the GUI thread. A jump further than ``radius``
+    starts a new generation: queued loads are cancelled and running ones are
+    discarded when they finish.
+    """
+
+    loaded = QtCore.pyqtSignal(int, int, object)
+    gatherReady = QtCore.pyqtSignal(int)
+    gatherFailed = QtCore.pyqtSignal(int, str)
+
+    def __init__(self, parent=None, radius: int = 2, max_gathers: int = 12, threads: int = 2):
+        super().__init__(parent)
+        self.radius = int(radius)
+        self.max_gathers = max(int(max_gathers), 2 * self.radius + 1)
+        self.pool = QtCore.QThreadPool(self)
+        self.pool.setMaxThreadCount(threads)
+        self._loader = None
+        self._gathers: "OrderedDict[int, object]" = OrderedDict()
+        self._pending: set[int] = set()
+        self._generation = 0
+        self._center = None
+        self.loaded.connect(self._on_loaded)
+
+    def reset(self, loader=None):
+        """Forget every gather and cancel queued loads; ``loader(idx)`` loads gathers from now on."""
+        self._generation += 1
+        self.pool.clear()
+        self._loader = loader
+        self._gathers.clear()
+        self._pending.clear()
+        self._center = None
+
+    def wanted(self, generation: int, idx: int) -> bool:
+        center = self._center
+        return generation == self._generation and center is not None and abs(idx - center) <= self.radius
+
+    def get(self, idx: int):
+        payload = self._gathers.get(idx)
+        if payload is not None:
+            self._gathers.move_to_end(idx)
+        return payload
+
+    def request(self, idx: int, count: int):
+        """Make ``idx`` current: load it first, then its neighbours nearest first."""
+        if self._loader is None:
+            return
+        if self._center is not None and abs(idx - self._center) > self.radius:
+            self._generation += 1
+            self.pool.clear()
+            self._pending.clear()
+        self._center = idx
+        order = [idx]
+        for step in range(1, self.radius + 1):
+            order += [idx + step, idx - step]
+        for priority, target in enumerate(order):
+            if 0 <= target < count and target not in self._gathers and target not in self._pending:
+                self._pending.add(target)
+                job = _GatherJob(self, self._generation, target, self._loader)
+                self.pool.start(job, -priority)
+
+    def wait(self, msecs: int = -1) -> bool:
+        """Block until running loads finish (used on dataset switch and in scripts)."""
+        done = self.pool.waitForDone(msecs)
+        QtCore.QCoreApplication.processEvents()
+        return done
+
+    def _on_loaded(self, generation: int, idx: int, payload):
+        if generation != self._generation:
+            return
+        self._pending.discard(idx)
+        if payload is None:
+            return
+        if isinstance(payload, Exception):
+            self.gatherFailed.emit(idx, str(payload))
+            return
+        self._gathers[idx] = payload
+        self._gathers.move_to_end(idx)
+        while len(self._gathers) > self.max_gathers:
+            self._gathers.popitem(last=False)
+        self.gatherReady.emit(idx)
+
+
 class PrestackViewer(QtWidgets.QWidget):
     def __init__(self, parent, manifests, boundary=None):
         super().__init__(parent)
@@ -35,13 +164,20 @@ class PrestackViewer(QtWidgets.QWidget):
         self.boundary = boundary
         self.current_manifest = None
         self.manifest_meta = {}
-        self.geom_df = None
+        self.geom_path = None
         self.amp = None
+        self.amp_stats = None
+        self.trace_index = None
         self._current_subset_data: np.ndarray | None = None
         self._current_subset_df: pd.DataFrame | None = None
         self._current_header1: str | None = None
         self._current_header2: str | None = None
         self._current_target = None
+        self._shown_idx = None
+        # Gathers around the slider position are decoded in the background
+        self.prefetcher = GatherPrefetcher(self)
+        self.prefetcher.gatherReady.connect(self._on_gather_ready)
+        self.prefetcher.gatherFailed.connect(self._on_gather_failed)
 
         layout = QtWidgets.QHBoxLayout(self)
 
@@ -156,8 +292,11 @@ class PrestackViewer(QtWidgets.QWidget):
                 self.header1_combo.addItem("Select header")
                 self.header2_combo.addItem("Select header")
                 self.placeholder.setText("Select a dataset to configure headers.")
-                self.geom_df = None
+                self.geom_path = None
                 self.amp = None
+                self.trace_index = None
+                self.prefetcher.reset()
+                self._shown_idx = None
                 self.slider.blockSignals(True)
                 self.slider.setMaximum(0)
                 self.slider.setValue(0)
@@ -176,20 +315,21 @@ class PrestackViewer(QtWidgets.QWidget):
             QtWidgets.QMessageBox.warning(self, "Pre-stack Viewer", "Geometry path missing in manifest.")
             return
         try:
-            df = pd.read_parquet(geom_path)
+            # Only the header names (Parquet schema or CSV header), not the table
+            columns = _geometry_column_names(Path(geom_path))
         except Exception as exc:
             QtWidgets.QMessageBox.warning(self, "Pre-stack Viewer", f"Failed to read geometry:\n{exc}")
             return
-        self.geom_df = df
-        headers = [str(c) for c in df.columns]
+        self.geom_path = None
+        headers = [str(c) for c in columns]
         self.header1_combo.blockSignals(True)
         self.header2_combo.blockSignals(True)
         self.header1_combo.clear()
         self.header2_combo.clear()
         self.header1_combo.addItems(headers)
         self.header2_combo.addItems(headers)
-        default_h1 = "fldr" if "fldr" in df.columns else headers[0] if headers else ""
-        default_h2 = "tracf" if "tracf" in df.columns else headers[1] if len(headers) > 1 else default_h1
+        default_h1 = "fldr" if "fldr" in headers else headers[0] if headers else ""
+        default_h2 = "tracf" if "tracf" in headers else headers[1] if len(headers) > 1 else default_h1
         if default_h1:
             idx1 = self.header1_combo.findText(default_h1)
             self.header1_combo.setCurrentIndex(idx1 if idx1 >= 0 else 0)
@@ -222,63 +362,110 @@ class PrestackViewer(QtWidgets.QWidget):
         if not geom_path or not zarr_path:
             QtWidgets.QMessageBox.warning(self, "Pre-stack Viewer", "Manifest is missing required paths.")
             return
-        try:
-            self.geom_df = pd.read_parquet(geom_path)
-            self.amp = zarr.open(zarr_path, mode="r")["amplitude"]
-        except Exception as exc:
-            QtWidgets.QMessageBox.warning(self, "Pre-stack Viewer", f"Failed to load data:\n{exc}")
-            return
-        self.z_start = float(selected_headers.get("z_start", 0.0) or 0.0)
-        self.z_inc = float(selected_headers.get("z_increment", 1.0) or 1.0)
-        self.source_x_header = selected_headers.get("source_x_header")
-        self.source_y_header = selected_headers.get("source_y_header")
-        self.group_x_header = selected_headers.get("group_x_header")
-        self.group_y_header = selected_headers.get("group_y_header")
-        try:
-            context = {"geometry": self.geom_df.copy(), "data": self.amp[:]}
-            processing.sort(context, header1, header2)
-            self.geom_df = context["geometry"]
-            self.amp = context["data"]
-            self._header1_values = np.unique(self.geom_df[header1].to_numpy())
+        manifest = self.current_manifest
+
+        def open_dataset(handle):
+            try:
+                # Reads go through the shared chunk cache, so revisited gathers are not decompressed again
+                amp = CachedArray(zarr.open(zarr_path, mode="r")["amplitude"])
+                amp_stats = AmplitudeStats.load(zarr_path)
+            except Exception as exc:
+                raise RuntimeError(f"Failed to load data:\n{exc}") from exc
+            try:
+                # Gathers come from the ingest's index sidecar; index in memory if it is missing or stale
+                trace_index = load_trace_index(geom_path, header1)
+                if trace_index is None:
+                    column = read_geometry(geom_path, columns=[header1], handle=handle)[header1]
+                    trace_index = TraceHeaderIndex.build(column.to_numpy(), header1)
+            except LoadCancelled:
+                raise
+            except Exception as exc:
+                raise RuntimeError(f"Failed to index data:\n{exc}") from exc
+            return amp, amp_stats, trace_index
+
+        def opened(dataset):
+            if self.current_manifest != manifest:
+                return
+            self.amp, self.amp_stats, self.trace_index = dataset
+            self.geom_path = Path(geom_path)
+            self.z_start = float(selected_headers.get("z_start", 0.0) or 0.0)
+            self.z_inc = float(selected_headers.get("z_increment", 1.0) or 1.0)
+            self.source_x_header = selected_headers.get("source_x_header")
+            self.source_y_header = selected_headers.get("source_y_header")
+            self.group_x_header = selected_headers.get("group_x_header")
+            self.group_y_header = selected_headers.get("group_y_header")
+            self._header1_values = self.trace_index.values
+            self.prefetcher.reset(functools.partial(_read_gather, self.amp, self.geom_path, self.trace_index))
+            self._shown_idx = None
             self.slider.blockSignals(True)
             max_idx = len(self._header1_values) - 1 if len(self._header1_values) > 0 else 0
             self.slider.setMaximum(max_idx)
             self.slider.setValue(0)
             self.slider.blockSignals(False)
             self._update_slider_labels()
-        except Exception as exc:
-            QtWidgets.QMessageBox.warning(self, "Pre-stack Viewer", f"Failed to sort data:\n{exc}")
-            return
-        name = self.current_manifest.stem.replace(".zarr", "").replace(".manifest", "")
-        self.placeholder.setText(
-            f"Loaded dataset: {name}\nHeader1: {header1}, Header2: {header2}\n(Plotting not implemented yet.)"
+            name = manifest.stem.replace(".zarr", "").replace(".manifest", "")
+            self.placeholder.setText(
+                f"Loaded dataset: {name}\nHeader1: {header1}, Header2: {header2}\n(Plotting not implemented yet.)"
+            )
+            # Display first slice
+            self.on_slider_changed(0)
+
+        self.placeholder.setText(f"Loading {header1} index...")
+        # Opening the store and indexing header1 runs off the Qt thread; applying again replaces this load
+        load_service().submit(
+            open_dataset,
+            on_done=opened,
+            on_error=lambda exc: QtWidgets.QMessageBox.warning(self, "Pre-stack Viewer", str(exc)),
+            key=self,
+            label="Pre-stack Viewer",
         )
-        # Display first slice
-        self.on_slider_changed(0)
 
     def on_slider_changed(self, idx: int):
         if getattr(self, "_header1_values", None) is None:
             return
-        if self.geom_df is None or self.amp is None:
+        if self.geom_path is None or self.amp is None or self.trace_index is None:
             return
         if len(self._header1_values) == 0:
             return
         if idx < 0 or idx >= len(self._header1_values):
             return
         header1 = self.header1_combo.currentText()
-        header2 = self.header2_combo.currentText()
         target = self._header1_values[idx]
         self._update_slider_labels(current=target)
-        mask = self.geom_df[header1] == target
-        subset = self.geom_df[mask]
-        trace_indices = subset.index.to_numpy()
-        if len(trace_indices) == 0:
+        # Served from the prefetched neighbours when possible; otherwise shown once loaded
+        payload = self.prefetcher.get(idx)
+        self.prefetcher.request(idx, len(self._header1_values))
+        if payload is None:
+            self.placeholder.setText(f"Loading {header1}={target}...")
             return
+        self._show_gather(idx, payload)
+
+    def _on_gather_ready(self, idx: int):
+        if idx == self.slider.value() and idx != self._shown_idx:
+            self._show_gather(idx, self.prefetcher.get(idx))
+
+    def _on_gather_failed(self, idx: int, message: str):
+        if idx == self.slider.value():
+            header1 = self.header1_combo.currentText()
+            self.placeholder.setText(f"Selected {header1}={self._header1_values[idx]} (load failed: {message}).")
+
+    def _show_gather(self, idx: int, payload):
+        header1 = self.header1_combo.currentText()
+        header2 = self.header2_combo.currentText()
+        target = self._header1_values[idx]
+        subset_data, subset = payload
+        if subset_data.shape[1] == 0:
+            return
+        self._shown_idx = idx
         try:
-            subset_data = self.amp[:, trace_indices]
+            # Geometry rows are amplitude columns; order the gather by header2
+            if header2 in subset.columns:
+                order = np.argsort(subset[header2].to_numpy(), kind="stable")
+                subset = subset.iloc[order]
+                subset_data = subset_data[:, order]
             self._plot_gather(subset_data, subset.copy(), header1, header2, target)
             self.placeholder.setText(
-                f"Selected {header1}={target} with {len(trace_indices)} traces."
+                f"Selected {header1}={target} with {subset_data.shape[1]} traces."
             )
             self._current_subset_data = subset_data
             self._current_subset_df = subset.copy()
@@ -290,7 +477,7 @@ class PrestackViewer(QtWidgets.QWidget):
             self._update_autocorr_plot()
         except Exception:
             self.placeholder.setText(
-                f"Selected {header1}={target} with {len(trace_indices)} traces (plot failed)."
+                f"Selected {header1}={target} with {subset_data.shape[1]} traces (plot failed)."
             )
 
     def _plot_gather(self, data: np.ndarray, geom_df: pd.DataFrame, header1: str, header2: str, target):
@@ -304,7 +491,12 @@ class PrestackViewer(QtWidgets.QWidget):
         # Auto-scale using user-selected percentile to dampen outliers
         perc = self.perc_spin.value()
         vmin = vmax = None
-        if perc > 0:
+        if perc > 0 and self.amp_stats is not None:
+            # Estimated from the stored chunk histograms of the gather's traces (geometry rows)
+            clip = float(self.amp_stats.percentile(perc, geom_df.index.to_numpy()))
+            vmin = -clip
+            vmax = clip
+        elif perc > 0:
             clip = float(np.nanpercentile(data, perc))
             vmin = -clip
             vmax = clip
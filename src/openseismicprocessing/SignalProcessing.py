@@ -29,7 +29,11 @@ from .processing import (
 
 from .pipeline import (
     run_pipeline,
-    print_pipeline_steps
+    run_chunked_pipeline,
+    run_pipeline_graph,
+    print_pipeline_steps,
+    PipelineReport,
+    StepCache
 )
 
 from .plotting import (
@@ -41,10 +45,27 @@ from .plotting import (
 
 from .zarr_utils import (
     segy_directory_to_zarr,
+    plan_chunk_shape,
     load_zarr_amplitude,
     load_zarr_datasets,
     preview_zarr_headers,
     preview_segy_headers,
+    scan_segy_files,
+    TraceHeaderIndex,
+    build_trace_index,
+    load_trace_index,
+    select_traces,
+    read_geometry_rows,
+    read_traces,
+    ChunkCache,
+    CachedArray,
+    CHUNK_CACHE,
+    reorganize_zarr,
+    build_overviews,
+    open_overviews,
+    select_overview,
+    AmplitudeStats,
+    compute_amplitude_stats,
     extract_zarr_text_headers,
     extract_zarr_binary_headers,
     slice_zarr_by_header,
@@ -56,7 +77,7 @@ from .zarr_utils import (
 __all__ = [
     # I/O
     "read_data", "write_data", "import_npy_mmap", "import_parquet_file", "get_text_header", "get_trace_header", "get_trace_data",
-    "get_binary_header", "store_geometry_as_parquet", "segy_directory_to_zarr", "load_zarr_amplitude", "load_zarr_datasets", "preview_zarr_headers", "preview_segy_headers", "extract_zarr_text_headers", "extract_zarr_binary_headers", "slice_zarr_by_header", "slice_zarr_by_expression", "scale_zarr_coordinate_units",
+    "get_binary_header", "store_geometry_as_parquet", "segy_directory_to_zarr", "plan_chunk_shape", "load_zarr_amplitude", "load_zarr_datasets", "preview_zarr_headers", "preview_segy_headers", "scan_segy_files", "TraceHeaderIndex", "build_trace_index", "load_trace_index", "select_traces", "read_geometry_rows", "read_traces", "ChunkCache", "CachedArray", "CHUNK_CACHE", "reorganize_zarr", "build_overviews", "open_overviews", "select_overview", "AmplitudeStats", "compute_amplitude_stats", "extract_zarr_text_headers", "extract_zarr_binary_headers", "slice_zarr_by_header", "slice_zarr_by_expression", "scale_zarr_coordinate_units",
 
 
     # Processing
@@ -66,7 +87,7 @@ __all__ = [
     "kill_traces_outside_box",
 
     # Pipeline
-    "run_pipeline", "print_pipeline_steps",
+    "run_pipeline", "run_chunked_pipeline", "run_pipeline_graph", "print_pipeline_steps", "PipelineReport", "StepCache",
 
     # Plotting
     "plot_seismic_image", "plot_seismic_comparison_with_trace", "plot_spectrum", "plot_acquisition", "plot_seismic_image_interactive"
@@ -0,0 +1,279 @@
+import ast
+import functools
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import numexpr as ne
+except ImportError:  # pragma: no cover - optional dependency
+    ne = None
+
+# Rows evaluated at a time: temporaries stay around a few MB whatever the column length
+EXPRESSION_CHUNK_ROWS = 1 << 18
+
+# Element-wise functions: safe to evaluate chunk by chunk (bare name or ``np.<name>``)
+ELEMENTWISE_FUNCS = {
+    name: getattr(np, name)
+    for name in (
+        "abs", "absolute", "sqrt", "square", "log", "log10", "log2", "exp", "sin", "cos", "tan",
+        "arcsin", "arccos", "arctan", "arctan2", "hypot", "floor", "ceil", "round", "rint", "trunc",
+        "sign", "minimum", "maximum", "where", "isin", "isnan", "isfinite", "mod", "fmod", "radians",
+        "degrees", "clip",
+    )
+}
+# Functions that need whole columns (reductions, factorizations)
+WHOLE_COLUMN_FUNCS = {
+    "min": np.min, "max": np.max, "mean": np.mean, "std": np.std, "sum": np.sum, "median": np.median,
+    "unique": np.unique, "factorize": pd.factorize,
+}
+# Subset of ELEMENTWISE_FUNCS that numexpr knows under the same name
+NUMEXPR_FUNCS = {
+    "abs", "sqrt", "log", "log10", "exp", "sin", "cos", "tan", "arcsin", "arccos", "arctan",
+    "arctan2", "where", "floor", "ceil",
+}
+# Column dtypes numexpr evaluates without changing their values (it maps uint64 to int64)
+NUMEXPR_DTYPES = {np.dtype(t) for t in (np.bool_, np.int32, np.int64, np.float32, np.float64)}
+
+
+class ExpressionError(ValueError):
+    """The expression uses syntax the header-expression engine does not evaluate."""
+
+
+class _Normalize(ast.NodeTransformer):
+    """Turn ``and``/``or``/``not`` and chained comparisons into ``&``/``|``/``~`` so they work on arrays."""
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        if len(node.ops) == 1:
+            return node
+        operands = [node.left, *node.comparators]
+        pairs = [
+            ast.Compare(left=left, ops=[op], comparators=[right])
+            for left, op, right in zip(operands, node.ops, operands[1:])
+        ]
+        expr = pairs[0]
+        for pair in pairs[1:]:
+            expr = ast.BinOp(left=expr, op=ast.BitAnd(), right=pair)
+        return expr
+
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        op = ast.BitAnd() if isinstance(node.op, ast.And) else ast.BitOr()
+        expr = node.values[0]
+        for value in node.values[1:]:
+            expr = ast.BinOp(left=expr, op=op, right=value)
+        return expr
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return ast.UnaryOp(op=ast.Invert(), operand=node.operand)
+        return node
+
+
+@dataclass
+class HeaderExpression:
+    """A parsed header expression: which columns it reads and how to evaluate it.
+
+    ``columns`` are the header names it references. ``elementwise`` expressions
+    are evaluated a block of rows at a time (with numexpr when it is installed),
+    so temporaries stay block-sized; others (``mean``, ``unique``, ...) need whole
+    columns. ``bounds`` holds the ``(low, high)`` range each column must fall in
+    for a top-level ``and`` of comparisons to be true, used to skip Parquet row
+    groups from their statistics.
+    """
+
+    source: str
+    columns: Tuple[str, ...]
+    elementwise: bool
+    code: object
+    numexpr_source: Optional[str] = None
+    bounds: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+
+    def evaluate(self, columns: Dict[str, np.ndarray]):
+        """Evaluate over ``columns`` (name -> array) in one go."""
+        if self.numexpr_source is not None and all(
+            np.asarray(values).dtype in NUMEXPR_DTYPES for values in columns.values()
+        ):
+            return ne.evaluate(self.numexpr_source, local_dict=columns)
+        env = {**ELEMENTWISE_FUNCS, **WHOLE_COLUMN_FUNCS, "np": np, **columns}
+        # The parsed tree cannot name builtins; NumPy methods may still import lazily
+        return eval(self.code, {"__builtins__": {"__import__": __import__}}, env)
+
+    def evaluate_chunked(
+        self,
+        load: Callable[[str, int, int], np.ndarray],
+        n_rows: int,
+        out: Optional[np.ndarray] = None,
+        chunk_rows: int = EXPRESSION_CHUNK_ROWS,
+    ) -> np.ndarray:
+        """Evaluate block by block; ``load(name, lo, hi)`` returns rows ``lo:hi`` of a column."""
+        if not self.elementwise:
+            return np.asarray(self.evaluate({name: load(name, 0, n_rows) for name in self.columns}))
+        for lo in range(0, n_rows, chunk_rows):
+            hi = min(n_rows, lo + chunk_rows)
+            block = np.broadcast_to(self.evaluate({name: load(name, lo, hi) for name in self.columns}), (hi - lo,))
+            if out is None:
+                out = np.empty(n_rows, dtype=block.dtype)
+            out[lo:hi] = block
+        return out if out is not None else np.empty(0)
+
+    def may_match(self, stats: Dict[str, Tuple[float, float]]) -> bool:
+        """``False`` if ``stats`` (column -> (min, max) of a row group) rule out every row."""
+        for name, (low, high) in self.bounds.items():
+            if name in stats:
+                vmin, vmax = stats[name]
+                if vmin is None or vmax is None:
+                    continue
+                if vmax < low or vmin > high:
+                    return False
+        return True
+
+
+def _constant(node) -> Optional[float]:
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        return float(node.value)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        value = _constant(node.operand)
+        return -value if value is not None else None
+    return None
+
+
+def _conjuncts(node) -> Iterable[ast.AST]:
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitAnd):
+        yield from _conjuncts(node.left)
+        yield from _conjuncts(node.right)
+    else:
+        yield node
+
+
+def _is_isin(node: ast.Call) -> bool:
+    """``isin(column, [constants...])`` or ``np.isin(...)`` with a literal list."""
+    func = node.func
+    if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name) and func.value.id == "np":
+        name = func.attr
+    else:
+        name = getattr(func, "id", None)
+    return name == "isin" and len(node.args) == 2 and isinstance(node.args[1], (ast.List, ast.Tuple))
+
+
+def _bounds(tree: ast.Expression, columns) -> Dict[str, Tuple[float, float]]:
+    """Column ranges implied by a top-level ``and`` of ``column <op> constant`` comparisons (or ``isin``)."""
+    bounds: Dict[str, Tuple[float, float]] = {}
+
+    def clamp(name, low=-np.inf, high=np.inf):
+        old_low, old_high = bounds.get(name, (-np.inf, np.inf))
+        bounds[name] = (max(old_low, low), min(old_high, high))
+
+    for node in _conjuncts(tree.body):
+        if isinstance(node, ast.Call) and _is_isin(node) and isinstance(node.args[0], ast.Name):
+            values = [_constant(elt) for elt in node.args[1].elts]
+            if node.args[0].id in columns and values and None not in values:
+                clamp(node.args[0].id, min(values), max(values))
+            continue
+        if not isinstance(node, ast.Compare):
+            continue
+        left, op, right = node.left, node.ops[0], node.comparators[0]
+        if isinstance(left, ast.Name) and left.id in columns and _constant(right) is not None:
+            name, value, flip = left.id, _constant(right), False
+        elif isinstance(right, ast.Name) and right.id in columns and _constant(left) is not None:
+            name, value, flip = right.id, _constant(left), True
+        else:
+            continue
+        if isinstance(op, ast.Eq):
+            clamp(name, value, value)
+        elif isinstance(op, (ast.Lt, ast.LtE, ast.Gt, ast.GtE)):
+            # ``column < value`` (or ``value > column``) caps the column from above
+            if isinstance(op, (ast.Lt, ast.LtE)) != flip:
+                clamp(name, high=value)
+            else:
+                clamp(name, low=value)
+    return bounds
+
+
+@functools.lru_cache(maxsize=256)
+def compile_header_expression(expression: str) -> HeaderExpression:
+    """Parse ``expression`` once into a ``HeaderExpression`` (cached per expression string).
+
+    Names are header columns, except the function names above and ``np``;
+    ``np.<func>`` calls (any NumPy function), arithmetic, comparisons, ``& | ~``
+    (or ``and``/``or``/``not``) and numeric constants are allowed. Raises
+    ``ExpressionError`` for anything else, including other bare function names.
+    """
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as exc:
+        raise ExpressionError(f"Cannot parse expression '{expression}': {exc.msg}") from exc
+    tree = ast.fix_missing_locations(_Normalize().visit(tree))
+
+    columns, elementwise, numexpr_ok = [], True, ne is not None
+    allowed = (
+        ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call, ast.Name, ast.Load,
+        ast.Constant, ast.Attribute, ast.Tuple, ast.List, ast.keyword, ast.operator, ast.unaryop, ast.cmpop,
+        ast.Subscript, ast.Slice,
+    )
+    not_columns = set()  # ids of Name nodes that are functions or ``np``
+    for node in ast.walk(tree):
+        if not isinstance(node, allowed):
+            raise ExpressionError(f"Unsupported syntax in expression '{expression}': {type(node).__name__}")
+        if isinstance(node, ast.Attribute) and node.attr.startswith("_"):
+            raise ExpressionError(f"Private attribute '{node.attr}' in expression '{expression}'")
+        if isinstance(node, ast.Subscript):
+            # Indexing a result (``np.unique(cdp, return_inverse=True)[1]``) is not element-wise
+            elementwise = numexpr_ok = False
+        if isinstance(node, ast.Call):
+            func = node.func
+            if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name) and func.value.id == "np":
+                name = func.attr
+                not_columns.update({id(func), id(func.value)})
+            elif isinstance(func, ast.Name):
+                name = func.id
+                not_columns.add(id(func))
+                if name not in ELEMENTWISE_FUNCS and name not in WHOLE_COLUMN_FUNCS:
+                    hint = f" (use np.{name})" if hasattr(np, name) else ""
+                    raise ExpressionError(f"Unknown function '{name}' in expression '{expression}'{hint}")
+            elif isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
+                # Method of a column (``offset.mean()``): whole-column evaluation
+                elementwise = numexpr_ok = False
+                not_columns.add(id(func))
+                continue
+            else:
+                raise ExpressionError(f"Unsupported call in expression '{expression}'")
+            if name in WHOLE_COLUMN_FUNCS or (name not in ELEMENTWISE_FUNCS and hasattr(np, name)):
+                elementwise = False
+            elif name not in ELEMENTWISE_FUNCS:
+                raise ExpressionError(f"Unknown function '{name}' in expression '{expression}'")
+            numexpr_ok = numexpr_ok and name in NUMEXPR_FUNCS and not node.keywords
+        elif isinstance(node, ast.Attribute) and id(node) not in not_columns:
+            numexpr_ok = False
+            if isinstance(node.value, ast.Name) and node.value.id == "np":
+                not_columns.add(id(node.value))  # a constant such as np.pi
+            else:
+                elementwise = False  # column attributes and methods (``offset.mean()``)
+        elif isinstance(node, ast.Name) and id(node) not in not_columns and node.id != "np":
+            if node.id not in columns:
+                columns.append(node.id)
+        elif isinstance(node, (ast.Tuple, ast.List, ast.FloorDiv)):
+            numexpr_ok = False  # ``//`` is missing from older numexpr releases
+
+    numexpr_source = None
+    if numexpr_ok and elementwise:
+        class _StripNumpy(ast.NodeTransformer):
+            def visit_Attribute(self, node):
+                if isinstance(node.value, ast.Name) and node.value.id == "np":
+                    return ast.copy_location(ast.Name(id=node.attr, ctx=ast.Load()), node)
+                return node
+
+        numexpr_source = ast.unparse(_StripNumpy().visit(ast.parse(ast.unparse(tree), mode="eval")))
+
+    return HeaderExpression(
+        source=expression,
+        columns=tuple(columns),
+        elementwise=elementwise,
+        code=compile(tree, "<header expression>", "eval"),
+        numexpr_source=numexpr_source,
+        bounds=_bounds(tree, set(columns)),
+    )
@@ -1,6 +1,21 @@
 import segyio
 import pandas as pd
 import re
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+import numba as nb
+import numpy as np
+
+TEXT_HEADER_BYTES = 3200
+BINARY_HEADER_BYTES = 400
+TRACE_HEADER_BYTES = 240
+
+# Bytes per sample for each SEG-Y data sample format code
+SAMPLE_FORMAT_BYTES = {1: 4, 2: 4, 3: 2, 5: 4, 6: 8, 8: 1, 9: 8, 10: 4, 11: 2, 12: 8, 15: 3, 16: 1}
+
 
 def open_segy_data(filePath, ignore_geometry = True):
     return segyio.open(filePath, "r", ignore_geometry=ignore_geometry)
@@ -14,6 +29,15 @@ def parse_trace_headers(segyfile):
     # Get all header keys
     n_traces = segyfile.tracecount
     headers = segyio.tracefield.keys
+    # Fixed-length files: decode every field in one pass over the file
+    file_name = getattr(segyfile, "_filename", None)
+    if file_name:
+        try:
+            decoded = read_trace_headers(file_name, segyio_header_spec())
+        except Exception:
+            decoded = None
+        if decoded is not None and all(len(v) == n_traces for v in decoded.values()):
+            return pd.DataFrame({k: decoded[k] for k in headers.keys()})
     # Initialize dataframe with trace id as index and headers as columns
     df = pd.DataFrame(index=range(0, n_traces),
                       columns=headers.keys())
@@ -45,3 +69,319 @@ def parse_text_header(segyfile):
 
     clean_header = {f"C{str(i).rjust(2, '0')}": text for i, text in enumerate(cleaned, start=1)}
     return clean_header
+
+
+@dataclass(frozen=True)
+class SegyLayout:
+    """Byte layout of a SEG-Y file whose traces all have the same length."""
+
+    path: str
+    data_offset: int
+    trace_count: int
+    samples: int
+    sample_format: int
+    endian: str
+
+    @property
+    def bytes_per_sample(self) -> int:
+        return SAMPLE_FORMAT_BYTES[self.sample_format]
+
+    @property
+    def trace_bytes(self) -> int:
+        return TRACE_HEADER_BYTES + self.samples * self.bytes_per_sample
+
+
+def _read_int16(buf: bytes, byte: int, endian: str) -> int:
+    return int(np.frombuffer(buf, dtype=endian + "i2", count=1, offset=byte - 1)[0])
+
+
+def segy_layout(file_path) -> Optional[SegyLayout]:
+    """
+    Work out where the traces of a SEG-Y file start and how long each one is.
+    Returns None for files the fixed-stride readers cannot handle
+    (variable-length traces, unknown sample formats, truncated files).
+    """
+    file_path = str(file_path)
+    size = os.path.getsize(file_path)
+    if size < TEXT_HEADER_BYTES + BINARY_HEADER_BYTES:
+        return None
+    with open(file_path, "rb") as fh:
+        fh.seek(TEXT_HEADER_BYTES)
+        binary = fh.read(BINARY_HEADER_BYTES)
+        first_trace = fh.read(TRACE_HEADER_BYTES)
+
+    for endian in (">", "<"):
+        sample_format = _read_int16(binary, 25, endian)
+        if sample_format not in SAMPLE_FORMAT_BYTES:
+            continue
+        samples = _read_int16(binary, 21, endian)
+        if samples <= 0 and len(first_trace) == TRACE_HEADER_BYTES:
+            samples = _read_int16(first_trace, 115, endian)
+        if samples <= 0:
+            return None
+        trace_bytes = TRACE_HEADER_BYTES + samples * SAMPLE_FORMAT_BYTES[sample_format]
+        # Rev1 files may carry extended textual headers; Rev0 files often hold junk there.
+        extended = _read_int16(binary, 305, endian)
+        candidates = [extended, 0] if extended > 0 else [0]
+        for n_ext in candidates:
+            data_offset = TEXT_HEADER_BYTES + BINARY_HEADER_BYTES + n_ext * TEXT_HEADER_BYTES
+            remaining = size - data_offset
+            if remaining >= 0 and remaining % trace_bytes == 0:
+                return SegyLayout(
+                    path=file_path,
+                    data_offset=data_offset,
+                    trace_count=remaining // trace_bytes,
+                    samples=samples,
+                    sample_format=sample_format,
+                    endian=endian,
+                )
+        return None
+    return None
+
+
+def segyio_header_spec() -> Dict[str, Tuple[int, int]]:
+    """Express segyio's trace header fields as a ``{name: (byte, length)}`` spec."""
+    items = sorted(segyio.tracefield.keys.items(), key=lambda kv: kv[1])
+    spec = {}
+    for i, (name, byte) in enumerate(items):
+        end = items[i + 1][1] if i + 1 < len(items) else TRACE_HEADER_BYTES + 1
+        spec[name] = (int(byte), int(end - byte))
+    return spec
+
+
+def _attribute_spec(header_spec: Dict[str, Tuple[int, int]], fields: Sequence[str]) -> Dict[str, Tuple[int, int]]:
+    """Byte ranges ``f.attributes(byte)`` would decode for ``fields``.
+
+    segyio reads the field it knows at a field's start byte, so wider spec
+    entries (``unassigned_181_240``) map to that field; entries starting at a
+    byte segyio does not know are left out, as ``f.attributes`` rejects them.
+    """
+    known = {byte: length for byte, length in segyio_header_spec().values()}
+    spec = {}
+    for name in fields:
+        byte, length = header_spec[name]
+        if length not in (2, 4):
+            if byte not in known:
+                continue
+            length = known[byte]
+        spec[name] = (byte, length)
+    return spec
+
+
+def trace_header_dtype(
+    header_spec: Dict[str, Tuple[int, int]],
+    fields: Optional[Sequence[str]] = None,
+    endian: str = ">",
+    itemsize: int = TRACE_HEADER_BYTES,
+) -> np.dtype:
+    """
+    Build a structured dtype over one trace record from a ``{name: (byte, length)}`` spec.
+    Only 2- and 4-byte integer fields are mapped; the unassigned byte ranges are skipped.
+    """
+    names, formats, offsets = [], [], []
+    for name in (fields if fields is not None else header_spec.keys()):
+        byte, length = header_spec[name]
+        if length not in (2, 4):
+            continue
+        names.append(name)
+        formats.append(f"{endian}i{length}")
+        offsets.append(int(byte) - 1)
+    return np.dtype({"names": names, "formats": formats, "offsets": offsets, "itemsize": itemsize})
+
+
+def read_trace_headers(
+    file_path,
+    header_spec: Optional[Dict[str, Tuple[int, int]]] = None,
+    fields: Optional[Sequence[str]] = None,
+    start: int = 0,
+    stop: Optional[int] = None,
+    block_traces: int = 262144,
+) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Decode trace header fields of a fixed-length SEG-Y file in a single pass.
+
+    The file is memory-mapped once and the 240-byte headers are copied block by
+    block into a packed buffer, which is then viewed through a structured dtype
+    built from ``header_spec``. Every requested field comes out of that buffer,
+    byte-swapped to native int32 like ``segyio.attributes`` returns.
+    Returns None when the file layout is not fixed-length, so callers can fall
+    back to ``segyio``.
+    """
+    layout = segy_layout(file_path)
+    if layout is None:
+        return None
+    if header_spec is None:
+        header_spec = segyio_header_spec()
+
+    dtype = trace_header_dtype(header_spec, fields, endian=layout.endian)
+    stop = layout.trace_count if stop is None else min(int(stop), layout.trace_count)
+    start = max(0, min(int(start), stop))
+    n = stop - start
+
+    out = {name: np.empty(n, dtype=np.int32) for name in dtype.names}
+    if n == 0 or not dtype.names:
+        return out
+
+    records = np.memmap(
+        layout.path,
+        dtype=np.uint8,
+        mode="r",
+        offset=layout.data_offset,
+        shape=(layout.trace_count, layout.trace_bytes),
+    )
+    try:
+        for lo in range(start, stop, block_traces):
+            hi = min(lo + block_traces, stop)
+            packed = np.ascontiguousarray(records[lo:hi, :TRACE_HEADER_BYTES])
+            headers = packed.view(dtype).reshape(-1)
+            for name in dtype.names:
+                out[name][lo - start : hi - start] = headers[name]
+    finally:
+        del records
+    return out
+
+
+def memmap_traces(file_path) -> Optional[np.ndarray]:
+    """
+    Expose the samples of a fixed-length IEEE-float SEG-Y file as a lazy,
+    read-only ``(samples, traces)`` view on a memory map.
+
+    Each trace record is described by a structured dtype whose first field
+    swallows the 240-byte header, so the view is strided over the file without
+    copying. Samples keep the file's byte order; swapping happens only when a
+    slice is read or converted. Returns None for IBM float, non-float formats
+    and variable-length files, which still need ``segyio``.
+    """
+    layout = segy_layout(file_path)
+    if layout is None or layout.sample_format != 5:
+        return None
+    if layout.trace_count == 0:
+        return np.empty((layout.samples, 0), dtype=np.float32)
+    return _trace_records(layout, np.dtype(f"{layout.endian}f4"))["samples"].T
+
+
+def _trace_records(layout: SegyLayout, sample_dtype, sample_shape=()) -> np.memmap:
+    record = np.dtype([
+        ("header", f"V{TRACE_HEADER_BYTES}"),
+        ("samples", sample_dtype, (layout.samples,) + tuple(sample_shape)),
+    ])
+    return np.memmap(
+        layout.path,
+        dtype=record,
+        mode="r",
+        offset=layout.data_offset,
+        shape=(layout.trace_count,),
+    )
+
+
+# Table-driven IBM -> IEEE conversion, the same one segyio uses, so results are
+# bit-identical: values below the IEEE range flush to +0, values above it
+# saturate to 0x7FFFFFFF.
+_IBM_EXP_BIAS = np.array(
+    [0x21800000, 0x21400000, 0x21000000, 0x21000000,
+     0x20C00000, 0x20C00000, 0x20C00000, 0x20C00000], dtype=np.int64
+)
+_IBM_MANT_SHIFT = np.array([8, 4, 2, 2, 1, 1, 1, 1], dtype=np.int64)
+_IBM_MAX = 0x611FFFFF
+_IBM_MIN = 0x21200000
+
+
+@nb.njit(inline="always")
+def _ibm_word_to_ieee(word, exp_bias, mant_shift):
+    mantissa = word & 0x00FFFFFF
+    ix = mantissa >> 21
+    exponent = (((word & 0x7F000000) - exp_bias[ix]) << 1) & 0xFFFFFFFF
+    mantissa = (mantissa * mant_shift[ix] + exponent) & 0xFFFFFFFF
+    magnitude = word & 0x7FFFFFFF
+    if magnitude < _IBM_MIN:
+        return 0
+    if magnitude > _IBM_MAX:
+        mantissa = 0x7FFFFFFF
+    return mantissa | (word & 0x80000000)
+
+
+@nb.njit(nogil=True)
+def _ibm_words_to_ieee(words, out):
+    for i in range(words.shape[0]):
+        out[i] = _ibm_word_to_ieee(np.int64(words[i]), _IBM_EXP_BIAS, _IBM_MANT_SHIFT)
+
+
+@nb.njit(nogil=True)
+def _ibm_bytes_to_ieee(raw, out, little_endian):
+    # raw: (traces, samples, 4) bytes as stored; out: (samples, traces) uint32 view
+    for i in range(raw.shape[0]):
+        for j in range(raw.shape[1]):
+            if little_endian:
+                b0, b1, b2, b3 = raw[i, j, 3], raw[i, j, 2], raw[i, j, 1], raw[i, j, 0]
+            else:
+                b0, b1, b2, b3 = raw[i, j, 0], raw[i, j, 1], raw[i, j, 2], raw[i, j, 3]
+            word = (np.int64(b0) << 24) | (np.int64(b1) << 16) | (np.int64(b2) << 8) | np.int64(b3)
+            out[j, i] = _ibm_word_to_ieee(word, _IBM_EXP_BIAS, _IBM_MANT_SHIFT)
+
+
+def _run_in_slices(kernel, n: int, threads: Optional[int], make_args, min_slice: int = 1) -> None:
+    # The kernels release the GIL, so plain threads convert slices in parallel
+    # (numba's own parallel backends are not safe to fork afterwards).
+    threads = max(1, min(n // max(1, min_slice) or 1, threads or os.cpu_count() or 1))
+    bounds = np.linspace(0, n, threads + 1).astype(int)
+    if threads == 1:
+        kernel(*make_args(0, n))
+        return
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for future in [pool.submit(kernel, *make_args(lo, hi)) for lo, hi in zip(bounds[:-1], bounds[1:])]:
+            future.result()
+
+
+def ibm_to_ieee(words: np.ndarray, threads: Optional[int] = None) -> np.ndarray:
+    """
+    Convert IBM System/360 single-precision words to IEEE float32.
+
+    ``words`` holds the IBM bit patterns as unsigned 32-bit integers (already in
+    native byte order); the result has the same shape. The conversion is a
+    compiled kernel run over ``threads`` slices and matches segyio bit for bit.
+    """
+    words = np.ascontiguousarray(words, dtype=np.uint32)
+    out = np.empty(words.shape, dtype=np.uint32)
+    flat_in, flat_out = words.reshape(-1), out.reshape(-1)
+    _run_in_slices(
+        _ibm_words_to_ieee, flat_in.size, threads,
+        lambda lo, hi: (flat_in[lo:hi], flat_out[lo:hi]),
+        min_slice=1 << 16,
+    )
+    return out.view(np.float32)
+
+
+def read_trace_samples(
+    layout: SegyLayout,
+    start: int = 0,
+    stop: Optional[int] = None,
+    threads: Optional[int] = None,
+) -> Optional[np.ndarray]:
+    """
+    Decode traces [start, stop) of a fixed-length SEG-Y file into a C-ordered
+    ``(samples, traces)`` float32 array. IBM float (format 1) is converted
+    straight from the memory map by ``threads`` parallel kernels, IEEE
+    (format 5) is a single strided copy. Returns None for other sample formats.
+    """
+    if layout.sample_format not in (1, 5):
+        return None
+    stop = layout.trace_count if stop is None else min(int(stop), layout.trace_count)
+    start = max(0, min(int(start), stop))
+    if stop == start:
+        return np.empty((layout.samples, 0), dtype=np.float32)
+
+    if layout.sample_format == 5:
+        records = _trace_records(layout, np.dtype(f"{layout.endian}f4"))
+        return np.ascontiguousarray(records["samples"][start:stop].T, dtype=np.float32)
+
+    records = _trace_records(layout, np.uint8, (4,))
+    raw = np.asarray(records["samples"][start:stop])
+    out = np.empty((layout.samples, stop - start), dtype=np.float32)
+    words = out.view(np.uint32)
+    little = layout.endian == "<"
+    _run_in_slices(
+        _ibm_bytes_to_ieee, stop - start, threads,
+        lambda lo, hi: (raw[lo:hi], words[:, lo:hi], little),
+        min_slice=(1 << 16) // layout.samples,
+    )
+    return out
@@ -6,6 +6,11 @@ import io
 import base64
 from IPython.display import HTML, display
 from matplotlib.widgets import Slider
+from openseismicprocessing.zarr_utils import CachedArray
+
+def _read_lazy(array):
+    """Materialize a lazy Zarr amplitude array through the shared chunk cache."""
+    return CachedArray(array)[:] if getattr(array, "ndim", 0) == 2 else array[:]
 
 def plot_acquisition(
     context: dict,
@@ -244,7 +249,7 @@ def plot_seismic_image(
 
     if data is None or not hasattr(data, "shape"):
         if hasattr(data, "oindex"):
-            data = data[:]
+            data = _read_lazy(data)
         else:
             print("❌ Error: 'data' not found or invalid in context.")
             return
@@ -260,7 +265,7 @@ def plot_seismic_image(
 
     try:
         if hasattr(data, "oindex"):
-            data = data[:]
+            data = _read_lazy(data)
 
         if data.ndim == 2:
             if df is None or not isinstance(df, pd.DataFrame):
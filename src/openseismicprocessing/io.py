@@ -4,9 +4,14 @@ import pandas as pd
 from typing import Dict, Tuple, Any, Optional
 
 from ._io import (
+    _attribute_spec,
     open_segy_data,
     parse_trace_headers,
-    parse_text_header
+    parse_text_header,
+    read_trace_headers,
+    memmap_traces,
+    read_trace_samples,
+    segy_layout
 )
 from .constants import TRACE_HEADER_REV0, BINARY_HEADER_REV0
 
@@ -101,7 +106,24 @@ def get_binary_header(context, file_path):
 
     return binary_header
 
-def get_trace_data(context, file_path, ignore_geometry=True):
+def _read_trace_block(file_path, ignore_geometry=True, mmap=False):
+    """Read all traces of one SEG-Y file as a (samples, traces) float32 array."""
+    if mmap:
+        view = memmap_traces(file_path)
+        if view is not None:
+            return view
+    # Fixed-length IBM/IEEE files are decoded straight from a memory map
+    layout = segy_layout(file_path)
+    trace_data = read_trace_samples(layout) if layout is not None else None
+    if trace_data is not None:
+        return trace_data
+    segy_file = open_segy_data(file_path, ignore_geometry=ignore_geometry)
+    try:
+        return np.ascontiguousarray(segy_file.trace.raw[:].T)
+    finally:
+        segy_file.close()
+
+def get_trace_data(context, file_path, ignore_geometry=True, mmap=False):
     """
     Opens a SEGY file or all SEGY files in a folder, extracts trace data, updates the context, 
     and manually closes the files. For folders, data is horizontally stacked.
@@ -110,6 +132,9 @@ def get_trace_data(context, file_path, ignore_geometry=True):
         context (dict): A dictionary to store results.
         file_path (str): Path to the SEGY file or folder containing SEGY files.
         ignore_geometry (bool): Whether to ignore geometry when opening SEGY files.
+        mmap (bool): For a single fixed-length IEEE file, return a lazy read-only
+            memory-mapped view instead of loading the traces. Other files are
+            read through segyio as usual.
 
     Returns:
         The extracted trace data (a NumPy array) if successful, otherwise None.
@@ -141,20 +166,12 @@ def get_trace_data(context, file_path, ignore_geometry=True):
         trace_data_list = []
         for segy_file_path in segy_files:
             try:
-                # Open the SEGY file
-                segy_file = open_segy_data(segy_file_path,ignore_geometry=ignore_geometry)
-                # Extract trace data and add to list
-                trace_data = np.ascontiguousarray(segy_file.trace.raw[:].T)
+                # Stacking copies anyway, so keep each file as a lazy view until then
+                trace_data = _read_trace_block(segy_file_path, ignore_geometry, mmap=True)
                 trace_data_list.append(trace_data)
             except Exception as e:
                 print(f"❌ Error: Failed to process SEGY file '{segy_file_path}': {e}")
                 continue
-            finally:
-                try:
-                    if 'segy_file' in locals():
-                        segy_file.close()
-                except Exception as e:
-                    print(f"❌ Error: Failed to close SEGY file '{segy_file_path}': {e}")
 
         if not trace_data_list:
             print(f"❌ Error: Could not read any SEGY files in folder '{file_path}'")
@@ -162,7 +179,7 @@ def get_trace_data(context, file_path, ignore_geometry=True):
 
         # Horizontally stack all trace data
         try:
-            return np.hstack(trace_data_list)
+            return np.concatenate(trace_data_list, axis=1, dtype=np.float32)
         except Exception as e:
             print(f"❌ Error: Failed to stack trace data from folder '{file_path}': {e}")
             return None
@@ -170,23 +187,10 @@ def get_trace_data(context, file_path, ignore_geometry=True):
     # Handle single file case (original functionality)
     else:
         try:
-            # Open the SEGY file manually (without using a context manager)
-            segy_file = open_segy_data(file_path,ignore_geometry=ignore_geometry)
-        except Exception as e:
-            print(f"❌ Error: Failed to open SEGY file '{file_path}': {e}")
-            return None
-
-        try:
-            # Extract the trace data from the file.
-            trace_data = np.ascontiguousarray(segy_file.trace.raw[:].T)
+            trace_data = _read_trace_block(file_path, ignore_geometry, mmap=mmap)
         except Exception as e:
             print(f"❌ Error: Failed to extract trace data from '{file_path}': {e}")
             trace_data = None
-        finally:
-            try:
-                segy_file.close()
-            except Exception as e:
-                print(f"❌ Error: Failed to close SEGY file '{file_path}': {e}")
 
         return trace_data
 
@@ -339,17 +343,26 @@ def read_trace_headers_until(
     if not os.path.exists(file_path):
         raise FileNotFoundError(file_path)
 
+    names = [
+        name for name in header_spec
+        if include_unassigned or not name.startswith("unassigned_")
+    ]
+    # Wide fields (unassigned_*) decode as segyio does: the field at their start byte
+    spec = _attribute_spec(header_spec, names)
+    decoded = read_trace_headers(file_path, spec, fields=list(spec), stop=num_traces) or {}
+    missing = [name for name in names if name not in decoded]
+    if not missing:
+        return {name: decoded[name] for name in names}
+
+    # Not fixed-length (or a byte the memory-mapped path skips): one segyio scan per missing field
     with open_segy_data(file_path, ignore_geometry=True) as segy_file:
         n_total = segy_file.tracecount
         ntr = n_total if num_traces is None else min(num_traces, n_total)
-        result: Dict[str, np.ndarray] = {}
-        for name, (start_byte, length) in header_spec.items():
-            if not include_unassigned and name.startswith("unassigned_"):
-                continue
-            vals = segy_file.attributes(start_byte)[:ntr]
-            result[name] = vals
+        for name in missing:
+            start_byte, _ = header_spec[name]
+            decoded[name] = segy_file.attributes(start_byte)[:ntr]
 
-    return result
+    return {name: decoded[name] for name in names}
 
 def read_data(context, file_path, format="binary", order='C', shape=None):
     if not os.path.isfile(file_path):
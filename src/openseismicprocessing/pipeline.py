@@ -1,49 +1,579 @@
+import contextlib
+import hashlib
 import inspect
+import io
+import json
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from datetime import datetime
+from pathlib import Path
+from uuid import uuid4
 
-def run_pipeline(steps):
+import numpy as np
+import pandas as pd
+import zarr
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+from .zarr_utils import (
+    CHUNK_CACHE,
+    DEFAULT_INGEST_MEMORY,
+    AmplitudeStats,
+    _block_chunk_stats,
+    _file_fingerprint,
+    _json_safe,
+    _store_geometry_path,
+    _window_traces,
+    _write_trace_indexes,
+)
+
+FUSED_BLOCK_BYTES = 4 * 1024**2  # bytes of traces pushed through a fused chain at a time
+
+
+def _fusable_run(steps, start):
+    """Length of the run of trace-local steps from ``start`` that pass ``data`` from one to the next."""
+    stop = start
+    while stop < len(steps):
+        func, kwargs = steps[stop]
+        if not getattr(func, "trace_local", False) or kwargs.get("output") != "data":
+            break
+        if kwargs.get("key", "data") != "data" or kwargs.get("data_key", "data") != "data":
+            break
+        stop += 1
+    return stop - start
+
+
+def _run_fused(context, steps, first):
+    """Apply consecutive trace-local steps block by block into one preallocated output.
+
+    Each block of traces goes through the whole chain while it is in cache, so the
+    chain costs one output array plus block-sized temporaries instead of a full
+    copy per step. Returns ``False`` (after printing why) if a step fails.
+    """
+    names = " → ".join(func.__name__ for func, _ in steps)
+    messages = [{} for _ in steps]
+    try:
+        steps = _resolve_trace_local_steps(steps, context)
+        data = context["data"]
+        n_traces = data.shape[1]
+        probe = _apply_trace_local_steps(steps, context, data[:, :1])
+        block = max(1, FUSED_BLOCK_BYTES // (max(data.shape[0], probe.shape[0]) * data.itemsize))
+        out = np.empty((probe.shape[0], n_traces), dtype=probe.dtype)
+        for lo in range(0, n_traces, block):
+            out[:, lo : lo + block] = _apply_trace_local_steps(steps, context, data[:, lo : lo + block], lo, messages)
+    except Exception as e:
+        _print_step_messages(messages)
+        print(f"❌ Exception in fused steps {first+1}-{first+len(steps)} ({names}): {e}")
+        context["fused_steps_error"] = str(e)
+        return False
+    _print_step_messages(messages)
+    context["data"] = out
+    return True
+
+
+DEFAULT_STEP_CACHE_BYTES = 8 * 1024**3  # on-disk size kept by StepCache before evicting
+
+
+def _fingerprint(value):
+    """Stable description of a step argument; paths stand for the data behind them."""
+    if isinstance(value, (str, Path)) and not str(value).startswith("@") and os.path.exists(value):
+        path = Path(value)
+        manifest_path = Path(str(path) + ".manifest.json")
+        if manifest_path.exists():
+            manifest = json.loads(manifest_path.read_text())
+            geometry = _store_geometry_path(path)
+            return {
+                "dataset_id": manifest.get("dataset_id"),
+                "geometry": _file_fingerprint(geometry) if geometry.exists() else None,
+                "manifest": _file_fingerprint(manifest_path),
+            }
+        if path.is_dir():
+            return {str(p.name): _file_fingerprint(p) for p in sorted(path.iterdir()) if p.is_file()}
+        return {"path": str(path.resolve()), **_file_fingerprint(path)}
+    if isinstance(value, dict):
+        return {str(k): _fingerprint(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_fingerprint(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return {"ndarray": hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest(), "shape": value.shape, "dtype": str(value.dtype)}
+    if isinstance(value, pd.DataFrame):
+        return {"dataframe": int(pd.util.hash_pandas_object(value, index=True).sum()), "columns": list(map(str, value.columns))}
+    if callable(value):
+        return _function_identity(value)
+    return repr(value)
+
+
+def _function_identity(func):
+    """Qualified name plus a hash of the bytecode, so editing an operator invalidates its results."""
+    inner = inspect.unwrap(func)
+    code = getattr(inner, "__code__", None)
+    digest = hashlib.sha256(code.co_code + repr(code.co_consts).encode()).hexdigest() if code else ""
+    return f"{getattr(inner, '__module__', '')}.{getattr(inner, '__qualname__', repr(inner))}:{digest}"
+
+
+class StepCache:
+    """On-disk cache of pipeline step results for ``run_pipeline``.
+
+    A step's key hashes the previous step's key, the function (name and bytecode)
+    and its keyword arguments. Paths in the arguments are fingerprinted by the data
+    behind them: a Zarr store by its manifest ``dataset_id`` and geometry size/mtime,
+    other files by size/mtime. An entry holds the context keys the step added,
+    replaced or may have changed in place (see ``changes``), so an unchanged job
+    prefix is restored instead of recomputed. Least recently used entries are
+    evicted once the cache exceeds ``max_bytes``. Steps are assumed
+    deterministic; side effects of restored steps (files written) are not
+    replayed. ``plot_*`` steps only look at the context, so they are always run
+    and do not enter the keys; steps whose function has ``cacheable = False``
+    (e.g. a loader of data that cannot be fingerprinted) always run too, but
+    their arguments still key the steps after them.
+    """
+
+    def __init__(self, root, max_bytes=DEFAULT_STEP_CACHE_BYTES):
+        self.root = Path(root)
+        self.max_bytes = int(max_bytes)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def key(self, parent, steps):
+        """Key of ``steps`` (one step, or a fused run) applied after the step keyed ``parent``."""
+        description = [
+            parent,
+            [[_function_identity(func), _fingerprint(dict(kwargs))] for func, kwargs in steps],
+        ]
+        digest = hashlib.sha256(json.dumps(description, sort_keys=True, default=repr).encode()).hexdigest()
+        return "+".join(func.__name__ for func, _ in steps) + "/" + digest
+
+    @staticmethod
+    def changes(before, context, written=()):
+        """Context entries a step added, replaced or may have changed in place.
+
+        ``before`` is a shallow copy of the context taken before the step ran.
+        Entries named in ``written`` (the keys the step may write, ``None`` for
+        any) are included even if the step updated the same object in place, as
+        ``create_header`` does with the geometry.
+        """
+        return {
+            key: value
+            for key, value in context.items()
+            if written is None or key in written or key not in before or before[key] is not value
+        }
+
+    def _path(self, key):
+        return self.root / f"{key}.pkl"
+
+    def get(self, key):
+        """Cached context changes for ``key``, or ``None``."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                changes = pickle.load(f)
+            os.utime(path)  # mark as recently used
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        return changes
+
+    def put(self, key, changes):
+        """Store a step's context changes; returns ``False`` if they cannot be pickled."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(changes, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except Exception:
+            os.unlink(tmp)
+            return False
+        self.evict()
+        return True
+
+    def _entries(self):
+        return [(p, p.stat()) for p in self.root.glob("*/*.pkl")]
+
+    def size(self):
+        return sum(st.st_size for _, st in self._entries())
+
+    def evict(self, max_bytes=None):
+        """Delete least recently used entries until the cache fits ``max_bytes``."""
+        limit = self.max_bytes if max_bytes is None else int(max_bytes)
+        entries = sorted(self._entries(), key=lambda entry: entry[1].st_mtime_ns)
+        total = sum(st.st_size for _, st in entries)
+        for path, st in entries:
+            if total <= limit:
+                break
+            path.unlink(missing_ok=True)
+            total -= st.st_size
+
+    def invalidate(self, func=None):
+        """Drop the cached results of ``func`` (a step function or its name), or of every step.
+
+        Later steps key on earlier ones, so the next run recomputes from the first
+        invalidated step onward. Returns the number of entries removed.
+        """
+        name = getattr(func, "__name__", func)
+        removed = 0
+        for folder in [p for p in self.root.iterdir() if p.is_dir()]:
+            if name is None or name in folder.name.split("+"):
+                removed += len(list(folder.glob("*.pkl")))
+                shutil.rmtree(folder, ignore_errors=True)
+        return removed
+
+
+def _array_summary(value):
+    """Shape, dtype and size of an ndarray-like value (NumPy, Zarr, ...), else ``None``."""
+    if not (hasattr(value, "shape") and hasattr(value, "dtype")) or isinstance(value, pd.DataFrame):
+        return None
+    shape = [int(n) for n in value.shape]
+    return {"shape": shape, "dtype": str(value.dtype), "bytes": int(np.prod(shape)) * np.dtype(value.dtype).itemsize}
+
+
+def _peak_rss():
+    """High-water mark of this process's resident memory in bytes (``None`` if unknown)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+
+
+class PipelineReport:
+    """Per-step wall time, CPU time, memory and throughput of a pipeline run.
+
+    Each step records its ``status`` (``ok``, ``cached`` or ``failed``), wall
+    seconds, ``cpu_s`` (CPU time of the thread that ran it, so steps running at
+    once in ``run_pipeline_graph`` are not charged for each other; pools the
+    step starts itself are not included), ``process_cpu_s`` and
+    ``peak_rss_delta_bytes`` (process-wide: they include whatever ran alongside),
+    the shape and size of its input (``context["data"]``) and output, and traces
+    per second. The run's ``wall_s`` and ``cpu_s`` are its elapsed and process
+    CPU time, not sums over steps. ``as_dict()`` is what ``run_pipeline`` leaves
+    in ``context["pipeline_report"]``; ``write_json`` and ``write_chrome_trace``
+    (for ``chrome://tracing`` or Perfetto) save it.
+    """
+
+    def __init__(self):
+        self.steps = []
+        self._t0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+        self._end = self._t0
+        self._cpu_end = self._cpu0
+
+    @contextlib.contextmanager
+    def step(self, index, name, context, output_key="data"):
+        """Time the body as step ``index``; set ``record["status"]`` to mark a failure or cache hit."""
+        record = {"step": int(index), "name": name, "status": "ok", "input": _array_summary(context.get("data"))}
+        rss0, cpu0, thread0 = _peak_rss(), time.process_time(), time.thread_time()
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException:
+            record["status"] = "failed"
+            raise
+        finally:
+            end, cpu1 = time.perf_counter(), time.process_time()
+            wall = end - start
+            rss1 = _peak_rss()
+            output = _array_summary(context.get(output_key or "data"))
+            array = record["input"] if record["input"] and len(record["input"]["shape"]) == 2 else output
+            traces = array["shape"][-1] if array and len(array["shape"]) == 2 else None
+            record.update(
+                {
+                    "start_s": start - self._t0,
+                    "wall_s": wall,
+                    "cpu_s": time.thread_time() - thread0,
+                    "process_cpu_s": cpu1 - cpu0,
+                    "peak_rss_delta_bytes": rss1 - rss0 if rss0 is not None else None,
+                    "output": output,
+                    "traces_per_s": traces / wall if traces and wall > 0 else None,
+                }
+            )
+            self.steps.append(record)
+            self._end, self._cpu_end = max(self._end, end), max(self._cpu_end, cpu1)
+
+    def as_dict(self):
+        return {
+            "steps": self.steps,
+            "wall_s": self._end - self._t0,
+            "cpu_s": self._cpu_end - self._cpu0,
+            "peak_rss_bytes": _peak_rss(),
+        }
+
+    def write_json(self, path):
+        Path(path).write_text(json.dumps(_json_safe(self.as_dict()), indent=2))
+
+    def write_chrome_trace(self, path):
+        """Save the steps as complete ("X") events of the Chrome trace-event format."""
+        events = [
+            {
+                "name": step["name"],
+                "cat": step["status"],
+                "ph": "X",
+                "ts": step["start_s"] * 1e6,
+                "dur": step["wall_s"] * 1e6,
+                "pid": os.getpid(),
+                "tid": 0,
+                "args": {k: v for k, v in step.items() if k not in ("name", "start_s", "wall_s")},
+            }
+            for step in self.steps
+        ]
+        Path(path).write_text(json.dumps(_json_safe({"traceEvents": events, "displayTimeUnit": "ms"})))
+
+
+def _run_step(context, i, func, kwargs):
+    """Run one step against ``context``; returns ``False`` if the pipeline must stop."""
+    output_key = kwargs.get("output")
+    func_name = func.__name__
+
+    # Resolve @context references
+    resolved_kwargs = {}
+    for key, value in kwargs.items():
+        if key == "output":
+            continue
+        if isinstance(value, str) and value.startswith("@"):
+            ref_key = value[1:]
+            if ref_key in context:
+                resolved_kwargs[key] = context[ref_key]
+            else:
+                print(f"❌ Error: Referenced key '{ref_key}' not found in context for step {i+1} ({func_name})")
+                return False
+        else:
+            resolved_kwargs[key] = value
+
+    # Detect if function expects context injection
+    inject_context = "context" in inspect.signature(func).parameters
+
+    try:
+        result = func(context, **resolved_kwargs) if inject_context else func(**resolved_kwargs)
+
+        if result is None and output_key:
+            print(f"❌ Error: Step {i+1} ({func_name}) returned None while expecting output '{output_key}'. Pipeline halted.")
+            return False
+
+        if output_key and result is not None:
+            context[output_key] = result
+        # No output key → side-effect function, it's fine if it returns None
+
+    except Exception as e:
+        print(f"❌ Exception in step {i+1} ({func_name}): {e}")
+        context[f"{func_name}_error"] = str(e)
+        return False
+    return True
+
+
+def run_pipeline(steps, cache=None, report_path=None, trace_path=None, report=None):
+    """Run ``(func, kwargs)`` steps in order, sharing one ``context`` dict.
+
+    Consecutive trace-local steps that each write ``"output": "data"`` are fused
+    and applied to ``context["data"]`` a block of traces at a time. With a
+    ``StepCache``, the longest unchanged prefix of the job is restored from disk
+    and only the steps after it are run (and cached). Timing and memory of every
+    step end up in ``context["pipeline_report"]`` (see ``PipelineReport``; pass
+    ``report`` to record into an existing one) and, if given, in ``report_path``
+    (JSON) and ``trace_path`` (Chrome trace).
+    """
     context = {}
+    report = report if report is not None else PipelineReport()
+    fused_until = 0
+    cache_key, replaying = "", cache is not None
 
     for i, (func, kwargs) in enumerate(steps):
-        output_key = kwargs.pop("output", None)
-        func_name = func.__name__
+        if i < fused_until:
+            continue
+        data = context.get("data")
+        run = _fusable_run(steps, i) if isinstance(data, np.ndarray) and data.ndim == 2 else 0
+        fused_until = i + max(run, 1)
+        group = steps[i:fused_until]
 
-        # Resolve @context references
-        resolved_kwargs = {}
-        for key, value in kwargs.items():
-            if isinstance(value, str) and value.startswith("@"):
-                ref_key = value[1:]
-                if ref_key in context:
-                    resolved_kwargs[key] = context[ref_key]
-                else:
-                    print(f"❌ Error: Referenced key '{ref_key}' not found in context for step {i+1} ({func_name})")
-                    return context
+        name = " → ".join(step_func.__name__ for step_func, _ in group)
+        with report.step(i + 1, name, context, group[-1][1].get("output")) as record:
+            cached = cache is not None and _cacheable(group)
+            if cached:
+                step_key = cache.key(cache_key, group)
+                changes = cache.get(step_key) if replaying else None
+                if changes is not None:
+                    context.update(changes)
+                    cache_key = step_key
+                    record["status"] = "cached"
+                    continue
+                replaying = False
+                before = dict(context)
+
+            if run > 1:
+                fused = [(step_func, {k: v for k, v in step_kwargs.items() if k != "output"}) for step_func, step_kwargs in group]
+                ok = _run_fused(context, fused, i)
             else:
-                resolved_kwargs[key] = value
+                ok = _run_step(context, i, func, kwargs)
+            if not ok:
+                record["status"] = "failed"
+                break
+            if cached:
+                cache.put(step_key, cache.changes(before, context, _written_keys(group)))
+                cache_key = step_key
+            elif cache is not None and not func.__name__.startswith("plot_"):
+                cache_key = cache.key(cache_key, group)
 
-        # Detect if function expects context injection
-        inject_context = "context" in inspect.signature(func).parameters
+    context["pipeline_report"] = report.as_dict()
+    if report_path:
+        report.write_json(report_path)
+    if trace_path:
+        report.write_chrome_trace(trace_path)
+    return context
 
-        try:
-            result = func(context, **resolved_kwargs) if inject_context else func(**resolved_kwargs)
 
-            if result is None and output_key:
-                print(f"❌ Error: Step {i+1} ({func_name}) returned None while expecting output '{output_key}'. Pipeline halted.")
-                return context
+def _step_keys(func, kwargs):
+    """``(reads, writes)`` context keys of a step, or ``None`` if it may use any key.
 
-            if output_key and result is not None:
-                context[output_key] = result
-            elif output_key and result is None:
-                # Already handled above, just being explicit
-                pass
-            else:
-                # No output key → side-effect function, it's fine if it returns None
-                pass
+    ``@key`` arguments are read and ``output`` is written. Operators taking
+    ``context`` name the entries they use in ``key``/``key_*``/``*_key`` parameters
+    (trace-local ones also use ``data``); they may replace those entries, except
+    ``plot_*`` functions, which only look.
+    """
+    reads = {value[1:] for value in kwargs.values() if isinstance(value, str) and value.startswith("@")}
+    writes = {kwargs["output"]} if kwargs.get("output") else set()
+    params = inspect.signature(func).parameters
+    if "context" not in params:
+        return reads, writes
+    keys = {"data"} if getattr(func, "trace_local", False) else set()
+    for name, param in params.items():
+        if name.startswith("key") or name.endswith("_key"):
+            value = kwargs.get(name, param.default)
+            if isinstance(value, str):
+                keys.add(value)
+    if not keys:
+        return None
+    return reads | keys, writes | (set() if func.__name__.startswith("plot_") else keys)
 
-        except Exception as e:
-            print(f"❌ Exception in step {i+1} ({func_name}): {e}")
-            context[f"{func_name}_error"] = str(e)
-            break
 
+def _written_keys(steps):
+    """Context keys ``steps`` may write (see ``_step_keys``), or ``None`` if any."""
+    written = set()
+    for func, kwargs in steps:
+        step_keys = _step_keys(func, kwargs)
+        if step_keys is None:
+            return None
+        written |= step_keys[1]
+    return written
+
+
+def _cacheable(steps):
+    """Whether ``StepCache`` may restore ``steps`` instead of running them."""
+    return not any(func.__name__.startswith("plot_") or not getattr(func, "cacheable", True) for func, _ in steps)
+
+
+def _run_graph_step(report, snapshot, i, func, kwargs):
+    with report.step(i + 1, func.__name__, snapshot, kwargs.get("output")) as record:
+        ok = _run_step(snapshot, i, func, kwargs)
+        if not ok:
+            record["status"] = "failed"
+    return ok
+
+
+def run_pipeline_graph(steps, workers=4, keep=(), report_path=None, trace_path=None):
+    """Run ``(func, kwargs)`` steps as a dependency graph on a thread pool.
+
+    A step waits for the latest earlier step that writes what it reads, and
+    for the earlier steps that read or write what it writes, since operators
+    may change an entry in place (``create_header`` adds a column to the
+    geometry a plot is reading). See ``_step_keys``. Steps whose keys cannot be
+    told are barriers that wait for, and are waited on by, everything. Each step
+    runs on its own view of the context holding what the earlier finished steps
+    produced, so results match ``run_pipeline`` while independent branches (e.g.
+    a wavelet operator and a geometry scaling) run at once. ``plot_*`` steps run
+    on the calling thread, as pyplot is not thread-safe. Intermediate
+    entries are released as soon as no pending step can read them; an entry's
+    final value is kept if it is in ``keep`` or no later step reads it. Stops
+    scheduling at the first failure. The report is as for ``run_pipeline``.
+    """
+    steps = [(func, dict(kwargs)) for func, kwargs in steps]
+    keys = [_step_keys(func, kwargs) for func, kwargs in steps]
+    barriers = [i for i, step_keys in enumerate(keys) if step_keys is None]
+    deps = []
+    for i, step_keys in enumerate(keys):
+        if step_keys is None:
+            deps.append(set(range(i)))
+            continue
+        step_deps = {max(b for b in barriers if b < i)} if any(b < i for b in barriers) else set()
+        reads, writes_i = step_keys
+        for key in reads | writes_i:
+            writers = [j for j in range(i) if keys[j] is not None and key in keys[j][1]]
+            if writers:
+                step_deps.add(writers[-1])
+            if key in writes_i:
+                # Readers since that write must finish before the entry changes under them
+                since = writers[-1] if writers else -1
+                step_deps.update(j for j in range(since + 1, i) if keys[j] is not None and key in keys[j][0])
+        deps.append(step_deps)
+
+    report = PipelineReport()
+    changes, written = {}, {}
+    pending, running = set(range(len(steps))), {}
+    failed = False
+
+    def view(i):
+        snapshot = {}
+        for j in sorted(changes):
+            if j < i:
+                snapshot.update(changes[j])
+        return snapshot
+
+    def writes(m, key):
+        if m in written:
+            return key in written[m]
+        return keys[m] is None or key in keys[m][1]
+
+    def needed(j, key):
+        if key in keep and not any(writes(m, key) for m in range(j + 1, len(steps))):
+            return True
+        readers = [r for r in range(j + 1, len(steps)) if keys[r] is None or key in keys[r][0]]
+        for r in readers:
+            if any(writes(m, key) for m in range(j + 1, r)):
+                break
+            if r in pending:
+                return True
+        # Final value that nothing downstream consumes: this is a result of the job
+        return not readers and not any(writes(m, key) for m in range(j + 1, len(steps)))
+
+    with ThreadPoolExecutor(max_workers=max(1, int(workers))) as pool:
+        while pending or running:
+            if not failed:
+                ready = [i for i in sorted(pending) if all(j in changes for j in deps[i])]
+                # Pool steps are started first so they run while plots draw here
+                for i in sorted(ready, key=lambda i: steps[i][0].__name__.startswith("plot_")):
+                    snapshot = view(i)
+                    before = dict(snapshot)
+                    if steps[i][0].__name__.startswith("plot_"):
+                        future = Future()
+                        future.set_result(_run_graph_step(report, snapshot, i, *steps[i]))
+                    else:
+                        future = pool.submit(_run_graph_step, report, snapshot, i, *steps[i])
+                    running[future] = (i, before, snapshot)
+                    pending.discard(i)
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                i, before, snapshot = running.pop(future)
+                # Entries the step may have changed in place count as written by it
+                changes[i] = StepCache.changes(before, snapshot, None if keys[i] is None else keys[i][1])
+                written[i] = set(changes[i])
+                failed = failed or not future.result()
+            for j in changes:
+                for key in [key for key in changes[j] if not needed(j, key)]:
+                    del changes[j][key]
+
+    context = view(len(steps))
+    report.steps.sort(key=lambda step: step["step"])
+    context["pipeline_report"] = report.as_dict()
+    if report_path:
+        report.write_json(report_path)
+    if trace_path:
+        report.write_chrome_trace(trace_path)
     return context
 
 
@@ -55,4 +585,206 @@ def print_pipeline_steps(steps):
         inputs = [f"{k}={v}" for k, v in kwargs.items() if k != "output"]
         print(f"{i+1:02d}. {name}")
         print(f"    Inputs : {', '.join(inputs)}")
-        print(f"    Output : {output}\n")
\ No newline at end of file
+        print(f"    Output : {output}\n")
+
+def _resolve_trace_local_steps(steps, context):
+    """Check every step is trace-local and resolve its ``@key`` arguments from ``context``."""
+    resolved = []
+    for i, (func, kwargs) in enumerate(steps):
+        if not getattr(func, "trace_local", False):
+            raise ValueError(
+                f"Step {i+1} ({func.__name__}) is not trace-local and cannot run chunk by chunk; use run_pipeline."
+            )
+        step_kwargs = {}
+        for key, value in kwargs.items():
+            if key == "output":
+                continue
+            if isinstance(value, str) and value.startswith("@"):
+                if value[1:] not in context:
+                    raise KeyError(f"Referenced key '{value[1:]}' not found in context for step {i+1} ({func.__name__})")
+                value = context[value[1:]]
+            step_kwargs[key] = value
+        resolved.append((func, step_kwargs))
+    return resolved
+
+
+def _apply_trace_local_steps(steps, context, block, lo=0, messages=None):
+    """Run ``steps`` on one ``(samples, traces)`` block; the operators see it as ``context["data"]``.
+
+    Operators report failures by printing and returning ``None``; that message is
+    captured and raised so a failing block stops the job instead of writing zeros.
+    Other output is collected into ``messages`` (one dict of distinct lines per
+    step) so callers can print it once rather than once per block.
+    """
+    for i, (func, kwargs) in enumerate(steps):
+        block_context = {**context, "data": block}
+        captured = io.StringIO()
+        with contextlib.redirect_stdout(captured):
+            result = func(block_context, **kwargs)
+        if messages is not None:
+            messages[i].update(dict.fromkeys(line for line in captured.getvalue().splitlines() if line.strip()))
+        if not isinstance(result, np.ndarray) or result.ndim != 2 or result.shape[1] != block.shape[1]:
+            detail = captured.getvalue().strip() or f"returned {type(result).__name__}"
+            raise RuntimeError(f"{func.__name__} failed on traces {lo}-{lo + block.shape[1]}: {detail}")
+        block = result
+    return block
+
+
+def _print_step_messages(messages):
+    """Print what each step printed, once (see ``_apply_trace_local_steps``)."""
+    for lines in messages:
+        for line in lines:
+            print(line)
+
+
+def _chunked_shard_worker(task):
+    """Process one shard of traces from ``zarr_in`` to ``zarr_out``, a window at a time.
+
+    Shards start on chunk boundaries, so workers never write the same chunk and the
+    amplitudes never pass through the parent; only the per-chunk stats come back.
+    """
+    src = zarr.open(task["zarr_in"], mode="r")["amplitude"]
+    dst = zarr.open(task["zarr_out"], mode="r+")["amplitude"]
+    stats = {}
+    messages = [{} for _ in task["steps"]]
+    for lo in range(task["lo"], task["hi"], task["window"]):
+        hi = min(task["hi"], lo + task["window"])
+        block = _apply_trace_local_steps(task["steps"], task["context"], src[:, lo:hi], lo, messages)
+        block = block.astype(np.float32, copy=False)
+        dst[:, lo:hi] = block
+        stats.update(_block_chunk_stats(lo, block, task["chunk_trace"]))
+    return {"lo": task["lo"], "hi": task["hi"], "stats": stats, "messages": messages}
+
+
+def run_chunked_pipeline(
+    steps,
+    zarr_in,
+    zarr_out,
+    context=None,
+    memory_budget=DEFAULT_INGEST_MEMORY,
+    chunk_trace=None,
+    allow_overwrite=False,
+    progress_cb=None,
+    workers=1,
+    shard_traces=None,
+):
+    """Apply trace-local steps to a Zarr store window by window and write a new store.
+
+    ``steps`` are ``(func, kwargs)`` pairs as for ``run_pipeline``, restricted to
+    operators marked ``trace_local`` (``mute_data``, ``resample``, ``trim_samples``).
+    Each window of whole trace chunks is read from
+    ``zarr_in``, passed through the steps and written to ``zarr_out``, so peak memory
+    follows ``memory_budget`` rather than the survey size. Per-trace header arrays,
+    attributes and the geometry are carried over, amplitude statistics are recorded
+    as windows are written, and a manifest naming the parent store is saved.
+    A store without a geometry table gets none.
+
+    With ``workers > 1`` shards of ``shard_traces`` traces (rounded up to whole
+    chunks; by default one window) are processed in a process pool, each worker
+    reading and writing the stores directly. ``memory_budget`` is shared by the
+    workers. Steps and ``context`` must be picklable. Returns the output store path.
+    """
+    context = dict(context or {})
+    steps = _resolve_trace_local_steps(steps, context)
+    zarr_in, zarr_out = Path(zarr_in), Path(zarr_out)
+    if zarr_out.resolve() == zarr_in.resolve():
+        raise ValueError("zarr_out must differ from zarr_in.")
+    if zarr_out.exists() and not allow_overwrite:
+        raise FileExistsError(f"Output Zarr {zarr_out} exists. Set allow_overwrite=True to replace.")
+
+    src_root = zarr.open(zarr_in, mode="r")
+    src_amp = src_root["amplitude"]
+    ns, ntr = src_amp.shape
+    source_geometry = _store_geometry_path(zarr_in)
+    if not source_geometry.exists():
+        source_geometry = None
+    chunk = int(chunk_trace or src_amp.chunks[1])
+    ns_out = _apply_trace_local_steps(steps, context, src_amp[:, :1]).shape[0]
+
+    zarr_out.parent.mkdir(parents=True, exist_ok=True)
+    dst_root = zarr.open(zarr_out, mode="w")
+    dst_root.attrs.update(src_root.attrs.asdict())
+    dst_root.attrs["processing"] = _json_safe([{"step": func.__name__, **kwargs} for func, kwargs in steps])
+    dst_amp = dst_root.create_dataset(
+        "amplitude",
+        shape=(ns_out, ntr),
+        chunks=(min(src_amp.chunks[0], ns_out), chunk),
+        dtype=np.float32,
+        compressor=src_amp.compressor,
+    )
+    stats = AmplitudeStats(chunk, -(-ntr // chunk))
+    workers = max(1, int(workers or 1))
+    window = _window_traces(max(ns, ns_out), chunk, int(memory_budget) // workers)
+    shard = -(-int(shard_traces) // chunk) * chunk if shard_traces else window
+    tasks = [
+        {
+            "zarr_in": str(zarr_in),
+            "zarr_out": str(zarr_out),
+            "steps": steps,
+            "context": context,
+            "lo": lo,
+            "hi": min(ntr, lo + shard),
+            "window": min(window, shard),
+            "chunk_trace": chunk,
+        }
+        for lo in range(0, ntr, shard)
+    ]
+    done = 0
+    messages = [{} for _ in steps]
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_chunked_shard_worker, task) for task in tasks]
+            for future in as_completed(futures):
+                result = future.result()
+                stats.update(result["stats"])
+                for seen, lines in zip(messages, result["messages"]):
+                    seen.update(lines)
+                done += result["hi"] - result["lo"]
+                if progress_cb:
+                    progress_cb(done, ntr)
+    else:
+        for task in tasks:
+            result = _chunked_shard_worker(task)
+            stats.update(result["stats"])
+            for seen, lines in zip(messages, result["messages"]):
+                seen.update(lines)
+            done += result["hi"] - result["lo"]
+            if progress_cb:
+                progress_cb(done, ntr)
+    _print_step_messages(messages)
+    stats.save(dst_root)
+
+    for key in src_root.array_keys():
+        src = src_root[key]
+        if key == "amplitude" or src.ndim != 1 or src.shape[0] != ntr:
+            continue
+        dst = dst_root.create_dataset(key, data=src[:], chunks=src.chunks, compressor=src.compressor)
+        dst.attrs.update(src.attrs.asdict())
+
+    manifest_path = Path(str(zarr_in) + ".manifest.json")
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+    out_geometry = None
+    if source_geometry is not None:
+        out_geometry = Path(str(zarr_out) + ".geometry" + source_geometry.suffix)
+        shutil.copyfile(source_geometry, out_geometry)
+    index_headers = {key: (entry or {}).get("bin_width") for key, entry in (manifest.get("trace_index") or {}).items()}
+    manifest.update(
+        {
+            "dataset_id": str(uuid4()),
+            "dataset_name": zarr_out.stem,
+            "parent_store": str(zarr_in.resolve()),
+            "zarr_store": str(zarr_out.resolve()),
+            "geometry_parquet": str(out_geometry.resolve()) if out_geometry else None,
+            "samples": int(ns_out),
+            "chunk_trace": int(dst_amp.chunks[1]),
+            "chunk_sample": int(dst_amp.chunks[0]),
+            "created_at": datetime.utcnow().isoformat() + "Z",
+            "processing": dst_root.attrs["processing"],
+            "overviews": {},
+            "amplitude_stats": True,
+            "trace_index": _write_trace_indexes(out_geometry, index_headers) if out_geometry else {},
+        }
+    )
+    Path(str(zarr_out) + ".manifest.json").write_text(json.dumps(_json_safe(manifest), indent=2))
+    CHUNK_CACHE.invalidate(zarr_out)
+    return str(zarr_out.resolve())
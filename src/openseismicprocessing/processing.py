@@ -1,17 +1,29 @@
 from scipy.signal import resample_poly
 import numpy as np
 import pandas as pd
+import functools
 import os
 import inspect
 import re
 import pylops
 from pathlib import Path
+from openseismicprocessing._expressions import ExpressionError, compile_header_expression
 
 try:
     import cupy as cp
 except ImportError:  # pragma: no cover - optional dependency
     cp = None
 
+def trace_local(func):
+    """Mark an operator whose output traces depend only on the same input trace.
+
+    Such steps read ``context["data"]`` as ``(samples, traces)`` and return the new
+    array, so ``pipeline.run_chunked_pipeline`` may apply them to any block of
+    traces instead of the whole dataset.
+    """
+    func.trace_local = True
+    return func
+
 def kill_traces_outside_box(context, key_geometry='geometry', key_data='data', columns=['SourceX','SourceY','GroupX','GroupY']):
     """
     Eliminates rows in the geometry DataFrame and corresponding columns in the seismogram array 
@@ -196,6 +208,21 @@ def create_header(context, header_name, expression, key="geometry"):
     if not isinstance(df, pd.DataFrame):
         raise ValueError("'geometry' in context is not a valid DataFrame.")
 
+    # Element-wise expressions run block by block on the referenced columns only
+    try:
+        plan = compile_header_expression(expression)
+    except ExpressionError:
+        plan = None
+    if plan is not None and plan.elementwise and all(col in df.columns for col in plan.columns):
+        columns = {col: df[col].to_numpy() for col in plan.columns}
+        try:
+            result = plan.evaluate_chunked(lambda name, lo, hi: columns[name][lo:hi], len(df))
+        except Exception:
+            result = None
+        if result is not None:
+            df[header_name] = result
+            return df
+
     # Extract variable names from the expression (basic regex for word-like tokens)
     tokens = re.findall(r'\b[a-zA-Z_][a-zA-Z0-9_]*\b', expression)
     # Allowed helper names (will be injected into eval namespace)
@@ -332,6 +359,7 @@ def stack_data_along_axis(context, axis, method="sum"):
     except Exception as e:
         print(f"❌ Failed to stack data along axis {axis} using method '{method}': {e}")
         return None
+@trace_local
 def mute_data(context, start_sample):
     data = context.get("data")
 
@@ -368,6 +396,7 @@ def mute_data(context, start_sample):
     except Exception as e:
         print(f"❌ Failed to mute data: {e}")
         return None
+@trace_local
 def resample(context, dt_in, dt_out, key='data', method="polyphase"):
     data = context.get(key)
     # survey_time = (len(data) - 1) * dt_in
@@ -412,6 +441,7 @@ def resample(context, dt_in, dt_out, key='data', method="polyphase"):
     except Exception as e:
         print(f"❌ Failed to resample data: {e}")
         return None
+@trace_local
 def trim_samples(context, target_samples):
     data = context.get("data")
 
@@ -515,6 +545,7 @@ def calculate_convolution_operator(context, key="data", threshold_ratio=0.002):
         return None
     
 def free_gpu_memory(func):
+    @functools.wraps(func)
     def wrapper_func(*args, **kwargs):
         retval = func(*args, **kwargs)
         if cp is not None:
@@ -605,16 +636,12 @@ def sort(context, header1, header2=None, key_data="data", key_geometry="geometry
         return None
 
     try:
-        # Sort geometry
+        # One stable permutation reorders both geometry rows and data columns.
+        # Out-of-core stores: zarr_utils.reorganize_zarr(context, store, sort_cols, out_zarr=...)
         sort_cols = [header1] if header2 is None else [header1, header2]
-        sorted_df = df.sort_values(by=sort_cols, ignore_index=True)
-        sorted_indices = sorted_df.index.to_numpy()
-
-        # Use original DataFrame to find old-to-new index mapping
-        sorted_positions = df.sort_values(by=sort_cols).index.to_numpy()
-
-        # Reorder seismic data columns to match new geometry
-        sorted_data = data[:, sorted_positions]
+        sorted_positions = np.lexsort([df[col].to_numpy() for col in reversed(sort_cols)])
+        sorted_df = df.iloc[sorted_positions].reset_index(drop=True)
+        sorted_data = np.take(data, sorted_positions, axis=1)
 
         # Update context
         context[key_geometry] = sorted_df
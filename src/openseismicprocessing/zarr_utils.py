@@ -5,6 +5,7 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Iterable, Sequence, Optional, Tuple, Dict, Union, Any, Callable
 
+import numba as nb
 import numpy as np
 import segyio
 import segyio.tools
@@ -12,10 +13,26 @@ import zarr
 from numcodecs import Blosc
 import matplotlib.pyplot as plt
 import pandas as pd
+import contextlib
+import hashlib
 import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
 from uuid import uuid4
 from openseismicprocessing.constants import TRACE_HEADER_REV0, TRACE_HEADER_REV1
+from openseismicprocessing._expressions import compile_header_expression
+from openseismicprocessing._io import (
+    _attribute_spec,
+    read_trace_headers,
+    read_trace_samples,
+    segy_layout,
+    segyio_header_spec,
+)
 
 try:
     import pyarrow as pa
@@ -24,6 +41,26 @@ except Exception:
     pa = None
     pq = None
 
+DEFAULT_INGEST_MEMORY = 512 * 1024**2  # bytes of decoded traces held in memory during ingest
+DEFAULT_CHUNK_CACHE_BYTES = 512 * 1024**2  # decompressed amplitude chunks kept for repeat reads
+SCAN_CACHE_VERSION = 1
+BUCKET_FLUSH_BYTES = 4 * 1024**2  # traces buffered per bucket before an external sort appends them to its spill file
+BUCKET_MAX_OPEN_FILES = 256  # spill files an external sort keeps open; beyond that each flush reopens its file
+GEOMETRY_ROW_GROUP_ROWS = 1 << 16  # geometry rows per Parquet row group: the unit that filters skip or read
+SCAN_MAX_STORED_VALUES = 256  # distinct header values kept per file so survey-wide unique counts stay exact
+
+OVERVIEW_METHODS = ("maxabs", "rms")
+STATS_HIST_OCTAVES = (-40, 40)  # stats histogram covers |x| from 2**-40 to 2**40 ...
+STATS_HIST_BINS_PER_OCTAVE = 4  # ... in quarter-octave bins (values within 19% of the bin edge)
+DEFAULT_INDEX_HEADERS = ("fldr", "cdp", "iline", "xline", "offset")  # gather keys indexed at ingest when present
+
+# access pattern -> (samples per chunk or None for whole traces, target uncompressed bytes per chunk)
+CHUNK_ACCESS_PATTERNS = {
+    "gather": (None, 4 * 1024**2),      # browse shot/CMP gathers: whole traces, modest trace runs
+    "timeslice": (64, 4 * 1024**2),     # time/depth slices: short sample runs across many traces
+    "trace": (None, 16 * 1024**2),      # full-trace processing: whole traces, large streaming blocks
+}
+
 
 def _json_safe(obj):
     """Convert objects to JSON-serializable forms."""
@@ -88,37 +125,27 @@ def preview_segy_headers(
     lower_to_original = {h.lower(): h for h in headers}
     collected: Dict[str, list[float]] = {h: [] for h in headers}
 
+    spec = segyio_header_spec()
+    fields = [h for h in headers if h in spec and h.lower() != "offset"]
+    if "offset" in lower_to_original:
+        fields = list(dict.fromkeys(fields + ["SourceX", "GroupX"]))
+
     remaining = int(n_traces)
     for file_path in files[:max_files]:
         if remaining <= 0:
             break
-        try:
-            f = segyio.open(file_path, "r", ignore_geometry=False)
-            _ = f.ilines
-        except Exception:
-            f = segyio.open(file_path, "r", ignore_geometry=True)
-
-        with f:
-            ntr = len(f.trace)
-            count = min(remaining, ntr)
-
-            if "offset" in lower_to_original:
-                try:
-                    sx = np.fromiter((f.header[i][segyio.TraceField.SourceX] for i in range(count)), dtype=np.float64)
-                    gx = np.fromiter((f.header[i][segyio.TraceField.GroupX] for i in range(count)), dtype=np.float64)
-                    collected[lower_to_original["offset"]].extend(np.abs(sx - gx))
-                except Exception:
-                    pass
-
-            for lower, original in lower_to_original.items():
-                if lower == "offset":
-                    continue
-                try:
-                    field = getattr(segyio.TraceField, original)
-                except AttributeError:
-                    continue
-                values = np.fromiter((f.header[i][field] for i in range(count)), dtype=np.float64)
-                collected[original].extend(values)
+        columns = _read_segy_header_fields(file_path, spec, fields, stop=remaining)
+        count = len(next(iter(columns.values()))) if columns else 0
+
+        if "offset" in lower_to_original and "SourceX" in columns and "GroupX" in columns:
+            sx = columns["SourceX"].astype(np.float64)
+            gx = columns["GroupX"].astype(np.float64)
+            collected[lower_to_original["offset"]].extend(np.abs(sx - gx))
+
+        for lower, original in lower_to_original.items():
+            if lower == "offset" or original not in columns:
+                continue
+            collected[original].extend(columns[original].astype(np.float64))
 
         remaining -= count
 
@@ -168,6 +195,1242 @@ def preview_segy_headers(
     return df
 
 
+def _read_segy_header_fields(
+    file_path: Path,
+    header_spec: Dict[str, Tuple[int, int]],
+    fields: Sequence[str],
+    stop: Optional[int] = None,
+) -> Dict[str, np.ndarray]:
+    """Read whole header columns for traces [0, stop), memory-mapped when the layout allows it."""
+    decoded = read_trace_headers(file_path, header_spec, fields=fields, stop=stop)
+    if decoded is not None:
+        return decoded
+    columns: Dict[str, np.ndarray] = {}
+    with segyio.open(file_path, "r", ignore_geometry=True) as f:
+        ntr = len(f.trace) if stop is None else min(int(stop), len(f.trace))
+        for name in fields:
+            byte, _ = header_spec[name]
+            try:
+                columns[name] = np.asarray(f.attributes(byte)[:ntr])
+            except Exception:
+                continue
+    return columns
+
+
+def _scan_cache_path(file_path: Path) -> Path:
+    """Sidecar next to the SEG-Y file, or a per-user cache entry when that folder is read-only."""
+    if os.access(file_path.parent, os.W_OK):
+        return Path(str(file_path) + ".scan.json")
+    digest = hashlib.sha1(str(file_path).encode("utf-8")).hexdigest()
+    return Path.home() / ".cache" / "openseismicprocessing" / "scan" / f"{digest}.json"
+
+
+def _header_spec_key(header_spec: Dict[str, Tuple[int, int]]) -> str:
+    payload = json.dumps(sorted((k, list(v)) for k, v in header_spec.items()))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _column_stats(values: np.ndarray) -> Dict[str, Any]:
+    values = np.asarray(values, dtype=np.float64)
+    uniq = np.unique(values)
+    stats: Dict[str, Any] = {
+        "min": float(uniq[0]) if uniq.size else None,
+        "max": float(uniq[-1]) if uniq.size else None,
+        "count": int(values.size),
+        "sum": float(values.sum()),
+        "sumsq": float(np.square(values).sum()),
+        "unique": int(uniq.size),
+    }
+    if uniq.size <= SCAN_MAX_STORED_VALUES:
+        stats["values"] = uniq.tolist()
+    return stats
+
+
+def _scan_segy_file(
+    file_path: Path,
+    header_spec: Dict[str, Tuple[int, int]],
+    header_stats: bool,
+    use_cache: bool,
+) -> Dict[str, Any]:
+    """Counts, sampling and (optionally) per-header statistics of one file, via the sidecar cache."""
+    fingerprint = _file_fingerprint(file_path)
+    spec_key = _header_spec_key(header_spec)
+    cache_path = _scan_cache_path(file_path)
+
+    cached: Dict[str, Any] | None = None
+    if use_cache and cache_path.exists():
+        try:
+            cached = json.loads(cache_path.read_text())
+        except Exception:
+            cached = None
+        if not cached or cached.get("version") != SCAN_CACHE_VERSION or cached.get("fingerprint") != fingerprint:
+            cached = None
+    if cached is not None:
+        stats = cached.get("header_stats", {}).get(spec_key)
+        if stats is not None or not header_stats:
+            return {**cached["info"], "file": str(file_path), "header_stats": stats or {}, "cached": True}
+
+    if cached is not None:
+        info = cached["info"]
+    else:
+        with segyio.open(file_path, "r", ignore_geometry=True) as f:
+            try:
+                dt = float(segyio.tools.dt(f)) / 1000.0
+            except Exception:
+                dt = 0.0
+            info = {
+                "file": str(file_path),
+                "traces": int(f.tracecount),
+                "samples": int(len(f.samples)),
+                "dt": dt,
+                "format": int(f.format) if f.format is not None else None,
+                **fingerprint,
+            }
+        cached = {"version": SCAN_CACHE_VERSION, "fingerprint": fingerprint, "info": info, "header_stats": {}}
+
+    stats = {}
+    if header_stats:
+        fields = [name for name, (_, length) in header_spec.items() if length in (2, 4)]
+        columns = _read_segy_header_fields(file_path, header_spec, fields)
+        stats = {name: _column_stats(values) for name, values in columns.items()}
+        cached["header_stats"][spec_key] = stats
+
+    if use_cache:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+            tmp_path.write_text(json.dumps(_json_safe(cached)))
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+    return {**info, "file": str(file_path), "header_stats": stats, "cached": False}
+
+
+def _scan_segy_files(
+    files: Sequence[Path],
+    header_spec: Dict[str, Tuple[int, int]] | None = None,
+    header_stats: bool = False,
+    workers: int = 4,
+    use_cache: bool = True,
+) -> list[Dict[str, Any]]:
+    header_spec = header_spec or TRACE_HEADER_REV0
+    files = [Path(f) for f in files]
+
+    def _scan(path: Path) -> Dict[str, Any]:
+        return _scan_segy_file(path, header_spec, header_stats, use_cache)
+
+    if workers <= 1 or len(files) <= 1:
+        return [_scan(path) for path in files]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_scan, files))
+
+
+def _merge_header_stats(per_file: Sequence[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """Combine per-file header statistics into survey-wide min/max/mean/std/unique."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    names = dict.fromkeys(name for stats in per_file for name in stats)
+    for name in names:
+        parts = [stats[name] for stats in per_file if name in stats and stats[name]["count"]]
+        if not parts:
+            continue
+        count = sum(p["count"] for p in parts)
+        mean = sum(p["sum"] for p in parts) / count
+        var = max(0.0, sum(p["sumsq"] for p in parts) / count - mean * mean)
+        if all("values" in p for p in parts):
+            unique = len(set().union(*(p["values"] for p in parts)))
+            exact = True
+        else:
+            unique = max(p["unique"] for p in parts)
+            exact = len(parts) == 1
+        merged[name] = {
+            "min": min(p["min"] for p in parts),
+            "max": max(p["max"] for p in parts),
+            "mean": mean,
+            "std": float(np.sqrt(var)),
+            "unique": int(unique),
+            "unique_exact": exact,
+        }
+    return merged
+
+
+def scan_segy_files(
+    context: dict,
+    segy_paths: Union[str, Path, Sequence[Union[str, Path]]],
+    header_spec: Dict[str, Tuple[int, int]] | None = None,
+    header_stats: bool = True,
+    workers: int = 4,
+    use_cache: bool = True,
+    output: str = "segy_scan",
+) -> Dict[str, Any]:
+    """Pre-scan SEG-Y files in parallel for counts, dt and per-header min/max/unique, cached per file."""
+    files = _resolve_segy_inputs(segy_paths)
+    entries = _scan_segy_files(files, header_spec, header_stats, workers, use_cache)
+    samples = sorted({entry["samples"] for entry in entries})
+    dts = sorted({entry["dt"] for entry in entries})
+    scan = {
+        "files": entries,
+        "total_traces": int(sum(entry["traces"] for entry in entries)),
+        "samples": samples[0] if len(samples) == 1 else samples,
+        "dt": dts[0] if len(dts) == 1 else dts,
+        "headers": _merge_header_stats([entry["header_stats"] for entry in entries]) if header_stats else {},
+    }
+    context[output] = scan
+    return scan
+
+
+def _open_segy(file_path: Union[str, Path]):
+    """Open a SEG-Y file, parsing inline geometry when the file supports it."""
+    try:
+        f = segyio.open(file_path, "r", ignore_geometry=False)
+        _ = f.ilines  # trigger inline parsing; fails for 2D
+    except Exception:
+        f = segyio.open(file_path, "r", ignore_geometry=True)
+    return f
+
+
+def _file_entry(f, file_path: Path) -> Dict[str, Any]:
+    """Collect the binary and text header metadata recorded per ingested file."""
+    entry: Dict[str, Any] = {"file": str(file_path)}
+    try:
+        entry["binary_header"] = {
+            str(key): int(value) for key, value in f.bin.items()
+        }
+    except Exception:
+        entry["binary_header"] = {}
+
+    try:
+        wrapped_text = segyio.tools.wrap(f.text[0])
+        entry["text_header"] = wrapped_text.splitlines()
+    except Exception:
+        entry["text_header"] = []
+    return entry
+
+
+def _read_header_columns(
+    f,
+    file_path: str,
+    headers: Sequence[str],
+    header_spec: Dict[str, Tuple[int, int]],
+    ntr: int,
+) -> Dict[str, np.ndarray]:
+    """Read the requested trace-header fields of an open SEG-Y file as float32 columns."""
+    fields = [name for name in headers if name in header_spec]
+    spec = _attribute_spec(header_spec, fields)
+    decoded = read_trace_headers(file_path, spec, fields=list(spec), stop=ntr) or {}
+
+    geom: Dict[str, np.ndarray] = {}
+    for name in fields:
+        if name in decoded:
+            geom[name] = decoded[name].astype(np.float32)
+            continue
+        # Not fixed-length (or a byte segyio rejects): one segyio scan for this field
+        offset_bytes, _ = header_spec[name]
+        try:
+            vals = f.attributes(offset_bytes)[:ntr]
+        except Exception:
+            continue
+        geom[name] = np.asarray(vals, dtype=np.float32)
+    return geom
+
+
+def _fixed_layout(f, file_path):
+    """Return the memory-map layout of an open SEG-Y file, or None when segyio must read it."""
+    layout = segy_layout(file_path)
+    if layout is None or layout.sample_format not in (1, 5):
+        return None
+    if layout.trace_count != len(f.trace) or layout.samples != len(f.samples):
+        return None
+    return layout
+
+
+def _read_trace_window(f, layout, lo: int, hi: int, threads: Optional[int] = None) -> np.ndarray:
+    """Decode traces [lo, hi) of an open SEG-Y file as a (samples, traces) float32 block."""
+    if layout is not None:
+        return read_trace_samples(layout, lo, hi, threads=threads)
+    return np.ascontiguousarray(np.asarray(f.trace.raw[lo:hi], dtype=np.float32).T)
+
+
+def _scale_array(val, length: int) -> np.ndarray:
+    """Convert SEG-Y scalar semantics to multiplicative array.
+
+    Positive scalar => multiply by scalar.
+    Negative scalar => divide by abs(scalar).
+    0 or None => no scaling (all 1s).
+    """
+    arr = np.ones(length, dtype=np.float32)
+    if val is None:
+        return arr
+
+    v = np.asarray(val)
+
+    # scalar
+    if v.shape == () or v.size == 1:
+        scalar = float(v)
+        if scalar == 0:
+            return arr
+        arr = np.full(length, scalar if scalar > 0 else 1.0 / abs(scalar), dtype=np.float32)
+        return arr
+
+    # array of scalars
+    v = v.astype(np.float32, copy=False).flatten()
+    if v.size != length:
+        v = np.resize(v, length)
+    pos = v > 0
+    neg = v < 0
+    arr[pos] = v[pos]
+    arr[neg] = 1.0 / np.abs(v[neg])
+    return arr
+
+
+def _resolve_scale_map(
+    coord_scales: Union[Dict[str, float], Callable[[Path, Any], Dict[str, float]], None],
+    file_path: Path,
+    f,
+    lower_to_original: Dict[str, str],
+) -> Dict[str, Any]:
+    """Evaluate ``coord_scales`` for one file and key it by lower-case header name."""
+    if callable(coord_scales):
+        try:
+            scale_map = coord_scales(file_path, f)
+        except Exception:
+            scale_map = {}
+    else:
+        scale_map = coord_scales or {}
+
+    # Normalize scale map keys to canonical header names
+    scale_map_lower: Dict[str, Any] = {}
+    for raw_key, val in (scale_map or {}).items():
+        lk = str(raw_key).lower()
+        canonical = lower_to_original.get(lk)
+        if canonical is not None:
+            scale_map_lower[canonical.lower()] = val
+        else:
+            # fallback – allow arbitrary keys that already match geom names
+            scale_map_lower[lk] = val
+    return scale_map_lower
+
+
+def _window_traces(ns: int, chunk_trace: int, memory_budget: int) -> int:
+    """Traces per read window: the largest multiple of ``chunk_trace`` that fits the budget.
+
+    A window is held twice (as read and transposed), so each trace costs ``2 * ns`` floats.
+    The window never drops below one chunk so every full chunk is written in one go.
+    """
+    per_trace = max(1, 2 * int(ns) * np.dtype(np.float32).itemsize)
+    n_chunks = int(memory_budget) // (per_trace * int(chunk_trace))
+    return max(1, n_chunks) * int(chunk_trace)
+
+
+def _trace_windows(start: int, ntr: int, chunk_trace: int, window: int):
+    """Yield file-local ``(lo, hi)`` trace windows whose global edges fall on chunk boundaries."""
+    lo = 0
+    while lo < ntr:
+        chunk_start = ((start + lo) // chunk_trace) * chunk_trace
+        hi = min(ntr, chunk_start + window - start)
+        yield lo, hi
+        lo = hi
+
+
+def _ingest_log_path(zarr_out: Path) -> Path:
+    return Path(str(zarr_out) + ".ingest.jsonl")
+
+
+def _file_fingerprint(file_path: Path) -> Dict[str, int]:
+    st = os.stat(file_path)
+    return {"size": int(st.st_size), "mtime_ns": int(st.st_mtime_ns)}
+
+
+def _append_ingest_log(log_path: Path, record: Dict[str, Any], mode: str = "a") -> None:
+    """Append one JSON line to the ingest log and push it to disk."""
+    with open(log_path, mode, encoding="utf-8") as fh:
+        fh.write(json.dumps(_json_safe(record)) + "\n")
+        fh.flush()
+        os.fsync(fh.fileno())
+
+
+def _start_ingest_log(log_path: Path, record: Dict[str, Any]) -> None:
+    _append_ingest_log(log_path, record, mode="w")
+
+
+def _read_ingest_log(log_path: Path) -> list[Dict[str, Any]]:
+    """Read the ingest log, cutting off a torn last line left behind by a crash."""
+    data = log_path.read_bytes()
+    records: list[Dict[str, Any]] = []
+    good = 0
+    for line in data.splitlines(keepends=True):
+        if not line.endswith(b"\n"):
+            break
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            break
+        good += len(line)
+    if good < len(data):
+        with open(log_path, "r+b") as fh:
+            fh.truncate(good)
+    return records
+
+
+def _load_resume_state(log_path: Path, files: Sequence[Path]) -> Dict[str, Any] | None:
+    """Return the start record and commits of an interrupted ingest of ``files``, if any."""
+    if not log_path.exists():
+        return None
+    records = _read_ingest_log(log_path)
+    if not records or records[0].get("event") != "start":
+        return None
+    if any(record.get("event") == "complete" for record in records):
+        return None
+
+    start = records[0]
+    if start.get("inputs") != [str(f) for f in files]:
+        raise RuntimeError(
+            f"{log_path} records an interrupted ingest of different inputs. "
+            "Pass allow_overwrite=True to start over or resume=False to ignore it."
+        )
+    commits = [record for record in records[1:] if record.get("event") == "commit"]
+    for i, commit in enumerate(commits):
+        if int(commit["file_index"]) != i:
+            raise RuntimeError(f"{log_path} is out of order at commit {i}.")
+        if _file_fingerprint(files[i]) != {"size": commit["size"], "mtime_ns": commit["mtime_ns"]}:
+            raise RuntimeError(
+                f"{files[i]} changed since it was ingested; pass allow_overwrite=True to start over."
+            )
+    return {"start": start, "commits": commits}
+
+
+def _read_geometry_file_ids(geometry_path: Path) -> np.ndarray:
+    if geometry_path.suffix.lower() == ".csv":
+        return pd.read_csv(geometry_path, usecols=["file_id"], engine="c")["file_id"].to_numpy()
+    return pd.read_parquet(geometry_path, columns=["file_id"])["file_id"].to_numpy()
+
+
+def _merge_geometry_parts(
+    geometry_path: Path,
+    parts: Sequence[Path],
+    previous: Path | None,
+    previous_rows: int,
+) -> Path:
+    """Combine the staged per-file geometry parts (after ``previous_rows`` existing rows) into one table.
+
+    The result is written next to ``geometry_path`` and moved into place, so a crash
+    never leaves a half-written table; re-running the merge gives the same file.
+    """
+    tmp_path = geometry_path.with_name(geometry_path.name + ".tmp")
+    if pa is not None and pq is not None and geometry_path.suffix.lower() != ".csv":
+        tables = []
+        if previous is not None and previous_rows:
+            tables.append(lambda: pq.read_table(previous).slice(0, previous_rows))
+        tables.extend(lambda part=part: pq.read_table(part) for part in parts)
+        if not tables:
+            return geometry_path
+        writer = None
+        try:
+            for load in tables:
+                table = load()
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema)
+                elif table.schema != writer.schema:
+                    table = table.cast(writer.schema)
+                writer.write_table(table, row_group_size=GEOMETRY_ROW_GROUP_ROWS)
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        frames = []
+        if previous is not None and previous_rows:
+            frames.append(pd.read_csv(previous, nrows=previous_rows))
+        frames.extend(pd.read_csv(part) for part in parts)
+        if not frames:
+            return geometry_path
+        pd.concat(frames, ignore_index=True).to_csv(tmp_path, index=False)
+    os.replace(tmp_path, geometry_path)
+    return geometry_path
+
+
+class TraceHeaderIndex:
+    """Inverted index from the values of one geometry column to amplitude columns.
+
+    ``values`` holds the distinct key values in ascending order (the lower edge of
+    each bin when ``bin_width`` is set); the columns carrying ``values[i]`` are
+    ``rows[offsets[i]:offsets[i + 1]]``, ascending. Rows are positions in the
+    geometry table, i.e. ``amplitude`` columns (equal to ``trace_id`` for ingested
+    stores), so a gather is a binary search and a slice instead of a full scan.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        values: np.ndarray,
+        offsets: np.ndarray,
+        rows: np.ndarray,
+        bin_width: float | None = None,
+        source: Dict[str, int] | None = None,
+    ):
+        self.key = str(key)
+        self.values = np.asarray(values)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.bin_width = float(bin_width) if bin_width else None
+        self.source = dict(source or {})
+        counts = np.diff(self.offsets)
+        spans = self.rows[self.offsets[1:] - 1] - self.rows[self.offsets[:-1]]
+        self.contiguous = (counts > 0) & (spans == counts - 1)
+
+    @classmethod
+    def build(cls, column: np.ndarray, key: str, bin_width: float | None = None, source=None) -> "TraceHeaderIndex":
+        """Index one geometry column (a stable sort, so rows stay ascending per value)."""
+        column = np.asarray(column)
+        if bin_width:
+            column = np.floor(column / bin_width) * bin_width
+        rows = np.argsort(column, kind="stable")
+        values, starts = np.unique(column[rows], return_index=True)
+        offsets = np.append(starts, len(rows)).astype(np.int64)
+        return cls(key, values, offsets, rows, bin_width=bin_width, source=source)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "TraceHeaderIndex":
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            return cls(
+                meta["key"],
+                data["values"],
+                data["offsets"],
+                data["rows"],
+                bin_width=meta.get("bin_width"),
+                source=meta.get("source"),
+            )
+
+    def save(self, path: Union[str, Path]) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {"key": self.key, "bin_width": self.bin_width, "source": self.source}
+        tmp_path = path.with_name(path.name + ".tmp.npz")
+        np.savez(tmp_path, values=self.values, offsets=self.offsets, rows=self.rows, meta=json.dumps(meta))
+        os.replace(tmp_path, path)
+        return path
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def _position(self, value) -> int:
+        if self.bin_width:
+            value = np.floor(float(value) / self.bin_width) * self.bin_width
+        i = int(np.searchsorted(self.values, value))
+        if i < len(self.values) and self.values[i] == value:
+            return i
+        return -1
+
+    def lookup(self, value) -> np.ndarray:
+        """Ascending rows whose key equals ``value`` (or falls in its bin); empty if absent."""
+        i = self._position(value)
+        if i < 0:
+            return self.rows[:0]
+        return self.rows[self.offsets[i] : self.offsets[i + 1]]
+
+    def trace_slice(self, value) -> slice | None:
+        """``slice`` over the rows of ``value`` when they are contiguous, else ``None``."""
+        i = self._position(value)
+        if i < 0 or not self.contiguous[i]:
+            return None
+        first = int(self.rows[self.offsets[i]])
+        return slice(first, first + int(self.offsets[i + 1] - self.offsets[i]))
+
+
+def _trace_index_path(geometry_path: Union[str, Path], key: str) -> Path:
+    return Path(str(geometry_path) + ".index") / f"{key}.npz"
+
+
+def _read_geometry_columns(geometry_path: Path, columns: Sequence[str]) -> pd.DataFrame:
+    if geometry_path.suffix.lower() == ".csv":
+        return pd.read_csv(geometry_path, usecols=list(columns), engine="c")
+    return pd.read_parquet(geometry_path, columns=list(columns))
+
+
+def _geometry_column_names(geometry_path: Path) -> list[str]:
+    if geometry_path.suffix.lower() == ".csv":
+        return list(pd.read_csv(geometry_path, nrows=0).columns)
+    return list(pq.ParquetFile(geometry_path).schema_arrow.names)
+
+
+def _geometry_row_count(geometry_path: Path) -> int:
+    if geometry_path.suffix.lower() == ".csv":
+        return len(pd.read_csv(geometry_path, usecols=[0]))
+    return pq.ParquetFile(geometry_path).metadata.num_rows
+
+
+def _scan_geometry(parquet, plan, columns: Sequence[str] = ()) -> Tuple[np.ndarray, pd.DataFrame | None]:
+    """Rows of a Parquet geometry where ``plan`` holds, and their ``columns``.
+
+    Row groups whose min/max statistics rule the expression out are skipped;
+    the others are read with only the expression's and the requested columns.
+    """
+    names = parquet.schema_arrow.names
+    positions = {name: names.index(name) for name in plan.columns}
+    read = list(dict.fromkeys([*plan.columns, *columns]))
+    chunks, tables = [], []
+    row = 0
+    for group in range(parquet.num_row_groups):
+        meta = parquet.metadata.row_group(group)
+        stats = {}
+        for name, position in positions.items():
+            column_stats = meta.column(position).statistics
+            if column_stats is not None and column_stats.has_min_max:
+                stats[name] = (column_stats.min, column_stats.max)
+        if plan.may_match(stats):
+            table = parquet.read_row_group(group, columns=read)
+            values = {name: table.column(name).to_numpy() for name in plan.columns}
+            mask = np.broadcast_to(np.asarray(plan.evaluate(values), dtype=bool), (meta.num_rows,))
+            hits = np.flatnonzero(mask)
+            if hits.size:
+                chunks.append(hits + row)
+                if columns:
+                    tables.append(table.select(list(columns)).take(pa.array(hits)))
+        row += meta.num_rows
+    indices = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
+    if not columns:
+        return indices, None
+    if tables:
+        frame = pa.concat_tables(tables).to_pandas()
+    else:
+        frame = parquet.schema_arrow.empty_table().select(list(columns)).to_pandas()
+    frame.index = pd.Index(indices, name="trace")
+    return indices, frame
+
+
+def _geometry_filter_expression(filters: Union[str, Dict[str, Any]]) -> str:
+    """``{"fldr": 1234, "offset": (0, 500), "cdp": [10, 11]}`` as a header expression."""
+    if isinstance(filters, str):
+        return filters
+
+    def literal(value):
+        return repr(value.item() if hasattr(value, "item") else value)
+
+    terms = []
+    for header, value in filters.items():
+        if not str(header).isidentifier():
+            raise ValueError(f"Header '{header}' cannot be used in a filter")
+        if isinstance(value, tuple):
+            low, high = value
+            if low is not None:
+                terms.append(f"({header} >= {literal(low)})")
+            if high is not None:
+                terms.append(f"({header} <= {literal(high)})")
+        elif isinstance(value, (list, set, frozenset, np.ndarray)):
+            terms.append(f"np.isin({header}, [{', '.join(literal(v) for v in sorted(value))}])")
+        else:
+            terms.append(f"({header} == {literal(value)})")
+    if not terms:
+        raise ValueError("No filters given")
+    return " & ".join(terms)
+
+
+def select_traces(
+    context: dict,
+    geometry: Union[str, Path, Dict[str, Any]],
+    filters: Union[str, Dict[str, Any]],
+    columns: Optional[Sequence[str]] = None,
+    output: str = "trace_selection",
+) -> pd.DataFrame:
+    """Geometry rows matching ``filters``, reading only the needed columns and row groups.
+
+    Parameters
+    ----------
+    context : dict
+        Pipeline context that receives the selection.
+    geometry : str | Path | dict
+        Geometry table, or a Zarr store (path or manifest-like dict) whose geometry to use.
+    filters : str | dict
+        A header expression (``"fldr == 1234"``, ``"(offset >= 0) & (offset <= 500)"``)
+        or a dict mapping headers to a value, a ``(low, high)`` range (either end may
+        be ``None``) or a list of values.
+    columns : sequence of str, optional
+        Columns to return (default: all).
+    output : str
+        Context key for the returned DataFrame.
+
+    Returns
+    -------
+    pd.DataFrame
+        Matching rows indexed by ``trace`` (geometry row, i.e. amplitude column).
+        Parquet row groups whose statistics rule the filters out are not read,
+        so selections on a geometry sorted by the filtered header (see
+        ``reorganize_zarr``) touch only a few row groups.
+    """
+    geometry = geometry["file_path"] if isinstance(geometry, dict) else geometry
+    geometry_path = Path(geometry)
+    if geometry_path.suffix.lower() not in {".parquet", ".csv"}:
+        geometry_path = _store_geometry_path(geometry_path)
+    plan = compile_header_expression(_geometry_filter_expression(filters))
+    available = _geometry_column_names(geometry_path)
+    missing = [name for name in plan.columns if name not in available]
+    if missing:
+        raise KeyError(f"Headers not found in geometry {geometry_path}: {', '.join(missing)}")
+    columns = list(available if columns is None else columns)
+
+    if plan.elementwise and pq is not None and geometry_path.suffix.lower() != ".csv":
+        indices, frame = _scan_geometry(pq.ParquetFile(geometry_path), plan, columns)
+        if frame is None:
+            frame = pd.DataFrame(index=pd.Index(indices, name="trace"))
+    else:
+        table = _read_geometry_columns(geometry_path, list(dict.fromkeys([*plan.columns, *columns])))
+        mask = np.asarray(plan.evaluate({name: table[name].to_numpy() for name in plan.columns}), dtype=bool)
+        rows = np.flatnonzero(np.broadcast_to(mask, (len(table),)))
+        frame = table.iloc[rows][columns]
+        frame.index = pd.Index(rows, name="trace")
+    context[output] = frame
+    return frame
+
+
+def read_geometry_rows(
+    geometry_path: Union[str, Path],
+    rows: Sequence[int],
+    columns: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """Geometry rows ``rows`` (in that order), reading only the row groups that hold them."""
+    geometry_path = Path(geometry_path)
+    rows = np.asarray(rows, dtype=np.int64)
+    if pq is None or geometry_path.suffix.lower() == ".csv":
+        table = _read_geometry(geometry_path) if columns is None else _read_geometry_columns(geometry_path, columns)
+        frame = table.iloc[rows]
+        frame.index = pd.Index(rows, name="trace")
+        return frame
+    parquet = pq.ParquetFile(geometry_path)
+    if rows.size == 0:
+        table = parquet.schema_arrow.empty_table()
+        frame = (table if columns is None else table.select(list(columns))).to_pandas()
+        frame.index = pd.Index(rows, name="trace")
+        return frame
+    starts = np.cumsum([0] + [parquet.metadata.row_group(g).num_rows for g in range(parquet.num_row_groups)])
+    groups = np.searchsorted(starts, rows, side="right") - 1
+    needed = np.unique(groups)
+    # Position of each needed group's first row once the groups are read back to back
+    sizes = np.diff(starts)[needed]
+    first = dict(zip(needed.tolist(), np.concatenate([[0], np.cumsum(sizes)[:-1]]).tolist()))
+    positions = rows - starts[groups] + np.array([first[g] for g in groups.tolist()], dtype=np.int64)
+    table = parquet.read_row_groups(needed.tolist(), columns=None if columns is None else list(columns))
+    frame = table.take(pa.array(positions)).to_pandas()
+    frame.index = pd.Index(rows, name="trace")
+    return frame
+
+
+def _default_index_headers(headers: Sequence[str], selected_headers: Dict[str, Any] | None) -> Dict[str, float | None]:
+    by_lower = {str(h).lower(): h for h in headers}
+    keys = [by_lower[name] for name in DEFAULT_INDEX_HEADERS if name in by_lower]
+    for role in ("inline_header", "xline_header"):
+        name = (selected_headers or {}).get(role)
+        if name in headers:
+            keys.append(name)
+    return dict.fromkeys(keys)
+
+
+def _write_trace_indexes(geometry_path: Path, index_headers: Dict[str, float | None]) -> Dict[str, Any]:
+    """Build one sidecar per key from the final geometry table; returns the manifest entries."""
+    if not index_headers:
+        return {}
+    columns = _read_geometry_columns(geometry_path, list(index_headers))
+    source = _file_fingerprint(geometry_path)
+    entries = {}
+    for key, bin_width in index_headers.items():
+        index = TraceHeaderIndex.build(columns[key].to_numpy(), key, bin_width=bin_width, source=source)
+        path = index.save(_trace_index_path(geometry_path, key))
+        entries[key] = {"path": str(path.resolve()), "bin_width": index.bin_width, "values": len(index)}
+    return entries
+
+
+def load_trace_index(
+    geometry_path: Union[str, Path],
+    key: str,
+    bin_width: float | None = None,
+) -> TraceHeaderIndex | None:
+    """Load the index sidecar of ``key``; ``None`` if it is missing, binned differently or older than the geometry."""
+    path = _trace_index_path(geometry_path, key)
+    try:
+        index = TraceHeaderIndex.load(path)
+    except Exception:
+        return None
+    if (index.bin_width or None) != (float(bin_width) if bin_width else None):
+        return None
+    if index.source != _file_fingerprint(Path(geometry_path)):
+        return None
+    return index
+
+
+def build_trace_index(
+    context: dict,
+    geometry_path: Union[str, Path],
+    index_headers: Union[Sequence[str], Dict[str, float | None]],
+    output: str = "trace_index",
+) -> Dict[str, TraceHeaderIndex]:
+    """Build (or rebuild) trace-header index sidecars for an existing geometry table."""
+    geometry_path = Path(geometry_path)
+    if not isinstance(index_headers, dict):
+        index_headers = dict.fromkeys(index_headers)
+    _write_trace_indexes(geometry_path, index_headers)
+    indexes = {key: load_trace_index(geometry_path, key, bin_width) for key, bin_width in index_headers.items()}
+    context[output] = indexes
+    return indexes
+
+
+def plan_chunk_shape(
+    ns: int,
+    ntraces: int,
+    access_pattern: str = "gather",
+    itemsize: int = 4,
+    target_bytes: int | None = None,
+) -> Tuple[int, int]:
+    """Pick ``(sample_chunk, trace_chunk)`` for an ``(ns, ntraces)`` amplitude array.
+
+    ``access_pattern`` is one of ``"gather"`` (browse gathers), ``"timeslice"``
+    (read a few samples across many traces) or ``"trace"`` (stream whole traces
+    through processing). Trace chunks are multiples of 64 and never exceed the
+    (rounded-up) dataset size.
+    """
+    if access_pattern not in CHUNK_ACCESS_PATTERNS:
+        raise ValueError(
+            f"Unknown access_pattern {access_pattern!r}; expected one of {sorted(CHUNK_ACCESS_PATTERNS)}"
+        )
+    ns = max(1, int(ns))
+    sample_chunk, default_target = CHUNK_ACCESS_PATTERNS[access_pattern]
+    sample_chunk = ns if sample_chunk is None else min(ns, int(sample_chunk))
+    target = int(target_bytes or default_target)
+
+    step = 64
+    trace_chunk = max(step, (target // (sample_chunk * int(itemsize))) // step * step)
+    trace_chunk = min(trace_chunk, max(step, -(-int(ntraces) // step) * step))
+    return int(sample_chunk), int(trace_chunk)
+
+
+def _decimate_block(block: np.ndarray, sample_step: int, trace_step: int, method: str) -> np.ndarray:
+    """Aggregate ``sample_step x trace_step`` cells of a ``(samples, traces)`` block (edges padded)."""
+    ns, nt = block.shape
+    ns_out, nt_out = -(-ns // sample_step), -(-nt // trace_step)
+    pad_value = np.nan if method == "rms" else 0.0
+    padded = np.full((ns_out * sample_step, nt_out * trace_step), pad_value, dtype=np.float32)
+    padded[:ns, :nt] = block
+    cells = padded.reshape(ns_out, sample_step, nt_out, trace_step).transpose(0, 2, 1, 3)
+    cells = cells.reshape(ns_out, nt_out, sample_step * trace_step)
+    if method == "rms":
+        return np.sqrt(np.nanmean(np.square(cells), axis=2)).astype(np.float32)
+    # Signed peak: the value of largest magnitude, so events keep their polarity
+    peak = np.argmax(np.abs(cells), axis=2)[..., None]
+    return np.take_along_axis(cells, peak, axis=2)[..., 0]
+
+
+def _build_overview_levels(
+    root,
+    method: str = "maxabs",
+    min_size: int = 256,
+    memory_budget: int = DEFAULT_INGEST_MEMORY,
+) -> list[Dict[str, Any]]:
+    """Write ``overviews/<level>`` arrays, each halving the axes still longer than ``min_size``.
+
+    Every level is built from the previous one in chunk-aligned trace windows, so
+    the full-resolution data is read once and each overview chunk is encoded once.
+    """
+    if method not in OVERVIEW_METHODS:
+        raise ValueError(f"Unknown overview method {method!r}; expected one of {OVERVIEW_METHODS}")
+    if "overviews" in root:
+        del root["overviews"]
+    group = root.create_group("overviews")
+    amp = root["amplitude"]
+    src, sample_factor, trace_factor = amp, 1, 1
+    levels = []
+    while max(src.shape) > min_size:
+        sample_step = 2 if src.shape[0] > min_size else 1
+        trace_step = 2 if src.shape[1] > min_size else 1
+        shape = (-(-src.shape[0] // sample_step), -(-src.shape[1] // trace_step))
+        dst = group.create_dataset(
+            str(len(levels) + 1),
+            shape=shape,
+            chunks=plan_chunk_shape(shape[0], shape[1], "gather"),
+            dtype="float32",
+            compressor=amp.compressor,
+        )
+        window = _window_traces(src.shape[0], trace_step * dst.chunks[1], memory_budget)
+        for lo in range(0, src.shape[1], window):
+            block = src[:, lo : lo + window]
+            dst[:, lo // trace_step : lo // trace_step + -(-block.shape[1] // trace_step)] = _decimate_block(
+                block, sample_step, trace_step, method
+            )
+        sample_factor *= sample_step
+        trace_factor *= trace_step
+        levels.append(
+            {
+                "path": f"overviews/{dst.basename}",
+                "sample_factor": sample_factor,
+                "trace_factor": trace_factor,
+                "shape": list(shape),
+            }
+        )
+        src = dst
+    group.attrs.update({"method": method, "levels": levels})
+    return levels
+
+
+def build_overviews(
+    context: dict,
+    zarr_store: str | Path,
+    method: str = "maxabs",
+    min_size: int = 256,
+    memory_budget: int = DEFAULT_INGEST_MEMORY,
+    output: str = "overviews",
+) -> list[Dict[str, Any]]:
+    """Build decimated ``amplitude`` overviews (``"maxabs"`` signed peaks or ``"rms"``) in the store."""
+    levels = _build_overview_levels(zarr.open(zarr_store, mode="r+"), method, min_size, memory_budget)
+    CHUNK_CACHE.invalidate(zarr_store)
+    manifest_path = Path(str(zarr_store) + ".manifest.json")
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text())
+        manifest["overviews"] = {"method": method, "levels": levels}
+        manifest_path.write_text(json.dumps(_json_safe(manifest), indent=2))
+    context[output] = levels
+    return levels
+
+
+def open_overviews(zarr_store: Union[str, Path, Any]) -> list[Dict[str, Any]]:
+    """Resolution levels of a store, finest first: full ``amplitude`` then each overview.
+
+    Each entry has ``array`` (a lazy Zarr array), ``sample_factor``, ``trace_factor``
+    and ``method`` (``None`` for full resolution).
+    """
+    root = zarr.open(zarr_store, mode="r") if isinstance(zarr_store, (str, Path)) else zarr_store
+    levels = [{"array": root["amplitude"], "sample_factor": 1, "trace_factor": 1, "method": None}]
+    if "overviews" in root:
+        attrs = root["overviews"].attrs.asdict()
+        for level in attrs.get("levels", []):
+            levels.append(
+                {
+                    "array": root[level["path"]],
+                    "sample_factor": int(level["sample_factor"]),
+                    "trace_factor": int(level["trace_factor"]),
+                    "method": attrs.get("method"),
+                }
+            )
+    return levels
+
+
+def select_overview(levels: Sequence[Dict[str, Any]], n_samples: int, n_traces: int, height: int, width: int) -> Dict[str, Any]:
+    """Coarsest level that still gives ``n_samples x n_traces`` at least ``height x width`` cells."""
+    chosen = levels[0]
+    for level in levels[1:]:
+        if n_traces / level["trace_factor"] >= width and n_samples / level["sample_factor"] >= height:
+            chosen = level
+    return chosen
+
+
+def _hist_levels() -> Tuple[int, int]:
+    lo, hi = STATS_HIST_OCTAVES
+    return lo * STATS_HIST_BINS_PER_OCTAVE, hi * STATS_HIST_BINS_PER_OCTAVE
+
+
+def _hist_edges() -> np.ndarray:
+    """Ascending value edges of the stats histogram: signed log-magnitude bins around a zero bin."""
+    lo, hi = _hist_levels()
+    magnitudes = 2.0 ** (np.arange(lo, hi + 1) / STATS_HIST_BINS_PER_OCTAVE)
+    return np.concatenate([-magnitudes[::-1], magnitudes])
+
+
+def _hist_thresholds() -> np.ndarray:
+    """float32 mantissa bits at which each sub-octave bin starts (``2**(k / per_octave)``)."""
+    per_octave = STATS_HIST_BINS_PER_OCTAVE
+    steps = 2.0 ** (np.arange(1, per_octave) / per_octave) - 1.0
+    return np.ceil(steps * 2**23).astype(np.uint32)
+
+
+@nb.njit(nogil=True)
+def _summarize_chunks(values, bits, chunk, lo, hi, thresholds, vmin, vmax, sumsq, count, hist):
+    # One pass over a (samples, traces) float32 block; ``bits`` is the same memory as uint32.
+    # |x| = 1.m * 2**(e - 127): the octave is the exponent field, the sub-bin comes from m.
+    half = hi - lo
+    per_octave = len(thresholds) + 1
+    for i in range(values.shape[0]):
+        for j in range(values.shape[1]):
+            v = values[i, j]
+            if not np.isfinite(v):
+                continue
+            c = j // chunk
+            count[c] += 1
+            sumsq[c] += np.float64(v) * np.float64(v)
+            if v < vmin[c]:
+                vmin[c] = v
+            if v > vmax[c]:
+                vmax[c] = v
+            b = bits[i, j]
+            exponent = np.int64((b >> 23) & 0xFF)
+            level = per_octave * (exponent - 127)
+            mantissa = b & 0x7FFFFF
+            for t in thresholds:
+                if mantissa >= t:
+                    level += 1
+            if exponent == 0 or level < lo:
+                hist[c, half] += 1
+                continue
+            level = min(level, hi - 1) - lo
+            if b >> 31:
+                hist[c, half - 1 - level] += 1
+            else:
+                hist[c, half + 1 + level] += 1
+
+
+def _block_chunk_stats(start: int, block: np.ndarray, chunk: int) -> Dict[int, Tuple]:
+    """``(min, max, sum of squares, count, histogram)`` of each chunk in a chunk-aligned block."""
+    block = np.ascontiguousarray(block, dtype=np.float32)
+    n_chunks = -(-block.shape[1] // chunk)
+    lo, hi = _hist_levels()
+    vmin = np.full(n_chunks, np.inf, dtype=np.float32)
+    vmax = np.full(n_chunks, -np.inf, dtype=np.float32)
+    sumsq = np.zeros(n_chunks, dtype=np.float64)
+    count = np.zeros(n_chunks, dtype=np.int64)
+    hist = np.zeros((n_chunks, len(_hist_edges()) - 1), dtype=np.int64)
+    _summarize_chunks(block, block.view(np.uint32), chunk, lo, hi, _hist_thresholds(), vmin, vmax, sumsq, count, hist)
+    empty = count == 0
+    vmin[empty] = vmax[empty] = np.nan
+    first = start // chunk
+    return {first + c: (vmin[c], vmax[c], sumsq[c], count[c], hist[c]) for c in range(n_chunks)}
+
+
+class AmplitudeStats:
+    """Per trace-chunk amplitude summaries stored in a store's ``stats`` group.
+
+    For every ``chunk_trace`` block of traces it keeps min, max, sum of squares,
+    sample count and a histogram over signed quarter-octave magnitude bins (fixed
+    edges, so chunks merge by adding counts). Range, RMS and percentile clips of
+    the whole volume or of any set of traces come from these summaries without
+    reading amplitudes; percentiles are exact to within one bin and are clamped
+    to the true min/max.
+    """
+
+    def __init__(self, chunk_trace: int, n_chunks: int):
+        n_bins = len(_hist_edges()) - 1
+        self.chunk_trace = int(chunk_trace)
+        self.min = np.full(n_chunks, np.nan, dtype=np.float32)
+        self.max = np.full(n_chunks, np.nan, dtype=np.float32)
+        self.sumsq = np.zeros(n_chunks, dtype=np.float64)
+        self.count = np.zeros(n_chunks, dtype=np.int64)
+        self.hist = np.zeros((n_chunks, n_bins), dtype=np.int64)
+        self.known = np.zeros(n_chunks, dtype=bool)
+
+    @classmethod
+    def load(cls, zarr_store: Union[str, Path, Any]) -> "AmplitudeStats | None":
+        root = zarr.open(zarr_store, mode="r") if isinstance(zarr_store, (str, Path)) else zarr_store
+        if "stats" not in root:
+            return None
+        group = root["stats"]
+        if group.attrs.get("hist_bins") != [*STATS_HIST_OCTAVES, STATS_HIST_BINS_PER_OCTAVE]:
+            return None
+        stats = cls(group.attrs["chunk_trace"], group["count"].shape[0])
+        for name in ("min", "max", "sumsq", "count", "hist"):
+            getattr(stats, name)[:] = group[name][:]
+        stats.known[:] = True
+        return stats
+
+    def update(self, chunk_stats: Dict[int, Tuple]) -> None:
+        for c, (vmin, vmax, sumsq, count, hist) in chunk_stats.items():
+            self.min[c], self.max[c], self.sumsq[c], self.count[c] = vmin, vmax, sumsq, count
+            self.hist[c] = hist
+            self.known[c] = True
+
+    def entry(self, c: int) -> Tuple:
+        return self.min[c], self.max[c], self.sumsq[c], self.count[c], self.hist[c]
+
+    def record(self, start: int, block: np.ndarray) -> None:
+        """Summarize a chunk-aligned ``(samples, traces)`` block as it is written."""
+        self.update(_block_chunk_stats(start, block, self.chunk_trace))
+
+    def fill_missing(self, amp) -> None:
+        """Read and summarize the chunks that were never recorded (e.g. written before a resume)."""
+        total = amp.shape[1]
+        for c in np.flatnonzero(~self.known):
+            lo = int(c) * self.chunk_trace
+            self.record(lo, amp[:, lo : min(lo + self.chunk_trace, total)])
+
+    def save(self, root) -> None:
+        if "stats" in root:
+            del root["stats"]
+        group = root.create_group("stats")
+        for name in ("min", "max", "sumsq", "count", "hist"):
+            group.create_dataset(name, data=getattr(self, name))
+        group.attrs.update(
+            {"chunk_trace": self.chunk_trace, "hist_bins": [*STATS_HIST_OCTAVES, STATS_HIST_BINS_PER_OCTAVE]}
+        )
+
+    def _chunks(self, traces=None) -> np.ndarray:
+        if traces is None:
+            return np.arange(len(self.count))
+        if isinstance(traces, slice):
+            traces = np.arange(traces.start or 0, traces.stop)
+        return np.unique(np.asarray(traces, dtype=np.int64) // self.chunk_trace)
+
+    def range(self, traces=None) -> Tuple[float, float]:
+        """Exact ``(min, max)`` over the chunks holding ``traces`` (all traces by default)."""
+        chunks = self._chunks(traces)
+        return float(np.nanmin(self.min[chunks])), float(np.nanmax(self.max[chunks]))
+
+    def rms(self, traces=None) -> float:
+        chunks = self._chunks(traces)
+        return float(np.sqrt(self.sumsq[chunks].sum() / max(1, self.count[chunks].sum())))
+
+    def percentile(self, q, traces=None):
+        """Estimate ``np.percentile(values, q)`` over the chunks holding ``traces``."""
+        chunks = self._chunks(traces)
+        hist = self.hist[chunks].sum(axis=0)
+        cdf = np.cumsum(hist)
+        edges = _hist_edges()
+        vmin, vmax = self.range(traces)
+        q = np.asarray(q, dtype=np.float64)
+        target = q / 100.0 * cdf[-1]
+        b = np.minimum(np.searchsorted(cdf, target, side="left"), len(hist) - 1)
+        below = np.where(b > 0, cdf[np.maximum(b - 1, 0)], 0)
+        frac = np.where(hist[b] > 0, (target - below) / np.maximum(hist[b], 1), 0.0)
+        # Interpolate magnitudes geometrically inside a bin (linear across the zero bin)
+        lower, upper = edges[b], edges[b + 1]
+        geometric = lower * (upper / np.where(lower == 0, 1.0, lower)) ** frac
+        value = np.where(lower * upper > 0, geometric, lower + frac * (upper - lower))
+        value = np.clip(value, vmin, vmax)
+        return float(value) if value.ndim == 0 else value
+
+
+def compute_amplitude_stats(
+    context: dict,
+    zarr_store: str | Path,
+    memory_budget: int = DEFAULT_INGEST_MEMORY,
+    output: str = "amplitude_stats",
+) -> AmplitudeStats:
+    """(Re)build the per-chunk ``stats`` group of an existing store in one pass over ``amplitude``."""
+    root = zarr.open(zarr_store, mode="r+")
+    amp = root["amplitude"]
+    ns, ntr = amp.shape
+    chunk = int(amp.chunks[1])
+    stats = AmplitudeStats(chunk, -(-ntr // chunk))
+    window = _window_traces(ns, chunk, memory_budget)
+    for lo in range(0, ntr, window):
+        stats.record(lo, amp[:, lo : lo + window])
+    stats.save(root)
+    context[output] = stats
+    return stats
+
+
+class _ChunkAlignedWriter:
+    """Write ``(samples, traces)`` blocks into ``amplitude`` so each chunk is encoded once.
+
+    Runs of whole chunks go straight to the store. Ranges that only partly cover
+    a chunk are buffered until the rest of that chunk arrives (blocks may come in
+    any order); a chunk that also holds traces below ``base`` is completed from
+    the store first. ``total`` is the final trace count, so the last, short chunk
+    counts as full once its traces are in. ``on_write(start, block)`` sees every
+    chunk-aligned block as it goes to the store.
+    """
+
+    def __init__(self, amp, base: int, total: int, on_write: Callable[[int, np.ndarray], None] | None = None):
+        self.amp = amp
+        self.chunk = int(amp.chunks[1])
+        self.base = int(base)
+        self.total = int(total)
+        self.on_write = on_write
+        self._partial: Dict[int, list] = {}  # chunk index -> [buffer, traces filled]
+
+    def _store(self, lo: int, block: np.ndarray) -> None:
+        self.amp[:, lo : lo + block.shape[1]] = block
+        if self.on_write is not None:
+            self.on_write(lo, block)
+
+    def _chunk_bounds(self, c: int) -> Tuple[int, int]:
+        return c * self.chunk, min((c + 1) * self.chunk, self.total)
+
+    def write(self, start: int, block: np.ndarray) -> None:
+        end = start + block.shape[1]
+        run_lo = run_hi = None
+        for c in range(start // self.chunk, -(-end // self.chunk)):
+            c_lo, c_hi = self._chunk_bounds(c)
+            lo, hi = max(start, c_lo), min(end, c_hi)
+            if lo == c_lo and hi == c_hi and c not in self._partial:
+                if run_hi != lo:
+                    self._write_run(run_lo, run_hi, start, block)
+                    run_lo = lo
+                run_hi = hi
+                continue
+            self._buffer(c, lo, block[:, lo - start : hi - start])
+        self._write_run(run_lo, run_hi, start, block)
+
+    def _write_run(self, lo, hi, start: int, block: np.ndarray) -> None:
+        if lo is not None and hi > lo:
+            self._store(lo, block[:, lo - start : hi - start])
+
+    def _buffer(self, c: int, lo: int, piece: np.ndarray) -> None:
+        c_lo, c_hi = self._chunk_bounds(c)
+        slot = self._partial.get(c)
+        if slot is None:
+            slot = [np.zeros((piece.shape[0], c_hi - c_lo), dtype=np.float32), 0]
+            if c_lo < self.base:
+                keep = min(self.base, c_hi)
+                slot[0][:, : keep - c_lo] = self.amp[:, c_lo:keep]
+                slot[1] = keep - c_lo
+            self._partial[c] = slot
+        slot[0][:, lo - c_lo : lo - c_lo + piece.shape[1]] = piece
+        slot[1] += piece.shape[1]
+        if slot[1] >= c_hi - c_lo:
+            self._store(c_lo, slot[0])
+            del self._partial[c]
+
+    @property
+    def flushed(self) -> int:
+        """Traces below this index are on disk, provided every block below it was written."""
+        return min(self._partial) * self.chunk if self._partial else self.total
+
+    def flush(self) -> None:
+        """Write whatever is still buffered (only needed when the input fell short of ``total``)."""
+        for c in sorted(self._partial):
+            c_lo, _ = self._chunk_bounds(c)
+            self._store(c_lo, self._partial.pop(c)[0])
+
+
+def _ingest_file_worker(task: Dict[str, Any]) -> Dict[str, Any]:
+    """Decode one SEG-Y file and write the amplitude chunks it owns exclusively.
+
+    Chunks that are shared with a neighbouring file (or with traces already in
+    the store) are returned as ``pieces`` so the parent can write them serially.
+    """
+    file_path = Path(task["file"])
+    start = int(task["start"])
+    chunk_trace = int(task["chunk_trace"])
+    total = int(task["total"])
+    window = int(task["window"])
+    # Share the cores between pool workers instead of each one using all of them
+    threads = int(task["threads"])
+
+    pieces: list[Tuple[int, np.ndarray]] = []
+    stats: Dict[int, Tuple] = {}
+    with segyio.open(file_path, "r", ignore_geometry=True) as f:
+        entry = _file_entry(f, file_path)
+        ntr = len(f.trace)
+        if ntr != int(task["ntr"]):
+            raise RuntimeError(
+                f"Trace count of {file_path} changed during ingest ({task['ntr']} -> {ntr})."
+            )
+        geom = _read_header_columns(f, file_path, task["headers"], task["header_spec"], ntr)
+        layout = _fixed_layout(f, file_path)
+
+        end = start + ntr
+        own_start = -(-start // chunk_trace) * chunk_trace
+        own_end = end if end == total else (end // chunk_trace) * chunk_trace
+        if own_end > own_start:
+            amp = zarr.open(task["zarr_out"], mode="r+")["amplitude"]
+            for lo, hi in _trace_windows(own_start, own_end - own_start, chunk_trace, window):
+                lo += own_start - start
+                hi += own_start - start
+                block = _read_trace_window(f, layout, lo, hi, threads)
+                amp[:, start + lo : start + hi] = block
+                stats.update(_block_chunk_stats(start + lo, block, chunk_trace))
+            if own_start > start:
+                pieces.append((start, _read_trace_window(f, layout, 0, own_start - start, threads)))
+            if own_end < end:
+                pieces.append((own_end, _read_trace_window(f, layout, own_end - start, ntr, threads)))
+        elif ntr:
+            pieces.append((start, _read_trace_window(f, layout, 0, ntr, threads)))
+
+    return {"entry": entry, "ntr": ntr, "geom": geom, "pieces": pieces, "stats": stats}
+
+
 def segy_directory_to_zarr(
     context: dict,
     segy_input: Union[str, Path, Sequence[Union[str, Path]]],
@@ -184,23 +1447,60 @@ def segy_directory_to_zarr(
     header_spec: Dict[str, Tuple[int, int]] | None = None,
     selected_headers: Dict[str, Any] | None = None,
     progress_cb: Callable[[int, int, str | None], None] | None = None,
+    workers: int = 1,
+    memory_budget: int = DEFAULT_INGEST_MEMORY,
+    chunk_sample: int | None = None,
+    access_pattern: str | None = None,
+    resume: bool = True,
+    index_headers: Union[Sequence[str], Dict[str, float | None], None] = None,
+    sort_by: Sequence[str] | None = None,
+    overviews: str | None = None,
+    amplitude_stats: bool = True,
 ) -> str:
-    """Convert SEG-Y files into a Zarr store + geometry table using header_spec names."""
+    """Convert SEG-Y files into a Zarr store + geometry table using header_spec names.
+
+    With ``workers > 1`` the files are decoded in a process pool. Trace offsets are
+    assigned up front from a pre-scan of the trace counts, each worker writes the
+    ``amplitude`` chunks that belong only to its file, and chunks shared by two
+    files are written by the parent. Geometry rows are still written in file order,
+    so ``trace_id`` stays deterministic.
+
+    Traces are streamed in windows of whole ``chunk_trace`` blocks, so peak memory
+    follows ``memory_budget`` (bytes, shared between workers) instead of file size.
+    Chunks that straddle two files are buffered until complete, so every chunk is
+    compressed exactly once. Pass ``access_pattern`` (see ``plan_chunk_shape``) to
+    let the chunk shape follow the intended reads instead of ``chunk_trace`` /
+    ``chunk_sample`` (default: whole traces).
+
+    Every file is checkpointed in ``<zarr_out>.ingest.jsonl`` once its traces are on
+    disk and its geometry rows are staged as a Parquet part. If a run dies, calling
+    it again with the same inputs skips the committed files, truncates the partial
+    tail of ``amplitude`` and carries on (``resume=False`` ignores the log).
+
+    Once the geometry is final, a ``TraceHeaderIndex`` sidecar is written for each
+    key of ``index_headers`` (names, or a mapping of name to bin width such as
+    ``{"offset": 50.0}``) in ``<geometry>.index/``. By default the
+    ``DEFAULT_INDEX_HEADERS`` present in ``headers`` plus the selected inline/xline
+    headers are indexed; pass ``()`` to skip it.
+
+    ``sort_by`` (e.g. ``["cdp", "offset"]``) reorders the finished store by those
+    headers (see ``reorganize_zarr``) so each gather is one contiguous trace range.
+
+    ``overviews="maxabs"`` or ``"rms"`` adds decimated copies of ``amplitude`` for
+    viewers (see ``build_overviews``); a store that already has them (append,
+    resume) gets them rebuilt with its stored method.
+
+    With ``amplitude_stats`` the per-chunk summaries of ``AmplitudeStats`` are
+    computed from the traces as they are written (appends reuse the summaries of
+    untouched chunks), so viewers get clip levels without reading amplitudes.
+    """
 
     header_spec = header_spec or TRACE_HEADER_REV0
     if headers is None:
         headers = tuple(header_spec.keys())
 
     files = _resolve_segy_inputs(segy_input)
-
-    total_traces = 0
-    if progress_cb is not None:
-        for fpath in files:
-            try:
-                with segyio.open(fpath, "r", ignore_geometry=True) as f:
-                    total_traces += len(f.trace)
-            except Exception:
-                continue
+    workers = max(1, int(workers or 1))
 
     # Canonical header-name mapping for scaling
     lower_to_original = {header.lower(): header for header in headers}
@@ -214,38 +1514,90 @@ def segy_directory_to_zarr(
 
     compressor = compressor or Blosc(cname="zstd", clevel=5, shuffle=Blosc.SHUFFLE)
     zarr_out = Path(zarr_out)
-    if zarr_out.exists() and not allow_overwrite and not allow_append:
-        raise FileExistsError(f"Zarr store {zarr_out} already exists. Set allow_overwrite=True to replace.")
-    zarr_out.parent.mkdir(parents=True, exist_ok=True)
-    append_mode = zarr_out.exists() and allow_append and not allow_overwrite
-    root = zarr.open(zarr_out, mode="r+" if append_mode else ("w-" if not allow_overwrite else "w"))
-    file_metadata: list[Dict[str, Any]] = []
-    dataset_id = str(uuid4())
     suffix = f".{dataset_type}.geometry.parquet" if dataset_type else ".geometry.parquet"
     geometry_path = Path(str(zarr_out) + suffix) if geometry_out is None else Path(geometry_out)
     if pa is None or pq is None:
         geometry_path = geometry_path.with_suffix(".csv")
-    root.attrs.update(
-        {
-            "description": "SEG-Y to Zarr flat trace layout",
-            "headers": list(headers),
-            "samples": int(ns),
-            "source_inputs": [str(f) for f in files],
-            "dataset_id": dataset_id,
-            "created_at": datetime.utcnow().isoformat() + "Z",
-            "dataset_type": dataset_type or "",
-            "selected_headers": selected_headers or {},
-        }
-    )
+    parts_dir = Path(str(geometry_path) + ".parts")
+    log_path = _ingest_log_path(zarr_out)
+
+    resume_state = None
+    if resume and not allow_overwrite and zarr_out.exists():
+        resume_state = _load_resume_state(log_path, files)
+
+    if zarr_out.exists() and not allow_overwrite and not allow_append and resume_state is None:
+        raise FileExistsError(f"Zarr store {zarr_out} already exists. Set allow_overwrite=True to replace.")
+    zarr_out.parent.mkdir(parents=True, exist_ok=True)
+    append_mode = resume_state is None and zarr_out.exists() and allow_append and not allow_overwrite
+    if resume_state is not None or append_mode:
+        root = zarr.open(zarr_out, mode="r+")
+    else:
+        root = zarr.open(zarr_out, mode="w-" if not allow_overwrite else "w")
+
+    if resume_state is not None:
+        start_record = resume_state["start"]
+        commits = resume_state["commits"]
+        dataset_id = start_record["dataset_id"]
+        append_file_offset = int(start_record["file_id_offset"])
+        previous_rows = int(start_record["previous_rows"])
+        previous_geometry = geometry_path if previous_rows else None
+        file_metadata = list(root.attrs.get("file_metadata", []))[: int(start_record["previous_files"])]
+        file_metadata += [commit["entry"] for commit in commits]
+        offset = int(start_record["base"]) + sum(int(commit["ntr"]) for commit in commits)
+        parts = [parts_dir / commit["part"] for commit in commits]
+        # Parts staged after the last commit are rewritten below
+        if parts_dir.exists():
+            for stray in set(parts_dir.iterdir()) - set(parts):
+                stray.unlink()
+        done = len(commits)
+    else:
+        dataset_id = str(uuid4())
+        file_metadata = list(root.attrs.get("file_metadata", [])) if append_mode else []
+        offset = int(root.attrs.get("total_traces", 0)) if append_mode else 0
+        previous_geometry = geometry_path if append_mode and geometry_path.exists() else None
+        previous_rows = 0
+        append_file_offset = 0
+        if previous_geometry is not None:
+            try:
+                previous_ids = _read_geometry_file_ids(previous_geometry)
+                previous_rows = len(previous_ids)
+                if previous_rows:
+                    append_file_offset = int(previous_ids.max()) + 1
+            except Exception:
+                previous_geometry = None
+        parts = []
+        shutil.rmtree(parts_dir, ignore_errors=True)
+        done = 0
+
+        root.attrs.update(
+            {
+                "description": "SEG-Y to Zarr flat trace layout",
+                "headers": list(headers),
+                "samples": int(ns),
+                "source_inputs": [str(f) for f in files],
+                "dataset_id": dataset_id,
+                "created_at": datetime.utcnow().isoformat() + "Z",
+                "dataset_type": dataset_type or "",
+                "selected_headers": selected_headers or {},
+            }
+        )
+    parts_dir.mkdir(parents=True, exist_ok=True)
+
+    # Trace offsets (and the final array size) are fixed up front from the file headers;
+    # ingest never writes scan sidecars into the (possibly read-only or shared) input folders
+    todo = files[done:]
+    trace_counts = [entry["traces"] for entry in _scan_segy_files(todo, workers=max(workers, 4), use_cache=False)]
+    total_traces = offset + sum(trace_counts)
 
     if "amplitude" not in root:
+        if access_pattern is not None:
+            chunk_sample, chunk_trace = plan_chunk_shape(ns, total_traces, access_pattern)
         amp = root.create_dataset(
             "amplitude",
             shape=(ns, 0),
-            chunks=(ns, chunk_trace),
+            chunks=(min(int(chunk_sample or ns), ns), chunk_trace),
             dtype="float32",
             compressor=compressor,
-            maxshape=(ns, None),
         )
         amp.attrs["_ARRAY_DIMENSIONS"] = ["sample", "trace"]
         amp.attrs["layout"] = "sample_trace"
@@ -253,123 +1605,85 @@ def segy_directory_to_zarr(
     else:
         amp = root["amplitude"]
 
-    # Geometry/index writer (Parquet)
-    arrow_writer = None
-    pending_frames: list[pd.DataFrame] = []
-    existing_geom_df = None
-    if append_mode and geometry_path.exists():
-        try:
-            if geometry_path.suffix.lower() == ".csv":
-                existing_geom_df = pd.read_csv(geometry_path, usecols=["trace_id", "file_id", "trace_in_file"], engine="c")
-            else:
-                existing_geom_df = pd.read_parquet(geometry_path, columns=None)
-        except Exception:
-            existing_geom_df = None
-
-    offset = int(root.attrs.get("total_traces", 0)) if append_mode else 0
-    if append_mode and existing_geom_df is not None and "file_id" in existing_geom_df.columns:
-        append_file_offset = int(existing_geom_df["file_id"].max()) + 1
-    else:
-        append_file_offset = 0
-
-    def _scale_array(val, length: int) -> np.ndarray:
-        """Convert SEG-Y scalar semantics to multiplicative array.
-
-        Positive scalar => multiply by scalar.
-        Negative scalar => divide by abs(scalar).
-        0 or None => no scaling (all 1s).
-        """
-        arr = np.ones(length, dtype=np.float32)
-        if val is None:
-            return arr
-
-        v = np.asarray(val)
-
-        # scalar
-        if v.shape == () or v.size == 1:
-            scalar = float(v)
-            if scalar == 0:
-                return arr
-            arr = np.full(length, scalar if scalar > 0 else 1.0 / abs(scalar), dtype=np.float32)
-            return arr
-
-        # array of scalars
-        v = v.astype(np.float32, copy=False).flatten()
-        if v.size != length:
-            v = np.resize(v, length)
-        pos = v > 0
-        neg = v < 0
-        arr[pos] = v[pos]
-        arr[neg] = 1.0 / np.abs(v[neg])
-        return arr
+    if resume_state is None:
+        _start_ingest_log(
+            log_path,
+            {
+                "event": "start",
+                "dataset_id": dataset_id,
+                "inputs": [str(f) for f in files],
+                "base": int(offset),
+                "file_id_offset": int(append_file_offset),
+                "previous_files": len(file_metadata),
+                "previous_rows": int(previous_rows),
+                "samples": int(ns),
+                "chunk_trace": int(amp.chunks[1]),
+                "geometry": str(geometry_path),
+                "created_at": datetime.utcnow().isoformat() + "Z",
+            },
+        )
 
     # initial progress update
     if progress_cb is not None:
         try:
-            progress_cb(0, int(total_traces), None)
+            progress_cb(int(offset), int(total_traces), None)
         except Exception:
             pass
 
-    for file_id, file_path in enumerate(files):
-        file_path = Path(file_path)
-        try:
-            f = segyio.open(file_path, "r", ignore_geometry=False)
-            _ = f.ilines  # trigger inline parsing; fails for 2D
-        except Exception:
-            f = segyio.open(file_path, "r", ignore_geometry=True)
-
-        with f:
-            entry: Dict[str, Any] = {"file": str(file_path)}
-            try:
-                entry["binary_header"] = {
-                    str(key): int(value) for key, value in f.bin.items()
-                }
-            except Exception:
-                entry["binary_header"] = {}
-
-            try:
-                wrapped_text = segyio.tools.wrap(f.text[0])
-                entry["text_header"] = wrapped_text.splitlines()
-            except Exception:
-                entry["text_header"] = []
-
-            ntr = len(f.trace)
-            data = np.asarray(f.trace.raw[:], dtype=np.float32)
-
-            geom: dict[str, Iterable[float]] = {}
-            for name in headers:
-                if name not in header_spec:
-                    continue
-                offset_bytes, _ = header_spec[name]
-                try:
-                    vals = f.attributes(offset_bytes)[:ntr]
-                except Exception:
-                    continue
-                geom[name] = np.asarray(vals, dtype=np.float32)
-
-            # Decide per-file scales *while file is open*
-            if callable(coord_scales):
-                try:
-                    scale_map = coord_scales(file_path, f)
-                except Exception:
-                    scale_map = {}
-            else:
-                scale_map = coord_scales or {}
-
-            # Normalize scale map keys to canonical header names
-            scale_map_lower: Dict[str, Any] = {}
-            for raw_key, val in (scale_map or {}).items():
-                lk = str(raw_key).lower()
-                canonical = lower_to_original.get(lk)
-                if canonical is not None:
-                    scale_map_lower[canonical.lower()] = val
-                else:
-                    # fallback – allow arbitrary keys that already match geom names
-                    scale_map_lower[lk] = val
+    chunk = int(amp.chunks[1])
+    window = _window_traces(ns, chunk, memory_budget // workers)
+    # Drop whatever an interrupted run wrote past the last committed trace
+    amp.resize(ns, offset)
+    amp.resize(ns, total_traces)
+    stats = AmplitudeStats(chunk, -(-total_traces // chunk)) if amplitude_stats else None
+    if stats is not None and (resume_state is not None or append_mode):
+        # Chunks wholly below where this ingest started are unchanged
+        previous_stats = AmplitudeStats.load(root)
+        ingest_base = int(resume_state["start"]["base"]) if resume_state is not None else offset
+        if previous_stats is not None and previous_stats.chunk_trace == chunk:
+            keep = min(len(previous_stats.count), ingest_base // chunk)
+            stats.update({c: previous_stats.entry(c) for c in range(keep)})
+    writer = _ChunkAlignedWriter(
+        amp, base=offset, total=total_traces, on_write=stats.record if stats is not None else None
+    )
 
+    staged: list[Dict[str, Any]] = []
+    next_start = offset
+
+    def _stage_file(
+        file_id: int,
+        file_path: Path,
+        ntr: int,
+        geom: Dict[str, np.ndarray],
+        scale_map_lower: Dict[str, Any],
+        entry: Dict[str, Any],
+    ) -> None:
+        # The file's traces are with the writer; commit it once they are all on disk
+        nonlocal next_start
+        staged.append(
+            {
+                "file_id": file_id,
+                "file_path": Path(file_path),
+                "ntr": int(ntr),
+                "geom": geom,
+                "scale_map_lower": scale_map_lower,
+                "entry": entry,
+            }
+        )
+        next_start += int(ntr)
+        while staged and offset + staged[0]["ntr"] <= writer.flushed:
+            _commit_file(**staged.pop(0))
+
+    def _commit_file(
+        file_id: int,
+        file_path: Path,
+        ntr: int,
+        geom: Dict[str, np.ndarray],
+        scale_map_lower: Dict[str, Any],
+        entry: Dict[str, Any],
+    ) -> None:
+        nonlocal offset
         idx_end = offset + ntr
-        amp.resize(ns, idx_end)
-        amp[:, offset:idx_end] = data.T
 
         # Geometry/index chunk
         trace_id = np.arange(offset, idx_end, dtype=np.int64)
@@ -392,14 +1706,27 @@ def segy_directory_to_zarr(
                 arr = arr * unit_factor
             data_dict[hname] = arr
 
+        part_path = parts_dir / f"file_{file_id:06d}{geometry_path.suffix}"
         if pa is not None and pq is not None:
-            table = pa.Table.from_pydict(data_dict)
-            if arrow_writer is None:
-                arrow_writer = pq.ParquetWriter(geometry_path, table.schema)
-            arrow_writer.write_table(table)
+            pq.write_table(pa.Table.from_pydict(data_dict), part_path)
         else:
-            pending_frames.append(pd.DataFrame(data_dict))
-
+            pd.DataFrame(data_dict).to_csv(part_path, index=False)
+        parts.append(part_path)
+
+        _append_ingest_log(
+            log_path,
+            {
+                "event": "commit",
+                "file_index": int(file_id),
+                "path": str(file_path),
+                **_file_fingerprint(file_path),
+                "trace_start": int(offset),
+                "ntr": int(ntr),
+                "part": part_path.name,
+                "row_group": 0,
+                "entry": entry,
+            },
+        )
         offset = idx_end
         file_metadata.append(entry)
         if progress_cb is not None:
@@ -408,23 +1735,100 @@ def segy_directory_to_zarr(
             except Exception:
                 pass
 
-    if arrow_writer is not None:
-        arrow_writer.close()
-    elif pending_frames:
-        df_new = pd.concat(pending_frames, ignore_index=True)
-        if existing_geom_df is not None:
-            df_all = pd.concat([existing_geom_df, df_new], ignore_index=True)
-        else:
-            df_all = df_new
-        try:
-            df_all.to_parquet(geometry_path)
-        except Exception:
-            csv_path = geometry_path.with_suffix(".csv")
-            df_all.to_csv(csv_path, index=False)
-            geometry_path = csv_path
-
+    if workers > 1 and len(todo) > 1:
+        start = offset
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        tasks = []
+        for file_path, ntr in zip(todo, trace_counts):
+            tasks.append(
+                {
+                    "file": str(file_path),
+                    "start": start,
+                    "ntr": int(ntr),
+                    "total": total_traces,
+                    "chunk_trace": chunk,
+                    "window": window,
+                    "zarr_out": str(zarr_out),
+                    "headers": list(headers),
+                    "header_spec": dict(header_spec),
+                    "threads": threads,
+                }
+            )
+            start += int(ntr)
+
+        results: Dict[int, Dict[str, Any]] = {}
+        next_file = 0
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_ingest_file_worker, task): i for i, task in enumerate(tasks)}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                # Flush finished files in order so trace_id and file_id stay deterministic
+                while next_file in results:
+                    result = results.pop(next_file)
+                    file_path = todo[next_file]
+                    if stats is not None:
+                        stats.update(result["stats"])
+                    for piece_start, piece in result["pieces"]:
+                        writer.write(piece_start, piece)
+                    if callable(coord_scales):
+                        with segyio.open(file_path, "r", ignore_geometry=True) as f:
+                            scale_map_lower = _resolve_scale_map(coord_scales, file_path, f, lower_to_original)
+                    else:
+                        scale_map_lower = _resolve_scale_map(coord_scales, file_path, None, lower_to_original)
+                    _stage_file(
+                        done + next_file,
+                        file_path,
+                        result["ntr"],
+                        result["geom"],
+                        scale_map_lower,
+                        result["entry"],
+                    )
+                    next_file += 1
+    else:
+        for file_id, file_path in enumerate(todo, start=done):
+            file_path = Path(file_path)
+            f = _open_segy(file_path)
+
+            with f:
+                entry = _file_entry(f, file_path)
+                ntr = len(f.trace)
+                geom = _read_header_columns(f, file_path, headers, header_spec, ntr)
+                # Decide per-file scales *while file is open*
+                scale_map_lower = _resolve_scale_map(coord_scales, file_path, f, lower_to_original)
+                layout = _fixed_layout(f, file_path)
+
+                if ntr != trace_counts[file_id - done]:
+                    raise RuntimeError(
+                        f"Trace count of {file_path} changed during ingest ({trace_counts[file_id - done]} -> {ntr})."
+                    )
+                for lo, hi in _trace_windows(next_start, ntr, chunk, window):
+                    writer.write(next_start + lo, _read_trace_window(f, layout, lo, hi))
+
+            _stage_file(file_id, file_path, ntr, geom, scale_map_lower, entry)
+
+    writer.flush()
+    while staged:
+        _commit_file(**staged.pop(0))
+
+    geometry_path = _merge_geometry_parts(geometry_path, parts, previous_geometry, previous_rows)
+    if sort_by:
+        _reorder_store(zarr_out, geometry_path, sort_by, memory_budget=memory_budget)
+        if stats is not None:
+            stats = compute_amplitude_stats({}, zarr_out, memory_budget)
+    elif stats is not None:
+        stats.fill_missing(amp)
+        stats.save(root)
+    if overviews is None and "overviews" in root:
+        overviews = root["overviews"].attrs.get("method")
+    overview_levels = _build_overview_levels(root, overviews, memory_budget=memory_budget) if overviews else []
+    if index_headers is None:
+        index_headers = _default_index_headers(headers, selected_headers)
+    elif not isinstance(index_headers, dict):
+        index_headers = dict.fromkeys(index_headers)
+    trace_index = _write_trace_indexes(geometry_path, index_headers)
     root.attrs["file_metadata"] = file_metadata
     root.attrs["total_traces"] = int(offset)
+    root.attrs["sort_by"] = list(sort_by or [])
     zarr_path = str(Path(zarr_out).resolve())
     manifest = {
         "dataset_id": dataset_id,
@@ -433,18 +1837,622 @@ def segy_directory_to_zarr(
         "geometry_parquet": str(geometry_path.resolve()),
         "headers": list(headers),
         "samples": int(ns),
-        "chunk_trace": int(chunk_trace),
+        "chunk_trace": int(chunk),
+        "chunk_sample": int(amp.chunks[0]),
         "created_at": datetime.utcnow().isoformat() + "Z",
         "source_inputs": [str(f) for f in files],
         "dataset_type": dataset_type or "",
         "selected_headers": selected_headers or {},
+        "trace_index": trace_index,
+        "sort_by": list(sort_by or []),
+        "overviews": {"method": overviews, "levels": overview_levels} if overviews else {},
+        "amplitude_stats": stats is not None,
     }
     manifest_path = Path(str(zarr_out) + ".manifest.json")
     manifest_path.write_text(json.dumps(_json_safe(manifest), indent=2))
+    _append_ingest_log(log_path, {"event": "complete", "total_traces": int(offset)})
+    shutil.rmtree(parts_dir, ignore_errors=True)
+    CHUNK_CACHE.invalidate(zarr_out)
     context["zarr_store"] = zarr_path
     return zarr_path
 
 
+def _store_geometry_path(zarr_store: Path) -> Path:
+    """Geometry table of a store: the manifest's entry, else the ingest's default name."""
+    manifest_path = Path(str(zarr_store) + ".manifest.json")
+    if manifest_path.exists():
+        geometry = json.loads(manifest_path.read_text()).get("geometry_parquet")
+        if geometry:
+            return Path(geometry)
+    geometry_path = Path(str(zarr_store) + ".geometry.parquet")
+    return geometry_path if geometry_path.exists() else geometry_path.with_suffix(".csv")
+
+
+def _read_geometry(geometry_path: Path) -> pd.DataFrame:
+    if geometry_path.suffix.lower() == ".csv":
+        return pd.read_csv(geometry_path)
+    return pd.read_parquet(geometry_path)
+
+
+def _write_geometry(df: pd.DataFrame, geometry_path: Path, sort_by: Sequence[str] = ()) -> Path:
+    """Write the geometry table; ``sort_by`` records the row order in the Parquet metadata."""
+    if pa is not None and pq is not None and geometry_path.suffix.lower() != ".csv":
+        return _write_geometry_table(pa.Table.from_pandas(df, preserve_index=False), geometry_path, sort_by)
+    tmp_path = geometry_path.with_name(geometry_path.name + ".tmp")
+    df.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, geometry_path)
+    return geometry_path
+
+
+def _write_geometry_table(table, geometry_path: Path, sort_by: Sequence[str] = ()) -> Path:
+    tmp_path = geometry_path.with_name(geometry_path.name + ".tmp")
+    sorting = [pq.SortingColumn(table.schema.get_field_index(key)) for key in sort_by if key in table.column_names]
+    pq.write_table(table, tmp_path, row_group_size=GEOMETRY_ROW_GROUP_ROWS, sorting_columns=sorting or None)
+    os.replace(tmp_path, geometry_path)
+    return geometry_path
+
+
+def _permute_geometry(geometry_path: Path, order: np.ndarray, out_path: Path, sort_by: Sequence[str] = ()) -> Path:
+    """Write the geometry rows in ``order`` to ``out_path``, renumbering ``trace_id``.
+
+    Parquet geometry is permuted one column at a time: each column is spilled to
+    an Arrow file and memory-mapped back, so only one column is held in memory
+    while the output row groups are written.
+    """
+    if pa is None or pq is None or geometry_path.suffix.lower() == ".csv":
+        geom = _read_geometry(geometry_path).iloc[order].reset_index(drop=True)
+        if "trace_id" in geom.columns:
+            geom["trace_id"] = np.arange(len(geom), dtype=np.int64)
+        return _write_geometry(geom, out_path, sort_by)
+    import pyarrow.ipc as ipc
+
+    schema = pq.read_schema(geometry_path)
+    take = pa.array(order)
+    spill_dir = Path(tempfile.mkdtemp(prefix=".geometry-", dir=out_path.parent))
+    try:
+        columns = []
+        for i, field in enumerate(schema):
+            if field.name == "trace_id":
+                column = pa.array(np.arange(len(order), dtype=np.int64)).cast(field.type)
+            else:
+                column = pq.read_table(geometry_path, columns=[field.name]).column(0).take(take)
+            spill = spill_dir / f"{i}.arrow"
+            with ipc.new_file(str(spill), pa.schema([field])) as writer:
+                writer.write_table(pa.Table.from_arrays([column], schema=pa.schema([field])))
+            del column
+            columns.append(ipc.open_file(pa.memory_map(str(spill))).read_all().column(0))
+        return _write_geometry_table(pa.Table.from_arrays(columns, schema=schema), out_path, sort_by)
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+
+
+def _scattered_reads(order: np.ndarray, src_chunk: int, window: int) -> int:
+    """Source chunks decoded when output windows gather ``order`` straight from the source."""
+    return sum(np.unique(order[lo : lo + window] // src_chunk).size for lo in range(0, len(order), window))
+
+
+def _bucket_permute(src_amp, dst_amp, order: np.ndarray, window: int, tmp_dir: Path) -> None:
+    """Write ``src_amp[:, order]`` to ``dst_amp`` with an external bucket sort.
+
+    Pass one reads the source once, in windows, and sends each trace to the
+    spill file of the output window (bucket) it belongs to. Traces are buffered
+    per bucket and appended in blocks of ``BUCKET_FLUSH_BYTES`` (all buffers are
+    flushed once they hold a window), through files kept open for the whole pass
+    unless there are more than ``BUCKET_MAX_OPEN_FILES``. Pass two loads one
+    bucket at a time, puts its traces in place and writes that window. Each
+    source chunk is decoded once, whatever the order.
+    """
+    ns, ntr = src_amp.shape
+    position = np.empty(ntr, dtype=np.int64)
+    position[order] = np.arange(ntr, dtype=np.int64)
+    n_buckets = -(-ntr // window)
+    flush_traces = max(1, BUCKET_FLUSH_BYTES // (ns * src_amp.dtype.itemsize))
+    buffers: Dict[int, list] = {bucket: [] for bucket in range(n_buckets)}
+    buffered = np.zeros(n_buckets, dtype=np.int64)
+    keep_open = 2 * n_buckets <= BUCKET_MAX_OPEN_FILES
+
+    with contextlib.ExitStack() as stack:
+        files = {}
+
+        def spill_files(bucket):
+            if bucket in files:
+                return files[bucket]
+            opened = (open(tmp_dir / f"{bucket}.amp", "ab"), open(tmp_dir / f"{bucket}.pos", "ab"))
+            if keep_open:
+                files[bucket] = tuple(stack.enter_context(f) for f in opened)
+            return opened
+
+        def flush(bucket):
+            if not buffers[bucket]:
+                return
+            amp_file, pos_file = spill_files(bucket)
+            try:
+                for traces, targets in buffers[bucket]:
+                    amp_file.write(traces.tobytes())
+                    pos_file.write(targets.tobytes())
+            finally:
+                if not keep_open:
+                    amp_file.close()
+                    pos_file.close()
+            buffers[bucket].clear()
+            buffered[bucket] = 0
+
+        for lo in range(0, ntr, window):
+            block = np.ascontiguousarray(src_amp[:, lo : lo + window].T)
+            targets = position[lo : lo + len(block)]
+            buckets = targets // window
+            by_bucket = np.argsort(buckets, kind="stable")
+            bounds = np.searchsorted(buckets[by_bucket], np.arange(n_buckets + 1))
+            for bucket in np.flatnonzero(np.diff(bounds)):
+                rows = by_bucket[bounds[bucket] : bounds[bucket + 1]]
+                buffers[bucket].append((block[rows], targets[rows]))
+                buffered[bucket] += len(rows)
+                if buffered[bucket] >= flush_traces:
+                    flush(bucket)
+            if buffered.sum() >= window:
+                for bucket in range(n_buckets):
+                    flush(bucket)
+        for bucket in range(n_buckets):
+            flush(bucket)
+
+    for bucket in range(n_buckets):
+        lo = bucket * window
+        width = min(window, ntr - lo)
+        targets = np.fromfile(tmp_dir / f"{bucket}.pos", dtype=np.int64) - lo
+        traces = np.fromfile(tmp_dir / f"{bucket}.amp", dtype=src_amp.dtype).reshape(len(targets), ns)
+        block = np.empty((ns, width), dtype=src_amp.dtype)
+        block[:, targets] = traces.T
+        dst_amp[:, lo : lo + width] = block
+        os.remove(tmp_dir / f"{bucket}.pos")
+        os.remove(tmp_dir / f"{bucket}.amp")
+
+
+def _reorder_journal_path(zarr_store: Path) -> Path:
+    return Path(str(zarr_store) + ".reorder.json")
+
+
+def _finish_reorder_swap(zarr_store: Path) -> None:
+    """Roll an in-place reorder that stopped during its swap forward or back.
+
+    ``_reorder_store`` writes the sorted store next to the original and journals
+    the swap before renaming it in. Once the sorted store has taken the
+    original's name the swap is completed; before that the original is kept
+    (or moved back) and the sorted copy is discarded.
+    """
+    journal = _reorder_journal_path(zarr_store)
+    if not journal.exists():
+        return
+    entry = json.loads(journal.read_text())
+    sorted_store, backup = Path(entry["sorted_store"]), Path(entry["backup"])
+    sorted_geometry, geometry = Path(entry["sorted_geometry"]), Path(entry["geometry"])
+    if backup.exists() and not sorted_store.exists() and zarr_store.exists():
+        if sorted_geometry.exists():
+            os.replace(sorted_geometry, geometry)
+    else:
+        if backup.exists() and not zarr_store.exists():
+            os.replace(backup, zarr_store)
+        shutil.rmtree(sorted_store, ignore_errors=True)
+        if sorted_geometry.exists():
+            os.remove(sorted_geometry)
+    shutil.rmtree(backup, ignore_errors=True)
+    journal.unlink()
+
+
+def _reorder_store(
+    zarr_store: Path,
+    geometry_path: Path,
+    sort_by: Sequence[str],
+    out_zarr: Path | None = None,
+    out_geometry: Path | None = None,
+    chunk_trace: int | None = None,
+    memory_budget: int = DEFAULT_INGEST_MEMORY,
+    allow_overwrite: bool = False,
+) -> Tuple[Path, Path]:
+    """Write ``amplitude``, per-trace arrays and geometry in ``sort_by`` order.
+
+    Output windows are whole chunks, so every output chunk is encoded once. When
+    the order keeps traces close to where they were, each window reads only the
+    source chunks holding its traces; when that would decode source chunks more
+    than twice over on average, the amplitudes go through ``_bucket_permute``
+    (spilled next to the output) instead. Only the ``sort_by`` columns of the
+    geometry are loaded to find the order. Without ``out_zarr`` the sorted store
+    and geometry are written next to the originals and swapped in at the end
+    (see ``_finish_reorder_swap``), so a failure never leaves a half-sorted store.
+    ``trace_id`` is renumbered to the new column order; ``file_id`` and
+    ``trace_in_file`` still point at the source trace.
+    """
+    zarr_store = Path(zarr_store)
+    _finish_reorder_swap(zarr_store)
+    sort_by = list(sort_by)
+    missing = [key for key in sort_by if key not in _geometry_column_names(geometry_path)]
+    if missing:
+        raise KeyError(f"sort_by headers not in geometry {geometry_path}: {missing}")
+    keys = _read_geometry_columns(geometry_path, sort_by) if sort_by else None
+
+    in_place = out_zarr is None or Path(out_zarr).resolve() == zarr_store.resolve()
+    src_root = zarr.open(zarr_store, mode="r")
+    src_amp = src_root["amplitude"]
+    ns, ntr = src_amp.shape
+    n_rows = len(keys) if keys is not None else _geometry_row_count(geometry_path)
+    if n_rows != ntr:
+        raise ValueError(f"Geometry has {n_rows} rows but amplitude has {ntr} traces.")
+    order = np.lexsort([keys[key].to_numpy() for key in reversed(sort_by)]) if sort_by else np.arange(ntr)
+    del keys
+
+    if in_place:
+        out_zarr = zarr_store.with_name(f".{zarr_store.name}.sorting")
+        out_geometry = geometry_path.with_name(geometry_path.name + ".sorting")
+        shutil.rmtree(out_zarr, ignore_errors=True)  # left over from an interrupted run
+    else:
+        out_zarr = Path(out_zarr)
+        if out_zarr.exists() and not allow_overwrite:
+            raise FileExistsError(f"Output Zarr {out_zarr} exists. Set allow_overwrite=True to replace.")
+        out_zarr.parent.mkdir(parents=True, exist_ok=True)
+        out_geometry = Path(out_geometry) if out_geometry else Path(str(out_zarr) + ".geometry" + geometry_path.suffix)
+    dst_root = zarr.open(out_zarr, mode="w")
+    dst_root.attrs.update(src_root.attrs.asdict())
+
+    dst_amp = dst_root.create_dataset(
+        "amplitude",
+        shape=(ns, ntr),
+        chunks=(src_amp.chunks[0], int(chunk_trace or src_amp.chunks[1])),
+        dtype=src_amp.dtype,
+        compressor=src_amp.compressor,
+        overwrite=True,
+    )
+    dst_amp.attrs.update(src_amp.attrs.asdict())
+    window = _window_traces(ns, dst_amp.chunks[1], memory_budget)
+    n_src_chunks = -(-ntr // src_amp.chunks[1])
+    if _scattered_reads(order, src_amp.chunks[1], window) > 2 * n_src_chunks:
+        tmp_dir = Path(tempfile.mkdtemp(prefix=".sort-", dir=out_zarr.parent))
+        try:
+            _bucket_permute(src_amp, dst_amp, order, window, tmp_dir)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    else:
+        for lo in range(0, ntr, window):
+            columns = order[lo : lo + window]
+            dst_amp[:, lo : lo + len(columns)] = read_traces(src_amp, columns, cache=None)
+
+    # Header arrays stored alongside the amplitudes follow the traces; other arrays
+    # and groups (overviews, stats) are carried over for the caller to rebuild
+    for key in list(src_root.array_keys()):
+        if key == "amplitude":
+            continue
+        src = src_root[key]
+        values = src[:]
+        if src.ndim == 1 and src.shape[0] == ntr:
+            values = values[order]
+        dst = dst_root.create_dataset(key, data=values, chunks=src.chunks, compressor=src.compressor, overwrite=True)
+        dst.attrs.update(src.attrs.asdict())
+    for key in src_root.group_keys():
+        shutil.copytree(zarr_store / key, out_zarr / key, dirs_exist_ok=True)
+    dst_root.attrs["sort_by"] = sort_by
+
+    _permute_geometry(geometry_path, order, out_geometry, sort_by)
+    if not in_place:
+        return out_zarr, out_geometry
+
+    journal = _reorder_journal_path(zarr_store)
+    backup = zarr_store.with_name(f".{zarr_store.name}.unsorted")
+    shutil.rmtree(backup, ignore_errors=True)
+    journal.write_text(
+        json.dumps(
+            {
+                "sorted_store": str(out_zarr),
+                "backup": str(backup),
+                "sorted_geometry": str(out_geometry),
+                "geometry": str(geometry_path),
+            }
+        )
+    )
+    os.replace(zarr_store, backup)
+    os.replace(out_zarr, zarr_store)
+    _finish_reorder_swap(zarr_store)
+    CHUNK_CACHE.invalidate(zarr_store)
+    return zarr_store, geometry_path
+
+
+def reorganize_zarr(
+    context: dict,
+    zarr_store: str | Path,
+    sort_by: Sequence[str],
+    out_zarr: str | Path | None = None,
+    geometry_path: str | Path | None = None,
+    chunk_trace: int | None = None,
+    memory_budget: int = DEFAULT_INGEST_MEMORY,
+    index_headers: Union[Sequence[str], Dict[str, float | None], None] = None,
+    allow_overwrite: bool = False,
+) -> str:
+    """Physically reorder a store's traces by ``sort_by`` (e.g. ``["cdp", "offset"]``).
+
+    Gathers of the leading key then occupy contiguous trace ranges (one or two
+    chunks) instead of being scattered over the store. Rewrites the geometry with
+    renumbered ``trace_id``, rebuilds the trace-header indexes (the keys already in
+    the manifest unless ``index_headers`` is given), any overviews and amplitude
+    statistics, and updates the manifest. In place unless ``out_zarr`` is given.
+    """
+    zarr_store = Path(zarr_store)
+    geometry_path = Path(geometry_path) if geometry_path else _store_geometry_path(zarr_store)
+    manifest_path = Path(str(zarr_store) + ".manifest.json")
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+    _finish_reorder_swap(zarr_store)
+    source_root = zarr.open(zarr_store, mode="r")
+    overview_method = source_root["overviews"].attrs.get("method") if "overviews" in source_root else None
+    has_stats = "stats" in source_root
+
+    out_zarr, out_geometry = _reorder_store(
+        zarr_store,
+        geometry_path,
+        sort_by,
+        out_zarr=Path(out_zarr) if out_zarr else None,
+        chunk_trace=chunk_trace,
+        memory_budget=memory_budget,
+        allow_overwrite=allow_overwrite,
+    )
+
+    if index_headers is None:
+        index_headers = {
+            key: (entry or {}).get("bin_width") for key, entry in (manifest.get("trace_index") or {}).items()
+        }
+    elif not isinstance(index_headers, dict):
+        index_headers = dict.fromkeys(index_headers)
+    zarr_path = str(out_zarr.resolve())
+    out_root = zarr.open(out_zarr, mode="r+")
+    amp = out_root["amplitude"]
+    overview_levels = _build_overview_levels(out_root, overview_method, memory_budget=memory_budget) if overview_method else []
+    if has_stats:
+        compute_amplitude_stats({}, out_zarr, memory_budget)
+    manifest.update(
+        {
+            "dataset_id": manifest.get("dataset_id") if out_zarr.resolve() == zarr_store.resolve() else str(uuid4()),
+            "dataset_name": out_zarr.stem,
+            "zarr_store": zarr_path,
+            "geometry_parquet": str(out_geometry.resolve()),
+            "samples": int(amp.shape[0]),
+            "chunk_trace": int(amp.chunks[1]),
+            "chunk_sample": int(amp.chunks[0]),
+            "sort_by": list(sort_by),
+            "overviews": {"method": overview_method, "levels": overview_levels} if overview_method else {},
+            "amplitude_stats": has_stats,
+            "trace_index": _write_trace_indexes(out_geometry, index_headers),
+        }
+    )
+    Path(str(out_zarr) + ".manifest.json").write_text(json.dumps(_json_safe(manifest), indent=2))
+    context["zarr_store"] = zarr_path
+    context["geometry_parquet"] = str(out_geometry.resolve())
+    return zarr_path
+
+
+class ChunkCache:
+    """Process-wide LRU of decompressed chunks of on-disk Zarr arrays, bounded in bytes.
+
+    Entries are keyed by store path, array path, the array's ``.zarray`` mtime
+    (so a recreated or resized array never matches) and chunk coordinates, and
+    remember the ``(mtime, size)`` of the chunk file they were decoded from: a
+    hit whose file has since been rewritten in place is re-read. Writers in this
+    module also call ``invalidate`` on the stores they modify. Only arrays in a
+    Zarr v2 directory store (``DirectoryStore`` and subclasses, any dimension
+    separator) are cached; others are read directly. ``hits``, ``misses`` and
+    ``evictions`` count lookups since the last ``clear``.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CHUNK_CACHE_BYTES):
+        self.max_bytes = int(max_bytes)
+        self._entries: "OrderedDict[tuple, Tuple[tuple, np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def array_key(array) -> tuple | None:
+        """``(store path, array path, .zarray mtime)`` or ``None`` if the array is not cacheable."""
+        root = getattr(getattr(array, "store", None), "path", None)
+        if root is None:
+            return None
+        try:
+            mtime = os.stat(os.path.join(root, array.path, ".zarray")).st_mtime_ns
+        except (OSError, TypeError):
+            return None
+        return (os.path.realpath(root), array.path, mtime)
+
+    @staticmethod
+    def chunk_stamp(array_key: tuple, array, coords: Tuple[int, ...]) -> tuple:
+        """``(mtime, size)`` of the file holding chunk ``coords``; ``(0, -1)`` for an unwritten chunk."""
+        try:
+            st = os.stat(os.path.join(array_key[0], array._chunk_key(coords)))
+        except OSError:
+            return (0, -1)
+        return (st.st_mtime_ns, st.st_size)
+
+    def get_chunk(self, array, coords: Tuple[int, ...], array_key: tuple | None = None) -> np.ndarray:
+        """Decompressed chunk ``coords`` of ``array`` (read-only; trimmed at the array edges)."""
+        array_key = array_key or self.array_key(array)
+        coords = tuple(int(c) for c in coords)
+        key = stamp = None
+        if array_key is not None:
+            key = (*array_key, coords)
+            stamp = self.chunk_stamp(array_key, array, coords)
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] == stamp:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                self.misses += 1
+        region = tuple(slice(c * size, (c + 1) * size) for c, size in zip(coords, array.chunks))
+        chunk = np.asarray(array[region])
+        if key is None or chunk.nbytes > self.max_bytes:
+            return chunk
+        chunk.setflags(write=False)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1].nbytes
+            self._entries[key] = (stamp, chunk)
+            self.nbytes += chunk.nbytes
+            self._evict(self.max_bytes)
+        return chunk
+
+    def _evict(self, max_bytes: int) -> None:
+        while self.nbytes > max_bytes and self._entries:
+            _, (_, chunk) = self._entries.popitem(last=False)
+            self.nbytes -= chunk.nbytes
+            self.evictions += 1
+
+    def resize(self, max_bytes: int) -> None:
+        """Change the byte budget, evicting least recently used chunks if needed."""
+        with self._lock:
+            self.max_bytes = int(max_bytes)
+            self._evict(self.max_bytes)
+
+    def invalidate(self, store_path: Union[str, Path, None] = None) -> None:
+        """Drop the chunks of one store (all stores when ``store_path`` is ``None``)."""
+        root = None if store_path is None else os.path.realpath(store_path)
+        with self._lock:
+            for key in [k for k in self._entries if root is None or k[0] == root]:
+                self.nbytes -= self._entries.pop(key)[1].nbytes
+
+    def clear(self) -> None:
+        """Drop every chunk and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "chunks": len(self._entries),
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+CHUNK_CACHE = ChunkCache()
+
+
+class CachedArray:
+    """Lazy 2-D ``(samples, traces)`` Zarr array whose reads go through ``CHUNK_CACHE``.
+
+    Supports the indexing the viewers and plotting helpers use: integers,
+    slices and integer arrays (trace axis), e.g. ``arr[:, 100:200]``,
+    ``arr[10:50, ids]`` or ``arr[:]``. ``array`` is the wrapped Zarr array.
+    """
+
+    def __init__(self, array, cache: ChunkCache | None = None):
+        self.array = array.array if isinstance(array, CachedArray) else array
+        self.cache = cache or CHUNK_CACHE
+        self.shape = self.array.shape
+        self.dtype = self.array.dtype
+        self.chunks = self.array.chunks
+        self.ndim = len(self.shape)
+        self.attrs = self.array.attrs
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __repr__(self) -> str:
+        return f"CachedArray({self.array!r})"
+
+    def __array__(self, dtype=None, copy=None):
+        data = self[:]
+        return data if dtype is None else data.astype(dtype, copy=False)
+
+    @property
+    def oindex(self) -> "CachedArray":
+        return self
+
+    def __getitem__(self, key) -> np.ndarray:
+        key = key if isinstance(key, tuple) else (key,)
+        if key and key[-1] is Ellipsis:
+            key = key[:-1]
+        rows, cols = (tuple(key) + (slice(None), slice(None)))[:2]
+        ntr = self.shape[1]
+        if isinstance(cols, slice):
+            ids = np.arange(*cols.indices(ntr))
+        else:
+            ids = np.asarray(cols, dtype=np.int64)
+            ids = np.where(ids < 0, ids + ntr, ids)
+        if isinstance(rows, slice) and rows.step in (None, 1):
+            samples, rows_after = rows, slice(None)
+        else:
+            samples, rows_after = slice(None), rows
+        data = read_traces(self.array, np.atleast_1d(ids), samples, cache=self.cache)
+        data = data[rows_after]
+        return data[..., 0] if np.ndim(ids) == 0 else data
+
+
+def read_traces(
+    amplitude,
+    trace_ids: Sequence[int],
+    samples: slice | None = None,
+    out: np.ndarray | None = None,
+    workers: int | None = None,
+    cache: ChunkCache | None = CHUNK_CACHE,
+) -> np.ndarray:
+    """Gather the traces ``trace_ids`` (any order, repeats allowed) of a ``(ns, ntraces)`` array.
+
+    The ids are grouped by trace chunk so each chunk is decompressed once; chunks
+    are read on a thread pool (the codecs release the GIL) and their traces are
+    scattered into ``out``, preallocated as ``(samples, len(trace_ids))`` when not
+    given. ``samples`` restricts the read to a sample range. Chunks come from
+    ``cache`` (the process-wide ``CHUNK_CACHE`` by default; ``None`` reads directly).
+    """
+    if isinstance(amplitude, CachedArray):
+        amplitude = amplitude.array
+    trace_ids = np.asarray(trace_ids, dtype=np.int64).reshape(-1)
+    s0, s1, _ = (samples or slice(None)).indices(amplitude.shape[0])
+    s1 = max(s0, s1)
+    if out is None:
+        out = np.empty((s1 - s0, len(trace_ids)), dtype=amplitude.dtype)
+    if len(trace_ids) == 0 or s1 == s0:
+        return out
+    ntr = amplitude.shape[1]
+    if trace_ids.min() < 0 or trace_ids.max() >= ntr:
+        raise IndexError("trace_ids contain out-of-bounds indices")
+
+    sample_chunk, chunk_trace = amplitude.chunks
+    order = np.argsort(trace_ids, kind="stable")
+    chunk_ids = trace_ids[order] // chunk_trace
+    bounds = np.flatnonzero(np.diff(chunk_ids)) + 1
+    groups = list(zip(np.r_[0, bounds], np.r_[bounds, len(order)]))
+    array_key = cache.array_key(amplitude) if cache is not None else None
+
+    def _read(group):
+        lo, hi = group
+        positions = order[lo:hi]
+        ids = trace_ids[positions]
+        first, last = int(ids[0]), int(ids[-1])
+        if array_key is None:
+            # One chunk-aligned read of the columns this chunk contributes
+            block = amplitude[s0:s1, first : last + 1]
+            out[:, positions] = block[:, ids - first]
+            return
+        c = first // chunk_trace
+        for si in range(s0 // sample_chunk, (s1 - 1) // sample_chunk + 1):
+            chunk = cache.get_chunk(amplitude, (si, c), array_key)
+            a, b = max(s0, si * sample_chunk), min(s1, (si + 1) * sample_chunk)
+            rows = chunk[a - si * sample_chunk : b - si * sample_chunk]
+            out[a - s0 : b - s0, positions] = rows[:, ids - c * chunk_trace]
+
+    workers = workers or min(8, os.cpu_count() or 1)
+    if workers <= 1 or len(groups) == 1:
+        for group in groups:
+            _read(group)
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(groups))) as pool:
+            for _ in pool.map(_read, groups):
+                pass
+    return out
+
+
 def subset_zarr_by_trace_ids(
     context: dict,
     source_zarr: str | Path,
@@ -506,12 +2514,12 @@ def subset_zarr_by_trace_ids(
     )
     amp_out.attrs["_ARRAY_DIMENSIONS"] = ["sample", "trace"]
 
-    # Copy amplitudes in chunks
-    block = 2048
-    for start in range(0, len(trace_ids), block):
-        end = min(start + block, len(trace_ids))
-        idx_block = trace_ids[start:end]
-        amp_out[:, start:end] = amp_src[:, idx_block]
+    # Copy amplitudes in memory-bounded windows; each source chunk is decoded once per window.
+    # A one-pass copy gains nothing from the chunk cache, so it reads around it.
+    window = _window_traces(ns, chunk_trace, DEFAULT_INGEST_MEMORY)
+    for start in range(0, len(trace_ids), window):
+        end = min(start + window, len(trace_ids))
+        amp_out[:, start:end] = read_traces(amp_src, trace_ids[start:end], cache=None)
 
     # Write geometry parquet/CSV (fallback if parquet engine missing)
     out_geom = Path(out_geometry) if out_geometry else Path(str(out_zarr) + ".geometry.parquet")
@@ -534,10 +2542,12 @@ def subset_zarr_by_trace_ids(
         "trace_count": int(len(trace_ids)),
         "samples": int(ns),
         "chunk_trace": int(chunk_trace),
+        "chunk_sample": int(amp_out.chunks[0]),
         "created_at": datetime.utcnow().isoformat() + "Z",
     }
     manifest_path = Path(str(out_zarr) + ".manifest.json")
     manifest_path.write_text(json.dumps(manifest, indent=2))
+    CHUNK_CACHE.invalidate(out_zarr)
 
     context["zarr_store"] = str(out_zarr.resolve())
     context["geometry_parquet"] = str(out_geom.resolve())
@@ -620,6 +2630,77 @@ def preview_zarr_headers(
     return fig
 
 
+def _expression_columns(
+    store,
+    store_path: Union[str, Path],
+    names: Sequence[str],
+    ntraces: int,
+    exclude: Sequence[str] = (),
+) -> Tuple[Callable[[str, int, int], np.ndarray], Dict[str, str]]:
+    """Row loader for the header columns an expression references.
+
+    Per-trace 1-D arrays of the store are read slice by slice; the rest come from
+    the geometry table next to the store, reading only those columns in their own
+    dtype. Returns ``(load, sources)`` with ``load(name, lo, hi)`` and ``sources``
+    mapping each name to ``"zarr"`` or ``"geometry"``.
+    """
+    sources: Dict[str, str] = {}
+    for name in names:
+        if name in exclude:
+            continue
+        if name in store and name != "amplitude" and store[name].shape == (ntraces,):
+            sources[name] = "zarr"
+    missing = [name for name in names if name not in sources]
+    geometry: Dict[str, np.ndarray] = {}
+    if missing:
+        geometry_path = _store_geometry_path(Path(store_path))
+        if geometry_path.exists():
+            available = _geometry_column_names(geometry_path)
+            found = [name for name in missing if name in available and name not in exclude]
+            if found:
+                table = _read_geometry_columns(geometry_path, found)
+                if len(table) == ntraces:
+                    geometry = {name: table[name].to_numpy() for name in found}
+                    sources.update({name: "geometry" for name in found})
+    unknown = [name for name in names if name not in sources]
+    if unknown:
+        raise KeyError(f"Headers not found in {store_path}: {', '.join(unknown)}")
+
+    def load(name: str, lo: int, hi: int) -> np.ndarray:
+        if sources[name] == "zarr":
+            return store[name][lo:hi]
+        return geometry[name][lo:hi]
+
+    return load, sources
+
+
+def _expression_indices(store, store_path: Union[str, Path], plan, ntraces: int) -> np.ndarray:
+    """Trace indices where the boolean expression ``plan`` holds.
+
+    When every referenced header lives in a Parquet geometry table, row groups
+    whose min/max statistics rule the expression out are never read.
+    """
+    geometry_path = _store_geometry_path(Path(store_path))
+    if (
+        plan.elementwise
+        and pq is not None
+        and geometry_path.exists()
+        and geometry_path.suffix.lower() != ".csv"
+        and not any(name in store and name != "amplitude" for name in plan.columns)
+    ):
+        parquet = pq.ParquetFile(geometry_path)
+        names = parquet.schema_arrow.names
+        if parquet.metadata.num_rows == ntraces and all(name in names for name in plan.columns):
+            return _scan_geometry(parquet, plan)[0]
+
+    load, _ = _expression_columns(store, store_path, plan.columns, ntraces)
+    mask = plan.evaluate_chunked(load, ntraces)
+    mask = np.asarray(mask, dtype=bool)
+    if mask.shape != (ntraces,):
+        raise ValueError("Expression did not return a mask of the expected length.")
+    return np.flatnonzero(mask)
+
+
 def create_zarr_header(
     context: dict,
     zarr_store: Union[str, Path, Dict[str, Any]],
@@ -640,20 +2721,12 @@ def create_zarr_header(
 
     ntraces = store["amplitude"].shape[-1]
 
-    namespace: Dict[str, np.ndarray] = {}
-    for key in store.array_keys():
-        if key in {"amplitude", output_header}:
-            continue
-        arr = store[key]
-        if arr.shape == (ntraces,):
-            namespace[key] = arr[:]
-        elif arr.shape[-1] == ntraces:
-            namespace[key] = arr[:]
-
-    namespace["np"] = np
-
     try:
-        result = eval(expression, {"np": np}, namespace)
+        plan = compile_header_expression(expression)
+        load, _ = _expression_columns(store, store_path, plan.columns, ntraces, exclude=(output_header,))
+        result = plan.evaluate_chunked(
+            load, ntraces, out=np.empty(ntraces, dtype=dtype) if plan.elementwise else None
+        )
     except Exception as exc:
         raise ValueError(f"Failed to evaluate expression '{expression}': {exc}") from exc
 
@@ -675,6 +2748,7 @@ def create_zarr_header(
         dtype=dtype,
         overwrite=overwrite,
     )
+    CHUNK_CACHE.invalidate(store_path)
 
     if output:
         context[output] = result
@@ -707,11 +2781,14 @@ def load_zarr_datasets(
         Whether to load the ``amplitude`` dataset in addition to headers.
     output : str, default "zarr_data"
         Context key where the resulting dictionary of arrays will be stored.
+    eager : bool, default False
+        Read everything into NumPy arrays. Otherwise headers stay lazy Zarr arrays
+        and ``amplitude`` is a ``CachedArray`` reading through ``CHUNK_CACHE``.
 
     Returns
     -------
     dict
-        Mapping of dataset names to NumPy arrays (fully materialized in memory).
+        Mapping of dataset names to arrays (NumPy when ``eager``).
     """
 
     if isinstance(zarr_store, dict) and "file_path" in zarr_store:
@@ -735,7 +2812,8 @@ def load_zarr_datasets(
         return arr[:] if eager else arr
 
     if include_amplitude and "amplitude" in store:
-        data["amplitude"] = _maybe_materialize(store["amplitude"])
+        # Lazy amplitudes read through the shared chunk cache
+        data["amplitude"] = store["amplitude"][:] if eager else CachedArray(store["amplitude"])
 
     for header in selected:
         if header not in store:
@@ -748,6 +2826,23 @@ def load_zarr_datasets(
 
 __all__ = [
     "segy_directory_to_zarr",
+    "plan_chunk_shape",
+    "scan_segy_files",
+    "TraceHeaderIndex",
+    "build_trace_index",
+    "load_trace_index",
+    "select_traces",
+    "read_geometry_rows",
+    "read_traces",
+    "ChunkCache",
+    "CachedArray",
+    "CHUNK_CACHE",
+    "reorganize_zarr",
+    "build_overviews",
+    "open_overviews",
+    "select_overview",
+    "AmplitudeStats",
+    "compute_amplitude_stats",
     "load_zarr_amplitude",
     "load_zarr_datasets",
     "preview_zarr_headers",
@@ -806,20 +2901,33 @@ def slice_zarr_by_header(
     store_path = zarr_store["file_path"] if isinstance(zarr_store, dict) else zarr_store
     store = zarr.open(store_path, mode="r")
 
+    geometry_path = _store_geometry_path(Path(store_path))
     if header not in store:
-        raise KeyError(f"Header '{header}' not found in Zarr store {store_path}")
+        # Headers kept only in the geometry table: filter with row-group pushdown
+        if not geometry_path.exists() or header not in _geometry_column_names(geometry_path):
+            raise KeyError(f"Header '{header}' not found in Zarr store {store_path}")
+        terms = []
+        if min_value is not None or max_value is not None:
+            terms.append(_geometry_filter_expression({header: (min_value, max_value)}))
+        if include_values is not None:
+            terms.append(_geometry_filter_expression({header: np.asarray(include_values).tolist()}))
+        if terms:
+            indices = select_traces({}, geometry_path, " & ".join(terms), columns=[]).index.to_numpy()
+        else:
+            indices = np.arange(len(_read_geometry_columns(geometry_path, [header])))
+    else:
+        values = np.asarray(store[header][:], dtype=np.float64)
+        mask = np.ones_like(values, dtype=bool)
 
-    values = np.asarray(store[header][:], dtype=np.float64)
-    mask = np.ones_like(values, dtype=bool)
+        if min_value is not None:
+            mask &= values >= min_value
+        if max_value is not None:
+            mask &= values <= max_value
+        if include_values is not None:
+            mask &= np.isin(values, np.asarray(include_values))
 
-    if min_value is not None:
-        mask &= values >= min_value
-    if max_value is not None:
-        mask &= values <= max_value
-    if include_values is not None:
-        mask &= np.isin(values, np.asarray(include_values))
+        indices = np.nonzero(mask)[0]
 
-    indices = np.nonzero(mask)[0]
     if indices.size == 0:
         context[output] = {}
         if return_indices:
@@ -832,7 +2940,7 @@ def slice_zarr_by_header(
         return arr[:] if eager else arr
 
     if include_amplitude and "amplitude" in store:
-        subset["amplitude"] = _maybe(store["amplitude"].oindex[:, indices])
+        subset["amplitude"] = read_traces(store["amplitude"], indices)
 
     headers_to_fetch = include_headers or []
     if include_headers is None:
@@ -843,11 +2951,21 @@ def slice_zarr_by_header(
 
     headers_to_fetch = list(dict.fromkeys(headers_to_fetch + [header]))
 
+    geometry_headers = []
     for h in headers_to_fetch:
         if h not in store:
+            geometry_headers.append(h)
             continue
         subset[h] = _maybe(store[h].oindex[indices])
 
+    if geometry_headers and geometry_path.exists():
+        available = _geometry_column_names(geometry_path)
+        found = [h for h in geometry_headers if h in available]
+        if found:
+            rows = read_geometry_rows(geometry_path, indices, found)
+            for h in found:
+                subset[h] = rows[h].to_numpy()
+
     context[output] = subset
     if return_indices:
         context[f"{output}_indices"] = indices
@@ -870,23 +2988,19 @@ def slice_zarr_by_expression(
     store = zarr.open(store_path, mode="r")
 
     headers_available = [key for key in store.array_keys() if key != "amplitude"]
-    namespace: Dict[str, np.ndarray] = {}
-    for header in headers_available:
-        namespace[header] = np.asarray(store[header][:], dtype=np.float64)
-
-    if not namespace:
-        raise ValueError("No header datasets found to evaluate expression.")
+    ntraces = store["amplitude"].shape[-1] if "amplitude" in store else None
+    if ntraces is None:
+        lengths = {store[key].shape[0] for key in headers_available if store[key].ndim == 1}
+        if len(lengths) != 1:
+            raise ValueError("No header datasets found to evaluate expression.")
+        ntraces = lengths.pop()
 
     try:
-        mask = eval(expression, {"np": np}, namespace)
+        plan = compile_header_expression(expression)
+        indices = _expression_indices(store, store_path, plan, ntraces)
     except Exception as exc:
         raise ValueError(f"Failed to evaluate expression '{expression}': {exc}") from exc
 
-    mask = np.asarray(mask, dtype=bool)
-    if mask.shape[0] != next(iter(namespace.values())).shape[0]:
-        raise ValueError("Expression did not return a mask of the expected length.")
-
-    indices = np.nonzero(mask)[0]
     if indices.size == 0:
         context[output] = {}
         if return_indices:
@@ -899,16 +3013,27 @@ def slice_zarr_by_expression(
         return arr[:] if eager else arr
 
     if include_amplitude and "amplitude" in store:
-        subset["amplitude"] = _maybe(store["amplitude"].oindex[:, indices])
+        subset["amplitude"] = read_traces(store["amplitude"], indices)
 
     headers_to_fetch = include_headers or headers_available
     headers_to_fetch = list(dict.fromkeys(headers_to_fetch))
 
+    geometry_headers = []
     for h in headers_to_fetch:
         if h not in store:
+            geometry_headers.append(h)
             continue
         subset[h] = _maybe(store[h].oindex[indices])
 
+    geometry_path = _store_geometry_path(Path(store_path))
+    if include_headers and geometry_headers and geometry_path.exists():
+        available = _geometry_column_names(geometry_path)
+        found = [h for h in geometry_headers if h in available]
+        if found:
+            rows = read_geometry_rows(geometry_path, indices, found)
+            for h in found:
+                subset[h] = rows[h].to_numpy()
+
     context[output] = subset
     if return_indices:
         context[f"{output}_indices"] = indices
@@ -972,6 +3097,7 @@ def scale_zarr_coordinate_units(
 
     _scale(XY_headers, XY_scaler, "XY")
     _scale(elevation_headers, elevation_scaler, "elev")
+    CHUNK_CACHE.invalidate(store_path)
 
     context[output] = store_path
     return store_path
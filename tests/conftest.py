@@ -0,0 +1,44 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+import segyio
+
+
+def write_segy(
+    path: Path, ntr: int = 120, ns: int = 50, fmt: int = 5, fldr0: int = 1, per_shot: int = 40, endian: str = "big"
+) -> np.ndarray:
+    """Write a small synthetic SEG-Y file and return its traces as (ntr, ns)."""
+    spec = segyio.spec()
+    spec.format = fmt
+    spec.endian = endian
+    spec.samples = np.arange(ns) * 2.0
+    spec.tracecount = ntr
+    data = np.random.default_rng(fldr0).standard_normal((ntr, ns)).astype(np.float32)
+    with segyio.create(str(path), spec) as f:
+        for i in range(ntr):
+            shot = fldr0 + i // per_shot
+            f.header[i] = {
+                segyio.TraceField.FieldRecord: shot,
+                segyio.TraceField.TraceNumber: i % per_shot + 1,
+                segyio.TraceField.CDP: 1000 + (i * 7) % 97,
+                segyio.TraceField.offset: -500 + 25 * (i % per_shot),
+                segyio.TraceField.SourceX: 10000 + shot * 50,
+                segyio.TraceField.GroupX: 9500 + shot * 50 + 25 * (i % per_shot),
+                segyio.TraceField.CDP_X: 100 + i,
+                segyio.TraceField.TRACE_SAMPLE_COUNT: ns,
+                segyio.TraceField.TRACE_SAMPLE_INTERVAL: 2000,
+            }
+            f.trace[i] = data[i]
+        f.bin.update(hdt=2000, hns=ns, format=fmt)
+    return data
+
+
+@pytest.fixture
+def segy_dir(tmp_path):
+    """A directory of three small SEG-Y files."""
+    folder = tmp_path / "segy"
+    folder.mkdir()
+    for k in range(3):
+        write_segy(folder / f"line{k}.sgy", fldr0=1 + 3 * k)
+    return folder
@@ -0,0 +1,41 @@
+import numpy as np
+import zarr
+
+from openseismicprocessing.zarr_utils import CachedArray, ChunkCache
+
+
+def _amplitude(store):
+    root = zarr.open(store, mode="w")
+    data = np.arange(40 * 60, dtype=np.float32).reshape(40, 60)
+    root.create_dataset("amplitude", data=data, chunks=(20, 16))
+    return data
+
+
+def test_in_place_write_is_not_served_stale(tmp_path):
+    data = _amplitude(str(tmp_path / "a.zarr"))
+    cache = ChunkCache()
+    cached = CachedArray(zarr.open(str(tmp_path / "a.zarr"), mode="r")["amplitude"], cache)
+    np.testing.assert_array_equal(cached[:, 10:40], data[:, 10:40])
+    np.testing.assert_array_equal(cached[:, 10:40], data[:, 10:40])
+    assert cache.hits > 0
+
+    # Same shape, same .zarray: only the chunk files change
+    zarr.open(str(tmp_path / "a.zarr"), mode="r+")["amplitude"][:, 16:32] = -1
+    data[:, 16:32] = -1
+    np.testing.assert_array_equal(cached[:, 10:40], data[:, 10:40])
+
+
+def test_nested_store_is_cached(tmp_path):
+    store = zarr.DirectoryStore(str(tmp_path / "n.zarr"), dimension_separator="/")
+    data = _amplitude(store)
+    cache = ChunkCache()
+    cached = CachedArray(zarr.open(store, mode="r")["amplitude"], cache)
+    cached[:]
+    np.testing.assert_array_equal(cached[:], data)
+    assert cache.hits == cache.misses > 0
+
+    zarr.open(store, mode="r+")["amplitude"][:20, :16] = 7
+    data[:20, :16] = 7
+    np.testing.assert_array_equal(cached[:], data)
+    cache.invalidate(tmp_path / "n.zarr")
+    assert cache.stats()["chunks"] == 0
@@ -0,0 +1,70 @@
+import dataclasses
+
+import numpy as np
+import pytest
+
+from openseismicprocessing import _expressions
+from openseismicprocessing._expressions import ExpressionError, compile_header_expression
+
+COLUMNS = {
+    "offset": np.arange(-500.0, 500.0, 25.0),
+    "cdp": np.arange(40, dtype=np.int32) % 7 + 1000,
+    "sx": np.linspace(1e4, 2e4, 40, dtype=np.float32),
+}
+
+
+@pytest.fixture
+def numexpr(monkeypatch):
+    """numexpr (a stand-in evaluating the same source with NumPy when it is not installed), recording calls."""
+    try:
+        import numexpr as module
+
+        evaluate = module.evaluate
+    except ImportError:
+        env = {name: getattr(np, name) for name in _expressions.NUMEXPR_FUNCS}
+
+        def evaluate(source, local_dict):
+            return eval(source, {"__builtins__": {}}, {**env, **local_dict})
+
+    calls = []
+
+    class Recorder:
+        @staticmethod
+        def evaluate(source, local_dict):
+            calls.append(source)
+            return evaluate(source, local_dict=local_dict)
+
+    monkeypatch.setattr(_expressions, "ne", Recorder)
+    compile_header_expression.cache_clear()
+    yield calls
+    compile_header_expression.cache_clear()
+
+
+@pytest.mark.parametrize(
+    "expression",
+    ["abs(offset) * 2 + cdp", "sqrt(sx) > 110", "where(offset > 0, offset, -offset)", "(cdp == 1003) & (offset < 0)"],
+)
+def test_numexpr_matches_numpy(numexpr, expression):
+    plan = compile_header_expression(expression)
+    assert plan.numexpr_source is not None
+    result = plan.evaluate(dict(COLUMNS))
+    assert numexpr
+    expected = dataclasses.replace(plan, numexpr_source=None).evaluate(dict(COLUMNS))
+    np.testing.assert_allclose(result, expected, rtol=1e-6)
+
+
+def test_numexpr_skips_floor_division_and_unsupported_dtypes(numexpr):
+    assert compile_header_expression("offset // 50").numexpr_source is None
+    plan = compile_header_expression("trace + 1")
+    assert plan.numexpr_source is not None
+    big = np.array([2**63 + 5], dtype=np.uint64)
+    assert plan.evaluate({"trace": big})[0] == 2**63 + 6
+    assert not numexpr
+
+
+def test_unknown_bare_function_fails_at_compile_time():
+    with pytest.raises(ExpressionError, match="np.cumsum"):
+        compile_header_expression("cumsum(offset)")
+    np.testing.assert_array_equal(
+        compile_header_expression("np.cumsum(offset)").evaluate(dict(COLUMNS)), np.cumsum(COLUMNS["offset"])
+    )
@@ -0,0 +1,60 @@
+import os
+
+import numpy as np
+import pytest
+import segyio
+
+from openseismicprocessing._io import ibm_to_ieee, read_trace_samples, segy_layout
+from openseismicprocessing.io import get_trace_data
+
+from conftest import write_segy
+
+
+def _segyio_traces(path, endian="big"):
+    with segyio.open(str(path), "r", ignore_geometry=True, endian=endian) as f:
+        return np.ascontiguousarray(f.trace.raw[:].T)
+
+
+def _bits(values):
+    return np.asarray(values, dtype=np.float32).view(np.uint32)
+
+
+def test_random_words_match_segyio(tmp_path):
+    """Random IBM bit patterns (zeros, denormals, overflows, NaN-like) decode as segyio does."""
+    ntr, ns = 64, 256
+    path = tmp_path / "words.sgy"
+    write_segy(path, ntr=ntr, ns=ns, fmt=1)
+    words = np.random.default_rng(1).integers(0, 1 << 32, size=ntr * ns, dtype=np.uint64).astype(np.uint32)
+    words[:8] = [0, 0x80000000, 0x00000001, 0x21200000, 0x211FFFFF, 0x611FFFFF, 0x61200000, 0xFFFFFFFF]
+    # Patch the raw words into the trace samples and let segyio decode them
+    with open(path, "r+b") as fh:
+        for i in range(ntr):
+            fh.seek(3600 + i * (240 + 4 * ns) + 240)
+            fh.write(words[i * ns : (i + 1) * ns].astype(">u4").tobytes())
+    expected = _segyio_traces(path)
+    np.testing.assert_array_equal(_bits(ibm_to_ieee(words, threads=3)), _bits(expected.T.reshape(-1)))
+    np.testing.assert_array_equal(_bits(read_trace_samples(segy_layout(str(path)), threads=3)), _bits(expected))
+
+
+@pytest.mark.parametrize("endian", ["big", "little"])
+def test_read_trace_samples_matches_segyio(tmp_path, endian):
+    path = tmp_path / f"{endian}.sgy"
+    write_segy(path, ntr=200, ns=75, fmt=1, endian=endian)
+    layout = segy_layout(str(path))
+    assert layout.endian == (">" if endian == "big" else "<")
+    expected = _segyio_traces(path, endian)
+    np.testing.assert_array_equal(_bits(read_trace_samples(layout)), _bits(expected))
+    np.testing.assert_array_equal(_bits(read_trace_samples(layout, 17, 130, threads=4)), _bits(expected[:, 17:130]))
+
+
+def test_get_trace_data_matches_segyio(tmp_path):
+    folder = tmp_path / "ibm"
+    folder.mkdir()
+    for k in range(2):
+        write_segy(folder / f"line{k}.sgy", ntr=90, fmt=1, fldr0=1 + k)
+    single = get_trace_data({}, str(folder / "line0.sgy"))
+    np.testing.assert_array_equal(_bits(single), _bits(_segyio_traces(folder / "line0.sgy")))
+    # Folders stack their files in directory order
+    files = [folder / name for name in os.listdir(folder)]
+    stacked = get_trace_data({}, str(folder))
+    np.testing.assert_array_equal(_bits(stacked), _bits(np.concatenate([_segyio_traces(f) for f in files], axis=1)))
@@ -0,0 +1,165 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+import segyio
+import zarr
+
+from openseismicprocessing import zarr_utils
+from openseismicprocessing.constants import TRACE_HEADER_REV0
+from openseismicprocessing.io import read_trace_headers_until
+
+from conftest import write_segy
+
+CHUNK = 16
+NS = 50
+# One 16-trace chunk per read window and worker, so files stream in several windows
+BUDGET = 2 * NS * 4 * CHUNK * 3
+
+
+@pytest.fixture
+def uneven_dir(tmp_path):
+    """Files whose trace counts put chunk boundaries inside files and across them."""
+    folder = tmp_path / "uneven"
+    folder.mkdir()
+    for k, ntr in enumerate([70, 45, 9, 130]):
+        write_segy(folder / f"line{k}.sgy", ntr=ntr, ns=NS, fldr0=1 + 5 * k)
+    return folder
+
+
+def _segyio_amplitude(folder):
+    blocks = []
+    for path in sorted(folder.glob("*.sgy")):
+        with segyio.open(str(path), "r", ignore_geometry=True) as f:
+            blocks.append(f.trace.raw[:].T)
+    return np.concatenate(blocks, axis=1)
+
+
+def _check_store(store, folder):
+    root = zarr.open(str(store), mode="r")
+    expected = _segyio_amplitude(folder)
+    amplitude = root["amplitude"][:]
+    np.testing.assert_array_equal(amplitude.view(np.uint32), expected.view(np.uint32))
+    geometry = pd.read_parquet(str(store) + ".geometry.parquet")
+    np.testing.assert_array_equal(geometry["trace_id"], np.arange(expected.shape[1]))
+    counts = [len(segyio.open(str(p), "r", ignore_geometry=True).trace) for p in sorted(folder.glob("*.sgy"))]
+    np.testing.assert_array_equal(geometry["file_id"], np.repeat(np.arange(len(counts)), counts))
+    assert root.attrs["total_traces"] == expected.shape[1]
+    # Streamed per-chunk summaries agree with a pass over the finished array
+    stats = zarr_utils.AmplitudeStats.load(root)
+    fresh = zarr_utils.compute_amplitude_stats({}, str(store))
+    for name in ("min", "max", "count", "hist"):
+        np.testing.assert_array_equal(getattr(stats, name), getattr(fresh, name))
+    np.testing.assert_allclose(stats.sumsq, fresh.sumsq)
+    return geometry
+
+
+def test_default_ingest_decodes_headers_without_segyio_scans(segy_dir, tmp_path, monkeypatch):
+    calls = []
+    attributes = segyio.SegyFile.attributes
+    monkeypatch.setattr(segyio.SegyFile, "attributes", lambda self, field: calls.append(field) or attributes(self, field))
+
+    zarr_utils.segy_directory_to_zarr({}, segy_dir, tmp_path / "mmap.zarr")
+    assert calls == []
+
+    # Same columns and values as the per-field segyio path
+    monkeypatch.setattr(zarr_utils, "read_trace_headers", lambda *args, **kwargs: None)
+    zarr_utils.segy_directory_to_zarr({}, segy_dir, tmp_path / "segyio.zarr")
+    assert calls
+    fast = pd.read_parquet(tmp_path / "mmap.zarr.geometry.parquet")
+    slow = pd.read_parquet(tmp_path / "segyio.zarr.geometry.parquet")
+    pd.testing.assert_frame_equal(fast, slow)
+    assert (fast["unassigned_181_240"] == fast["trace_in_file"] + 100).all()
+
+
+def test_header_reader_decodes_unassigned_fields_without_segyio_scans(segy_dir, monkeypatch):
+    calls = []
+    attributes = segyio.SegyFile.attributes
+    monkeypatch.setattr(segyio.SegyFile, "attributes", lambda self, field: calls.append(field) or attributes(self, field))
+    path = str(segy_dir / "line0.sgy")
+
+    headers = read_trace_headers_until(path, num_traces=100, include_unassigned=True)
+    assert calls == []
+    assert set(headers) == set(TRACE_HEADER_REV0)
+    with segyio.open(path, "r", ignore_geometry=True) as f:
+        for name, (byte, _) in TRACE_HEADER_REV0.items():
+            np.testing.assert_array_equal(headers[name], attributes(f, byte)[:100], err_msg=name)
+
+
+def test_ingest_leaves_input_folder_untouched(segy_dir, tmp_path):
+    before = sorted(p.name for p in segy_dir.iterdir())
+    zarr_utils.segy_directory_to_zarr({}, segy_dir, tmp_path / "out.zarr")
+    assert sorted(p.name for p in segy_dir.iterdir()) == before
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_ingest_matches_segyio_across_file_boundaries(uneven_dir, tmp_path, monkeypatch, workers):
+    stores = []
+    store = zarr_utils._ChunkAlignedWriter._store
+    monkeypatch.setattr(
+        zarr_utils._ChunkAlignedWriter, "_store", lambda self, lo, block: stores.append((lo, block.shape[1])) or store(self, lo, block)
+    )
+    out = tmp_path / "out.zarr"
+    zarr_utils.segy_directory_to_zarr({}, uneven_dir, out, chunk_trace=CHUNK, workers=workers, memory_budget=BUDGET)
+    _check_store(out, uneven_dir)
+    # Whatever the parent writes starts on a chunk and no chunk is written twice
+    assert all(lo % CHUNK == 0 for lo, _ in stores)
+    chunks = [c for lo, n in stores for c in range(lo // CHUNK, -(-(lo + n) // CHUNK))]
+    assert len(chunks) == len(set(chunks))
+    if workers == 1:
+        assert sorted(chunks) == list(range(-(-254 // CHUNK)))
+
+
+class Crash(Exception):
+    pass
+
+
+def _crash_on_commit(monkeypatch, n_commits, after):
+    """Make the ingest die just before (or after) logging its ``n_commits``-th file."""
+    append = zarr_utils._append_ingest_log
+    seen = []
+
+    def append_or_crash(log_path, record, mode="a"):
+        if record.get("event") == "commit":
+            seen.append(record)
+            if len(seen) == n_commits and not after:
+                raise Crash
+        append(log_path, record, mode)
+        if record.get("event") == "commit" and len(seen) == n_commits and after:
+            raise Crash
+
+    monkeypatch.setattr(zarr_utils, "_append_ingest_log", append_or_crash)
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+@pytest.mark.parametrize(
+    "crash",
+    [("commit", 1, False), ("commit", 2, True), ("commit", 4, False), ("torn", 3, True), ("merge", 0, False)],
+)
+def test_resume_after_crash_matches_clean_ingest(uneven_dir, tmp_path, monkeypatch, workers, crash):
+    kind, n_commits, after = crash
+    kwargs = dict(chunk_trace=CHUNK, workers=workers, memory_budget=BUDGET)
+    clean = tmp_path / "clean.zarr"
+    zarr_utils.segy_directory_to_zarr({}, uneven_dir, clean, **kwargs)
+
+    out = tmp_path / "out.zarr"
+    with monkeypatch.context() as m:
+        if kind == "merge":
+            m.setattr(zarr_utils, "_merge_geometry_parts", lambda *args: (_ for _ in ()).throw(Crash()))
+        else:
+            _crash_on_commit(m, n_commits, after)
+        with pytest.raises(Crash):
+            zarr_utils.segy_directory_to_zarr({}, uneven_dir, out, **kwargs)
+    log_path = zarr_utils._ingest_log_path(out)
+    if kind == "torn":
+        with open(log_path, "a") as fh:
+            fh.write('{"event": "commit", "file_in')
+
+    zarr_utils.segy_directory_to_zarr({}, uneven_dir, out, **kwargs)
+    records = [json.loads(line) for line in log_path.read_text().splitlines()]
+    assert [r["event"] for r in records].count("start") == 1
+    assert [r["file_index"] for r in records if r["event"] == "commit"] == [0, 1, 2, 3]
+    assert records[-1]["event"] == "complete"
+    geometry = _check_store(out, uneven_dir)
+    pd.testing.assert_frame_equal(geometry, pd.read_parquet(str(clean) + ".geometry.parquet"))
@@ -0,0 +1,132 @@
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+import zarr
+
+from openseismicprocessing import SignalProcessing, zarr_utils
+
+
+@pytest.fixture
+def store(segy_dir, tmp_path):
+    out = tmp_path / "shots.zarr"
+    zarr_utils.segy_directory_to_zarr({}, segy_dir, out, chunk_trace=32)
+    return out
+
+
+def test_chunked_pipeline_without_geometry(store, tmp_path):
+    os.remove(str(store) + ".geometry.parquet")
+    out = SignalProcessing.run_chunked_pipeline(
+        [(SignalProcessing.mute_data, {"start_sample": 10})], store, tmp_path / "muted.zarr"
+    )
+    amplitude = zarr.open(out, mode="r")["amplitude"][:]
+    assert not amplitude[10:].any()
+    np.testing.assert_array_equal(amplitude[:10], zarr.open(str(store), mode="r")["amplitude"][:10])
+    manifest = json.loads((tmp_path / "muted.zarr.manifest.json").read_text())
+    assert manifest["geometry_parquet"] is None
+    assert not (tmp_path / "muted.zarr.geometry.parquet").exists()
+
+
+def test_designature_is_not_trace_local():
+    # Its least-squares inversion couples traces, so windows would not match a whole-array run
+    assert not getattr(SignalProcessing.apply_designature, "trace_local", False)
+
+
+def _noise(context):
+    return np.random.default_rng(0).standard_normal((50, 100_000)).astype(np.float32)
+
+
+def test_fused_steps_print_operator_messages_once(capsys):
+    steps = [
+        (_noise, {"output": "data"}),
+        (SignalProcessing.mute_data, {"start_sample": 1000, "output": "data"}),
+        (SignalProcessing.mute_data, {"start_sample": 5, "output": "data"}),
+    ]
+    context = SignalProcessing.run_pipeline(steps)
+    assert not context["data"][5:].any()
+    warnings = [line for line in capsys.readouterr().out.splitlines() if "exceeds number of samples" in line]
+    assert len(warnings) == 1
+
+
+def _geometry(context):
+    return pd.DataFrame({"offset": np.arange(1000.0)})
+
+
+def test_graph_orders_in_place_writes_after_readers():
+    seen = {}
+
+    def plot_columns(context, key="geometry"):
+        time.sleep(0.2)  # give a concurrent writer time to get in
+        seen["columns"] = list(context[key].columns)
+        seen["thread"] = threading.current_thread()
+
+    steps = [
+        (_geometry, {"output": "geometry"}),
+        (plot_columns, {}),
+        (SignalProcessing.create_header, {"header_name": "double", "expression": "offset * 2"}),
+    ]
+    context = SignalProcessing.run_pipeline_graph(steps, workers=4)
+    assert seen["columns"] == ["offset"]
+    assert seen["thread"] is threading.main_thread()
+    np.testing.assert_array_equal(context["geometry"]["double"], np.arange(1000.0) * 2)
+
+
+def _spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+    return seconds
+
+
+def _nap(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def test_graph_report_times_overlapping_steps():
+    steps = [(_spin, {"seconds": 0.3, "output": "a"}), (_nap, {"seconds": 0.3, "output": "b"})]
+    report = SignalProcessing.run_pipeline_graph(steps, workers=2)["pipeline_report"]
+    spin, sleep = report["steps"]
+    # Each step is charged its own thread's CPU time; the run's wall time is elapsed time
+    assert spin["cpu_s"] > 0.2
+    assert sleep["cpu_s"] < 0.1
+    assert report["wall_s"] < spin["wall_s"] + sleep["wall_s"] - 0.2
+
+
+def _add_column(context):
+    context["geometry"]["b"] = 1.0
+
+
+@pytest.mark.parametrize(
+    "step",
+    [
+        (SignalProcessing.create_header, {"header_name": "b", "expression": "offset * 2"}),
+        (_add_column, {}),  # no key parameters: may touch any entry
+    ],
+)
+def test_cache_keeps_in_place_changes(step, tmp_path):
+    cache = SignalProcessing.StepCache(tmp_path / "cache")
+    steps = [(_geometry, {"output": "geometry"}), step]
+    first = SignalProcessing.run_pipeline(steps, cache=cache)
+    second = SignalProcessing.run_pipeline(steps, cache=cache)
+    assert [s["status"] for s in second["pipeline_report"]["steps"]] == ["cached", "cached"]
+    assert list(first["geometry"].columns) == list(second["geometry"].columns) == ["offset", "b"]
+    pd.testing.assert_frame_equal(first["geometry"], second["geometry"])
+
+
+def test_cache_always_runs_plots(tmp_path):
+    drawn = []
+
+    def plot_offsets(context, key="geometry"):
+        drawn.append(len(context[key]))
+
+    cache = SignalProcessing.StepCache(tmp_path / "cache")
+    steps = [(_geometry, {"output": "geometry"}), (plot_offsets, {}), (_add_column, {})]
+    SignalProcessing.run_pipeline(steps, cache=cache)
+    context = SignalProcessing.run_pipeline(steps, cache=cache)
+    assert drawn == [1000, 1000]
+    assert [s["status"] for s in context["pipeline_report"]["steps"]] == ["cached", "ok", "cached"]
@@ -0,0 +1,87 @@
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+import zarr
+
+from openseismicprocessing import zarr_utils
+
+
+@pytest.fixture
+def store(segy_dir, tmp_path):
+    out = tmp_path / "shots.zarr"
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")  # e.g. zarr ignoring keyword arguments
+        zarr_utils.segy_directory_to_zarr({}, segy_dir, out, chunk_trace=32)
+    return out
+
+
+def _sorted_reference(store):
+    geometry = pd.read_parquet(str(store) + ".geometry.parquet")
+    amplitude = zarr.open(str(store), mode="r")["amplitude"][:]
+    order = np.lexsort([geometry["offset"].to_numpy(), geometry["cdp"].to_numpy()])
+    return amplitude[:, order], geometry["cdp"].to_numpy()[order]
+
+
+def test_reorganize_in_place(store):
+    amplitude, cdp = _sorted_reference(store)
+    zarr_utils.reorganize_zarr({}, store, ["cdp", "offset"])
+    geometry = pd.read_parquet(str(store) + ".geometry.parquet")
+    np.testing.assert_array_equal(zarr.open(str(store), mode="r")["amplitude"][:], amplitude)
+    np.testing.assert_array_equal(geometry["cdp"], cdp)
+    np.testing.assert_array_equal(geometry["trace_id"], np.arange(len(geometry)))
+    assert not any(".sorting" in p.name or ".unsorted" in p.name for p in store.parent.iterdir())
+
+
+@pytest.mark.parametrize("failing_call", [2, 3, 4])
+def test_interrupted_swap_is_recovered(store, monkeypatch, failing_call):
+    original = zarr.open(str(store), mode="r")["amplitude"][:]
+    amplitude, _ = _sorted_reference(store)
+    replace = os.replace
+    calls = []
+
+    # Renames: sorted geometry written, store -> backup, sorted store -> store, geometry swapped in
+    def fail_at(src, dst):
+        if not any(os.path.basename(p).endswith((".sorting", ".unsorted")) for p in (src, dst)):
+            return replace(src, dst)  # zarr's own chunk writes
+        calls.append(src)
+        if len(calls) == failing_call:
+            raise OSError("disk went away")
+        replace(src, dst)
+
+    monkeypatch.setattr(zarr_utils.os, "replace", fail_at)
+    with pytest.raises(OSError):
+        zarr_utils._reorder_store(store, zarr_utils._store_geometry_path(store), ["cdp", "offset"])
+    monkeypatch.setattr(zarr_utils.os, "replace", replace)
+
+    # Before the sorted store took the original's name it is rolled back, after that forward
+    zarr_utils._finish_reorder_swap(store)
+    expected = original if failing_call < 4 else amplitude
+    np.testing.assert_array_equal(zarr.open(str(store), mode="r")["amplitude"][:], expected)
+    geometry = pd.read_parquet(str(store) + ".geometry.parquet")
+    assert np.array_equal(geometry["trace_id"], np.arange(len(geometry)))
+    assert geometry["cdp"].is_monotonic_increasing == (failing_call == 4)
+    zarr_utils.reorganize_zarr({}, store, ["cdp", "offset"])
+    np.testing.assert_array_equal(zarr.open(str(store), mode="r")["amplitude"][:], amplitude)
+
+
+def test_bucket_permute_opens_each_spill_file_once(tmp_path, monkeypatch):
+    rng = np.random.default_rng(0)
+    src = zarr.array(rng.standard_normal((20, 5000)).astype("f4"), chunks=(20, 50))
+    dst = zarr.zeros((20, 5000), chunks=(20, 50), dtype="f4")
+    order = rng.permutation(5000)
+    opened = []
+    real_open = open
+
+    def counting_open(path, mode="r", *args, **kwargs):
+        if "a" in mode:
+            opened.append(str(path))  # spill appends; pass two reads the files back
+        return real_open(path, mode, *args, **kwargs)
+
+    monkeypatch.setattr("builtins.open", counting_open)
+    zarr_utils._bucket_permute(src, dst, order, 200, tmp_path)
+    monkeypatch.undo()
+    np.testing.assert_array_equal(dst[:], src[:][:, order])
+    assert len(opened) == len(set(opened)) == 2 * 25